@@ -0,0 +1,643 @@
+"""
+Almacenamiento Local con Sincronización Diferida
+Las detecciones y sesiones se escriben primero en SQLite (modo WAL, mismas
+tablas de schema.sql). Un hilo sincronizador las sube a MySQL por lotes y,
+si el servidor no responde, reintenta más tarde desde donde quedó
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from pool_conexiones import obtener_pool
+
+RUTA_LOCAL = os.environ.get('SALUD_DB_LOCAL', 'salud_local.db')
+
+ESQUEMA_LOCAL = """
+CREATE TABLE IF NOT EXISTS sesiones_trabajo (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    fecha TEXT NOT NULL,
+    hora_inicio TEXT NOT NULL,
+    hora_fin TEXT,
+    minutos_totales INTEGER DEFAULT 0,
+    pausas_tomadas INTEGER DEFAULT 0,
+    estado TEXT DEFAULT 'activa' CHECK (estado IN ('activa', 'pausada', 'finalizada')),
+    remoto_id INTEGER,
+    modificada INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS deteccion_fatiga (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sesion_id INTEGER NOT NULL REFERENCES sesiones_trabajo(id),
+    tipo_fatiga TEXT NOT NULL CHECK (tipo_fatiga IN ('visual', 'postural', 'cognitiva')),
+    nivel_fatiga TEXT NOT NULL CHECK (nivel_fatiga IN ('bajo', 'moderado', 'alto')),
+    indicador TEXT,
+    frecuencia_parpadeo INTEGER,
+    postura_detectada TEXT,
+    timestamp TEXT DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_sesion_tipo ON deteccion_fatiga (sesion_id, tipo_fatiga);
+
+-- Detecciones que MySQL rechazó una por una: la marca de agua las pasa,
+-- pero quedan aquí para revisarlas y reintentarlas
+CREATE TABLE IF NOT EXISTS detecciones_rechazadas (
+    deteccion_id INTEGER PRIMARY KEY REFERENCES deteccion_fatiga(id),
+    error TEXT,
+    intentos INTEGER NOT NULL DEFAULT 1,
+    ultimo_intento TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Marca de agua (último id subido por tabla) y turno del sincronizador
+CREATE TABLE IF NOT EXISTS sincronizacion (
+    tabla TEXT PRIMARY KEY,
+    ultimo_id INTEGER NOT NULL DEFAULT 0,
+    dueno TEXT,
+    vence REAL
+);
+INSERT OR IGNORE INTO sincronizacion (tabla, ultimo_id) VALUES ('deteccion_fatiga', 0);
+INSERT OR IGNORE INTO sincronizacion (tabla, ultimo_id) VALUES ('turno', 0);
+"""
+
+QUERY_LOCAL_DETECCION = """
+    INSERT INTO deteccion_fatiga
+    (sesion_id, tipo_fatiga, nivel_fatiga, indicador, frecuencia_parpadeo, postura_detectada)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+QUERY_LOCAL_DETECCION_HORA = """
+    INSERT INTO deteccion_fatiga
+    (sesion_id, tipo_fatiga, nivel_fatiga, indicador, frecuencia_parpadeo,
+     postura_detectada, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+QUERY_REMOTA_DETECCION = """
+    INSERT INTO deteccion_fatiga
+    (sesion_id, tipo_fatiga, nivel_fatiga, indicador,
+     frecuencia_parpadeo, postura_detectada, timestamp)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def _errores_mysql():
+    """
+    (errores de conexión, error base) de mysql.connector. Ante un error de
+    conexión se reintenta el lote completo más tarde. Import diferido: el
+    driver se carga al sincronizar, no al arrancar
+    """
+    import mysql.connector
+    return ((mysql.connector.errors.InterfaceError,
+             mysql.connector.errors.OperationalError,
+             TimeoutError, OSError),
+            mysql.connector.Error)
+
+
+def _minutos_desde(fecha, hora_inicio, fin):
+    """
+    Minutos entre el inicio de la sesión y fin. hora_inicio admite '8:05:00'
+    (TIME de MySQL adoptado como texto)
+    """
+    inicio = datetime.strptime(f"{fecha} {hora_inicio}", '%Y-%m-%d %H:%M:%S')
+    return max(0, int((fin - inicio).total_seconds() // 60))
+
+
+_almacenes = {}
+_lock_almacenes = threading.Lock()
+
+
+class AlmacenLocal:
+    def __init__(self, db_config=None, ruta=RUTA_LOCAL, tamano_lote=500, intervalo_flush=5.0,
+                 espera_maxima=300.0, en_hilo=True, pool=None):
+        """
+        db_config: MySQL central (None = solo local, sin sincronizar)
+        ruta: archivo SQLite local
+        tamano_lote: filas por INSERT masivo hacia MySQL
+        intervalo_flush: segundos entre pasadas de sincronización
+        espera_maxima: tope del reintento con espera creciente durante caídas
+        en_hilo: False para no crear hilo; quien lo usa llama a vaciar()
+        pool: pool MySQL ya creado (por defecto el compartido de db_config)
+        """
+        self.ruta = ruta
+        self.db_config = db_config
+        self.tamano_lote = tamano_lote
+        self.intervalo_flush = intervalo_flush
+        self.espera_maxima = espera_maxima
+        self._pool = pool
+        self._sincroniza = pool is not None or db_config is not None
+        self._id_proceso = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute("PRAGMA busy_timeout=5000")
+        # Una detección de una sesión inexistente no llega a escribirse
+        self._conexion.execute("PRAGMA foreign_keys=ON")
+        self._conexion.executescript(ESQUEMA_LOCAL)
+        self._lock = threading.Lock()
+        self._lock_sync = threading.Lock()
+
+        # Métricas
+        self.filas_locales = 0
+        self.filas_escritas = 0
+        self.filas_fallidas = 0
+        self.lotes_escritos = 0
+        self._escrituras = 0
+        self._latencia_total = 0.0
+        self._latencia_max = 0.0
+        self._subida_total = 0.0
+        self._subida_max = 0.0
+        self._sin_conexion_desde = None
+        self._sesiones_invalidas = set()
+        self._detenida_en = None
+
+        self._evento_fin = threading.Event()
+        self._thread = None
+        if en_hilo and self._sincroniza:
+            self._thread = threading.Thread(target=self._ejecutar, daemon=True)
+            self._thread.start()
+
+        print(f"✓ Almacenamiento local: {ruta} (WAL, "
+              f"{'sincroniza con MySQL' if self._sincroniza else 'sin sincronizar'})")
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = obtener_pool(self.db_config)
+        return self._pool
+
+    # ========================================
+    # ESCRITURA LOCAL
+    # ========================================
+
+    def registrar(self, fila):
+        """
+        Guarda una fila (sesion_id, tipo, nivel, indicador, frecuencia, postura)
+        o con timestamp al final (reloj simulado; por defecto la hora actual).
+        Misma interfaz que EscritorDetecciones: no depende de MySQL
+        """
+        consulta = QUERY_LOCAL_DETECCION if len(fila) == 6 else QUERY_LOCAL_DETECCION_HORA
+        inicio = time.perf_counter()
+        try:
+            with self._lock:
+                self._conexion.execute(consulta, fila)
+        except sqlite3.IntegrityError as e:
+            if fila[0] not in self._sesiones_invalidas:
+                self._sesiones_invalidas.add(fila[0])
+                print(f"❌ Detección descartada: la sesión {fila[0]} no existe en {self.ruta} ({e})")
+            return False
+        except sqlite3.Error as e:
+            print(f"❌ Error guardando detección local: {e}")
+            return False
+
+        latencia = time.perf_counter() - inicio
+        self.filas_locales += 1
+        self._escrituras += 1
+        self._latencia_total += latencia
+        if latencia > self._latencia_max:
+            self._latencia_max = latencia
+        return True
+
+    def obtener_o_crear_sesion(self, usuario_id=1):
+        """
+        Devuelve (sesion_id local, creada). Sin sesión local activa adopta la
+        activa de MySQL si el servidor responde; si no, crea una local
+        """
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT id FROM sesiones_trabajo WHERE estado = 'activa' ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        if fila:
+            return fila[0], False
+
+        remota = self._sesion_activa_remota() if self._sincroniza else None
+
+        if remota is not None:
+            with self._lock:
+                cursor = self._conexion.execute("""
+                    INSERT INTO sesiones_trabajo
+                    (usuario_id, fecha, hora_inicio, minutos_totales, pausas_tomadas,
+                     estado, remoto_id, modificada)
+                    VALUES (?, ?, ?, ?, ?, 'activa', ?, 0)
+                """, (remota['usuario_id'], str(remota['fecha']), str(remota['hora_inicio']),
+                      remota['minutos_totales'] or 0, remota['pausas_tomadas'] or 0, remota['id']))
+                return cursor.lastrowid, False
+
+        return self.crear_sesion(usuario_id), True
+
+    def crear_sesion(self, usuario_id=1, instante=None):
+        """
+        Crea una sesión local activa (se crea en MySQL al sincronizar).
+        instante: epoch de inicio (por defecto ahora)
+        """
+        inicio = datetime.fromtimestamp(instante) if instante is not None else datetime.now()
+        with self._lock:
+            cursor = self._conexion.execute("""
+                INSERT INTO sesiones_trabajo (usuario_id, fecha, hora_inicio, estado)
+                VALUES (?, ?, ?, 'activa')
+            """, (usuario_id, inicio.strftime('%Y-%m-%d'), inicio.strftime('%H:%M:%S')))
+            return cursor.lastrowid
+
+    def finalizar_sesion(self, sesion_id, instante=None):
+        """
+        Cierra la sesión con hora_fin y minutos_totales (se actualiza en
+        MySQL al sincronizar). instante: epoch de fin (por defecto ahora)
+        """
+        fin = datetime.fromtimestamp(instante) if instante is not None else datetime.now()
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT fecha, hora_inicio FROM sesiones_trabajo WHERE id = ?", (sesion_id,)
+            ).fetchone()
+            if fila is None:
+                return False
+            minutos = _minutos_desde(fila[0], fila[1], fin)
+            self._conexion.execute("""
+                UPDATE sesiones_trabajo
+                SET estado = 'finalizada', hora_fin = ?, minutos_totales = ?, modificada = 1
+                WHERE id = ?
+            """, (fin.strftime('%H:%M:%S'), minutos, sesion_id))
+        return True
+
+    def _sesion_activa_remota(self):
+        try:
+            with self.pool.conexion(timeout=2) as conexion:
+                cursor = conexion.cursor(dictionary=True)
+                cursor.execute("""
+                    SELECT id, usuario_id, fecha, hora_inicio, minutos_totales, pausas_tomadas
+                    FROM sesiones_trabajo
+                    WHERE estado = 'activa'
+                    ORDER BY id DESC LIMIT 1
+                """)
+                sesion = cursor.fetchone()
+                cursor.close()
+                return sesion
+        except Exception as e:
+            print(f"⚠️ MySQL no disponible, sesión local: {e}")
+            return None
+
+    def minutos_sesion_activa(self):
+        """Minutos desde el inicio de la sesión activa hasta ahora"""
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT fecha, hora_inicio FROM sesiones_trabajo WHERE estado = 'activa' "
+                "ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        return _minutos_desde(fila[0], fila[1], datetime.now()) if fila else 0
+
+    def pendientes(self):
+        """Detecciones locales que todavía no están en MySQL"""
+        with self._lock:
+            return self._conexion.execute("""
+                SELECT COUNT(*) FROM deteccion_fatiga
+                WHERE id > (SELECT ultimo_id FROM sincronizacion WHERE tabla = 'deteccion_fatiga')
+            """).fetchone()[0]
+
+    # ========================================
+    # SINCRONIZACIÓN CON MySQL
+    # ========================================
+
+    def _tomar_turno(self, duracion=60.0):
+        """
+        Un solo sincronizador por archivo aunque varios procesos lo compartan
+        """
+        ahora = time.time()
+        with self._lock:
+            cursor = self._conexion.execute("""
+                UPDATE sincronizacion SET dueno = ?, vence = ?
+                WHERE tabla = 'turno' AND (dueno IS NULL OR dueno = ? OR vence < ?)
+            """, (self._id_proceso, ahora + duracion, self._id_proceso, ahora))
+            return cursor.rowcount == 1
+
+    def _soltar_turno(self):
+        with self._lock:
+            self._conexion.execute(
+                "UPDATE sincronizacion SET dueno = NULL, vence = NULL WHERE tabla = 'turno' AND dueno = ?",
+                (self._id_proceso,)
+            )
+
+    def _sincronizar_sesiones(self, conexion):
+        """
+        Crea en MySQL las sesiones locales nuevas (remapeo local -> remoto) y
+        actualiza las modificadas. Una sesión activa creada sin conexión
+        reemplaza a las activas remotas del usuario que ninguna sesión local
+        usa: se finalizan en la misma transacción para no dejar dos activas
+        """
+        with self._lock:
+            sesiones = self._conexion.execute("""
+                SELECT id, usuario_id, fecha, hora_inicio, hora_fin, minutos_totales,
+                       pausas_tomadas, estado, remoto_id
+                FROM sesiones_trabajo WHERE modificada = 1 ORDER BY id
+            """).fetchall()
+            en_uso = [fila[0] for fila in self._conexion.execute(
+                "SELECT remoto_id FROM sesiones_trabajo WHERE remoto_id IS NOT NULL"
+            )]
+
+        cursor = conexion.cursor()
+        try:
+            for (id_local, usuario_id, fecha, hora_inicio, hora_fin, minutos,
+                 pausas, estado, remoto_id) in sesiones:
+                if remoto_id is None:
+                    if estado == 'activa':
+                        self._finalizar_activas_remotas(cursor, usuario_id, fecha, hora_inicio, en_uso)
+                    cursor.execute("""
+                        INSERT INTO sesiones_trabajo
+                        (usuario_id, fecha, hora_inicio, hora_fin, minutos_totales,
+                         pausas_tomadas, estado)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """, (usuario_id, fecha, hora_inicio, hora_fin, minutos, pausas, estado))
+                    remoto_id = cursor.lastrowid
+                    en_uso.append(remoto_id)
+                else:
+                    cursor.execute("""
+                        UPDATE sesiones_trabajo
+                        SET hora_fin = %s, minutos_totales = %s, pausas_tomadas = %s, estado = %s
+                        WHERE id = %s
+                    """, (hora_fin, minutos, pausas, estado, remoto_id))
+                conexion.commit()
+
+                with self._lock:
+                    self._conexion.execute(
+                        "UPDATE sesiones_trabajo SET remoto_id = ?, modificada = 0 WHERE id = ?",
+                        (remoto_id, id_local)
+                    )
+        finally:
+            cursor.close()
+
+    def _finalizar_activas_remotas(self, cursor, usuario_id, fecha, hora_inicio, en_uso):
+        """
+        Cierra en MySQL las sesiones activas del usuario que no corresponden
+        a ninguna sesión local; terminan donde empieza la nueva
+        """
+        excluir = ''
+        if en_uso:
+            excluir = f"AND id NOT IN ({', '.join(['%s'] * len(en_uso))})"
+        cursor.execute(f"""
+            UPDATE sesiones_trabajo
+            SET estado = 'finalizada', hora_fin = %s,
+                minutos_totales = GREATEST(0, TIMESTAMPDIFF(
+                    MINUTE, TIMESTAMP(fecha, hora_inicio), TIMESTAMP(%s, %s)))
+            WHERE usuario_id = %s AND estado = 'activa' {excluir}
+        """, (hora_inicio, fecha, hora_inicio, usuario_id, *en_uso))
+        if cursor.rowcount:
+            print(f"⚠️ {cursor.rowcount} sesión(es) activa(s) en MySQL del usuario {usuario_id} "
+                  f"reemplazada(s) por la sesión creada sin conexión")
+
+    def _subir_lote(self, conexion):
+        """
+        Sube el siguiente lote de detecciones (sesion_id ya remapeado).
+        Devuelve las filas subidas
+        """
+        with self._lock:
+            filas = self._conexion.execute("""
+                SELECT d.id, s.remoto_id, d.tipo_fatiga, d.nivel_fatiga, d.indicador,
+                       d.frecuencia_parpadeo, d.postura_detectada, d.timestamp, s.id
+                FROM deteccion_fatiga d
+                LEFT JOIN sesiones_trabajo s ON s.id = d.sesion_id
+                WHERE d.id > (SELECT ultimo_id FROM sincronizacion WHERE tabla = 'deteccion_fatiga')
+                ORDER BY d.id LIMIT ?
+            """, (self.tamano_lote,)).fetchall()
+
+        # La marca de agua no puede saltar filas de una sesión aún sin id
+        # remoto ni de una sesión inexistente (archivos previos sin claves foráneas)
+        for posicion, fila in enumerate(filas):
+            if fila[1] is None:
+                if fila[8] is None and posicion == 0 and self._detenida_en != fila[0]:
+                    self._detenida_en = fila[0]
+                    print(f"❌ La detección {fila[0]} apunta a una sesión inexistente; "
+                          f"la sincronización queda detenida en ella")
+                filas = filas[:posicion]
+                break
+        if not filas:
+            return 0
+
+        valores = [fila[1:8] for fila in filas]
+        rechazadas = []
+        errores_conexion, error_mysql = _errores_mysql()
+        inicio = time.perf_counter()
+        cursor = conexion.cursor()
+        try:
+            cursor.executemany(QUERY_REMOTA_DETECCION, valores)
+            conexion.commit()
+            subidas = len(filas)
+        except errores_conexion:
+            raise
+        except error_mysql as e:
+            # Alguna fila inválida: de a una, sin trabar la cola por ella
+            conexion.rollback()
+            print(f"⚠️ Lote rechazado por MySQL ({e}), se sube fila por fila")
+            subidas = 0
+            for fila in filas:
+                try:
+                    cursor.execute(QUERY_REMOTA_DETECCION, fila[1:8])
+                    subidas += 1
+                except errores_conexion:
+                    raise
+                except error_mysql as error_fila:
+                    rechazadas.append((fila[0], str(error_fila)))
+            conexion.commit()
+        finally:
+            cursor.close()
+        duracion = time.perf_counter() - inicio
+        self._subida_total += duracion
+        if duracion > self._subida_max:
+            self._subida_max = duracion
+
+        # La marca avanza solo después del commit remoto (entrega al menos una
+        # vez), junto con el registro de las filas rechazadas
+        with self._lock:
+            self._conexion.execute("BEGIN")
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO detecciones_rechazadas (deteccion_id, error) VALUES (?, ?)",
+                rechazadas
+            )
+            self._conexion.execute(
+                "UPDATE sincronizacion SET ultimo_id = ? WHERE tabla = 'deteccion_fatiga'",
+                (filas[-1][0],)
+            )
+            self._conexion.execute("COMMIT")
+        if rechazadas:
+            self.filas_fallidas += len(rechazadas)
+            print(f"⚠️ {len(rechazadas)} detecciones rechazadas por MySQL quedan en "
+                  f"detecciones_rechazadas de {self.ruta}")
+        self.filas_escritas += subidas
+        self.lotes_escritos += 1
+        return len(filas)
+
+    def rechazadas(self):
+        """Detecciones rechazadas por MySQL que esperan un reintento"""
+        with self._lock:
+            return self._conexion.execute("SELECT COUNT(*) FROM detecciones_rechazadas").fetchone()[0]
+
+    def reintentar_rechazadas(self):
+        """
+        Vuelve a subir las detecciones rechazadas (por ejemplo tras corregir
+        el esquema o la sesión remota). Las que entran salen de la tabla; las
+        demás suman un intento. Devuelve (subidas, siguen rechazadas)
+        """
+        if not self._sincroniza:
+            return 0, self.rechazadas()
+
+        with self._lock:
+            filas = self._conexion.execute("""
+                SELECT d.id, s.remoto_id, d.tipo_fatiga, d.nivel_fatiga, d.indicador,
+                       d.frecuencia_parpadeo, d.postura_detectada, d.timestamp
+                FROM detecciones_rechazadas r
+                JOIN deteccion_fatiga d ON d.id = r.deteccion_id
+                LEFT JOIN sesiones_trabajo s ON s.id = d.sesion_id
+                ORDER BY d.id
+            """).fetchall()
+
+        _, error_mysql = _errores_mysql()
+        subidas, fallidas = [], []
+        with self._lock_sync, self.pool.conexion(timeout=5) as conexion:
+            cursor = conexion.cursor()
+            try:
+                for fila in filas:
+                    try:
+                        cursor.execute(QUERY_REMOTA_DETECCION, fila[1:])
+                        subidas.append((fila[0],))
+                    except error_mysql as e:
+                        fallidas.append((str(e), fila[0]))
+                conexion.commit()
+            finally:
+                cursor.close()
+
+        with self._lock:
+            self._conexion.execute("BEGIN")
+            self._conexion.executemany(
+                "DELETE FROM detecciones_rechazadas WHERE deteccion_id = ?", subidas
+            )
+            self._conexion.executemany("""
+                UPDATE detecciones_rechazadas
+                SET error = ?, intentos = intentos + 1, ultimo_intento = datetime('now', 'localtime')
+                WHERE deteccion_id = ?
+            """, fallidas)
+            self._conexion.execute("COMMIT")
+        self.filas_escritas += len(subidas)
+        return len(subidas), len(fallidas)
+
+    def vaciar(self):
+        """
+        Una pasada de sincronización: sesiones pendientes y un lote de
+        detecciones. Devuelve las filas subidas (0 si no había o no hay conexión)
+        """
+        if not self._sincroniza:
+            return 0
+
+        with self._lock_sync:
+            if not self._tomar_turno():
+                return 0
+            try:
+                with self.pool.conexion(timeout=5) as conexion:
+                    self._sincronizar_sesiones(conexion)
+                    subidas = self._subir_lote(conexion)
+            except Exception as e:
+                if self._sin_conexion_desde is None:
+                    self._sin_conexion_desde = time.monotonic()
+                    print(f"⚠️ MySQL no disponible ({e}); los datos quedan en {self.ruta}")
+                return 0
+
+            if self._sin_conexion_desde is not None:
+                caida = time.monotonic() - self._sin_conexion_desde
+                print(f"✓ MySQL disponible otra vez tras {caida:.0f} s: sincronizando")
+                self._sin_conexion_desde = None
+            return subidas
+
+    def _ejecutar(self):
+        espera = self.intervalo_flush
+        while not self._evento_fin.wait(espera):
+            # Lotes completos seguidos hasta ponerse al día
+            while self.vaciar() >= self.tamano_lote:
+                pass
+            if self._sin_conexion_desde is not None:
+                espera = min(espera * 2, self.espera_maxima)
+            else:
+                espera = self.intervalo_flush
+
+    # ========================================
+    # ESTADO Y CIERRE
+    # ========================================
+
+    def profundidad_cola(self):
+        return self.pendientes()
+
+    def estadisticas(self):
+        """
+        Filas locales, pendientes de subir, latencia de escritura local (por
+        fila) y de subida a MySQL (por lote)
+        """
+        media = self._latencia_total / self._escrituras if self._escrituras else 0.0
+        subida = self._subida_total / self.lotes_escritos if self.lotes_escritos else 0.0
+        return {
+            'profundidad_cola': self.pendientes(),
+            'filas_locales': self.filas_locales,
+            'filas_escritas': self.filas_escritas,
+            'filas_fallidas': self.filas_fallidas,
+            'filas_rechazadas': self.rechazadas(),
+            'filas_descartadas': 0,
+            'lotes_escritos': self.lotes_escritos,
+            'latencia_media_ms': round(media * 1000, 3),
+            'latencia_max_ms': round(self._latencia_max * 1000, 3),
+            'latencia_subida_media_ms': round(subida * 1000, 1),
+            'latencia_subida_max_ms': round(self._subida_max * 1000, 1),
+            'sin_conexion_s': (round(time.monotonic() - self._sin_conexion_desde, 1)
+                               if self._sin_conexion_desde is not None else 0.0)
+        }
+
+    def cerrar(self, timeout=10):
+        """
+        Detiene el sincronizador tras un último intento de subir lo pendiente.
+        La base local sigue disponible (lo no subido se sincroniza en la
+        próxima ejecución)
+        """
+        if self._evento_fin.is_set():
+            return
+        self._evento_fin.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+        limite = time.monotonic() + timeout
+        while self.vaciar() and time.monotonic() < limite:
+            pass
+        if self._sincroniza:
+            self._soltar_turno()
+            pendientes = self.pendientes()
+            if pendientes:
+                print(f"⚠️ {pendientes} detecciones quedan en {self.ruta} para la próxima sincronización")
+
+
+def obtener_almacen(db_config=None, ruta=RUTA_LOCAL):
+    """
+    Devuelve el almacén compartido del archivo local (uno por proceso y ruta)
+    """
+    clave = os.path.abspath(ruta)
+    with _lock_almacenes:
+        if clave not in _almacenes:
+            _almacenes[clave] = AlmacenLocal(db_config, ruta)
+        return _almacenes[clave]
+
+
+# ========================================
+# PRUEBA DEL MÓDULO
+# ========================================
+
+if __name__ == "__main__":
+    import tempfile
+
+    ruta = os.path.join(tempfile.mkdtemp(), 'prueba_local.db')
+    almacen = AlmacenLocal(None, ruta)
+    sesion_id, creada = almacen.obtener_o_crear_sesion()
+    print(f"Sesión local {sesion_id} (creada: {creada})")
+
+    cantidad = 5000
+    inicio = time.perf_counter()
+    for i in range(cantidad):
+        almacen.registrar((sesion_id, 'visual', 'bajo', f"Parpadeos: {i}/min", i, 'correcta'))
+    duracion = time.perf_counter() - inicio
+
+    print(f"{cantidad} detecciones locales: {duracion / cantidad * 1e6:.1f} µs por fila")
+    print(f"Estadísticas: {almacen.estadisticas()}")
+    almacen.cerrar()
@@ -0,0 +1,376 @@
+"""
+Anillo de Frames en Memoria Compartida
+La captura corre en otro proceso y escribe directo en slots NumPy
+preasignados (multiprocessing.shared_memory); el análisis recibe una vista
+de solo lectura del frame más reciente, sin copias ni pickling
+"""
+
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Encabezado (int64): publicada, slot publicado, slot en uso, fin, estado, capturados
+_PUBLICADA, _SLOT_PUBLICADO, _SLOT_EN_USO, _FIN, _ESTADO, _CAPTURADOS = range(6)
+_CAMPOS = 8
+_ALINEACION = 64
+
+# Estado de la fuente de captura
+ABRIENDO, ABIERTA, FALLIDA = 0, 1, -1
+
+
+class AnilloFrames:
+    def __init__(self, slots=3, forma=(480, 640, 3), contexto=None):
+        """
+        slots: frames preasignados (mínimo 3: uno en lectura, el último
+            publicado y uno libre para escribir)
+        forma: (alto, ancho, canales) de los frames uint8
+        """
+        if slots < 3:
+            raise ValueError("El anillo necesita al menos 3 slots")
+
+        contexto = contexto or multiprocessing.get_context('spawn')
+        self.slots = slots
+        self.forma = tuple(forma)
+        self._condicion = contexto.Condition()
+        self._creador = True
+
+        tamano_frame = int(np.prod(self.forma))
+        self._offset_frames = -(-(_CAMPOS + 2 * slots) * 8 // _ALINEACION) * _ALINEACION
+        self._memoria = shared_memory.SharedMemory(
+            create=True, size=self._offset_frames + slots * tamano_frame
+        )
+        self._mapear()
+        self._encabezado[:] = 0
+        self._encabezado[_SLOT_PUBLICADO] = -1
+        self._encabezado[_SLOT_EN_USO] = -1
+        self._secuencias[:] = 0
+
+        # Estado local del lector
+        self._entregada = 0
+
+    def _mapear(self):
+        buffer = self._memoria.buf
+        self._encabezado = np.ndarray((_CAMPOS,), np.int64, buffer, 0)
+        self._secuencias = np.ndarray((self.slots,), np.int64, buffer, _CAMPOS * 8)
+        self._instantes = np.ndarray((self.slots,), np.float64, buffer, (_CAMPOS + self.slots) * 8)
+        self._frames = np.ndarray((self.slots,) + self.forma, np.uint8, buffer, self._offset_frames)
+
+    # Se pasa a otro proceso por nombre (la memoria no se copia)
+    def __getstate__(self):
+        return {
+            'nombre': self._memoria.name,
+            'slots': self.slots,
+            'forma': self.forma,
+            'offset': self._offset_frames,
+            'condicion': self._condicion
+        }
+
+    def __setstate__(self, estado):
+        self.slots = estado['slots']
+        self.forma = estado['forma']
+        self._offset_frames = estado['offset']
+        self._condicion = estado['condicion']
+        self._creador = False
+        self._memoria = shared_memory.SharedMemory(name=estado['nombre'])
+        self._mapear()
+        self._entregada = 0
+
+    # ========================================
+    # LADO DE CAPTURA
+    # ========================================
+
+    def reservar(self):
+        """
+        Devuelve (slot, vista escribible) de un slot que nadie está leyendo
+        """
+        with self._condicion:
+            ocupados = (self._encabezado[_SLOT_PUBLICADO], self._encabezado[_SLOT_EN_USO])
+            siguiente = (self._encabezado[_SLOT_PUBLICADO] + 1) % self.slots
+            while siguiente in ocupados:
+                siguiente = (siguiente + 1) % self.slots
+        return siguiente, self._frames[siguiente]
+
+    def publicar(self, slot, instante=None):
+        """Marca el slot como el frame más reciente y despierta al lector"""
+        with self._condicion:
+            secuencia = self._encabezado[_PUBLICADA] + 1
+            self._secuencias[slot] = secuencia
+            self._instantes[slot] = time.time() if instante is None else instante
+            self._encabezado[_PUBLICADA] = secuencia
+            self._encabezado[_SLOT_PUBLICADO] = slot
+            self._encabezado[_CAPTURADOS] += 1
+            self._condicion.notify_all()
+
+    def escribir(self, frame):
+        """Copia un frame ya existente al anillo (si no se pudo leer en el slot)"""
+        slot, vista = self.reservar()
+        np.copyto(vista, frame)
+        self.publicar(slot)
+
+    def marcar_estado(self, estado):
+        with self._condicion:
+            self._encabezado[_ESTADO] = estado
+            self._condicion.notify_all()
+
+    def terminar(self):
+        """La captura no publicará más frames"""
+        with self._condicion:
+            self._encabezado[_FIN] = 1
+            self._condicion.notify_all()
+
+    def terminada(self):
+        return bool(self._encabezado[_FIN])
+
+    # ========================================
+    # LADO DE ANÁLISIS (un solo lector)
+    # ========================================
+
+    def esperar_estado(self, timeout=10.0):
+        with self._condicion:
+            self._condicion.wait_for(lambda: self._encabezado[_ESTADO] != ABRIENDO, timeout=timeout)
+            return int(self._encabezado[_ESTADO])
+
+    def leer(self, timeout=2.0):
+        """
+        Devuelve (ret, vista de solo lectura, secuencia, instante de captura)
+        del frame más reciente no entregado. La vista es válida hasta la
+        siguiente lectura: el escritor nunca reutiliza el slot en uso
+        """
+        with self._condicion:
+            hay_nuevo = self._condicion.wait_for(
+                lambda: self._encabezado[_PUBLICADA] > self._entregada or self._encabezado[_FIN],
+                timeout=timeout
+            )
+            if not hay_nuevo or self._encabezado[_PUBLICADA] == self._entregada:
+                self._encabezado[_SLOT_EN_USO] = -1
+                return False, None, self._entregada, 0.0
+
+            slot = int(self._encabezado[_SLOT_PUBLICADO])
+            self._encabezado[_SLOT_EN_USO] = slot
+            self._entregada = int(self._secuencias[slot])
+            instante = float(self._instantes[slot])
+
+        vista = self._frames[slot]
+        vista.flags.writeable = False
+        return True, vista, self._entregada, instante
+
+    def capturados(self):
+        return int(self._encabezado[_CAPTURADOS])
+
+    def cerrar(self):
+        """Libera la memoria (el proceso creador además la destruye)"""
+        self._encabezado = self._secuencias = self._instantes = self._frames = None
+        self._memoria.close()
+        if self._creador:
+            self._memoria.unlink()
+
+
+def _proceso_captura(anillo, fuente, buffer_size, fourcc):
+    """
+    Proceso lector del driver: escribe cada frame directo en un slot libre
+    """
+    import cv2
+    from captura_frames import configurar_captura
+
+    alto, ancho = anillo.forma[:2]
+    cap = cv2.VideoCapture(fuente)
+    if not cap.isOpened():
+        anillo.marcar_estado(FALLIDA)
+        anillo.cerrar()
+        return
+
+    configurar_captura(cap, ancho, alto, buffer_size, fourcc)
+    anillo.marcar_estado(ABIERTA)
+
+    try:
+        while not anillo._encabezado[_FIN]:
+            slot, vista = anillo.reservar()
+            ret, frame = cap.read(vista)
+            if not ret:
+                break
+            if frame is not vista and frame.ctypes.data != vista.ctypes.data:
+                # El driver no respetó el buffer (otra resolución): ajustar
+                if frame.shape != vista.shape:
+                    frame = cv2.resize(frame, (ancho, alto))
+                np.copyto(vista, frame)
+            anillo.publicar(slot)
+    finally:
+        anillo.terminar()
+        cap.release()
+        anillo.cerrar()
+
+
+class CapturaMemoriaCompartida:
+    def __init__(self, fuente=0, ancho=640, alto=480, buffer_size=1, fourcc=None, slots=3,
+                 timeout_apertura=10.0):
+        """
+        Misma interfaz que CapturaUltimoFrame, con la lectura del driver en
+        otro proceso y los frames en memoria compartida
+        """
+        contexto = multiprocessing.get_context('spawn')
+        self.anillo = AnilloFrames(slots, (alto, ancho, 3), contexto)
+        self.proceso = contexto.Process(
+            target=_proceso_captura,
+            args=(self.anillo, fuente, buffer_size, fourcc),
+            daemon=True
+        )
+        self.proceso.start()
+        self._abierta = self.anillo.esperar_estado(timeout_apertura) == ABIERTA
+
+        # Métricas
+        self.frames_entregados = 0
+        self.t_ultimo_entregado = 0.0
+        self._latencia_total = 0.0
+        self._latencia_max = 0.0
+        self._latencias_medidas = 0
+
+    def isOpened(self):
+        return self._abierta
+
+    def iniciar(self):
+        # El proceso de captura ya está corriendo
+        return self
+
+    def activa(self):
+        return not self.anillo.terminada() and self.proceso.is_alive()
+
+    def read(self, timeout=2.0):
+        ret, frame, _, instante = self.anillo.leer(timeout)
+        if ret:
+            self.frames_entregados += 1
+            self.t_ultimo_entregado = instante
+        return ret, frame
+
+    def registrar_analisis(self):
+        if self.t_ultimo_entregado == 0.0:
+            return
+
+        latencia = time.time() - self.t_ultimo_entregado
+        self._latencia_total += latencia
+        self._latencias_medidas += 1
+        if latencia > self._latencia_max:
+            self._latencia_max = latencia
+
+    def estadisticas(self):
+        media = self._latencia_total / self._latencias_medidas if self._latencias_medidas else 0.0
+        capturados = self.anillo.capturados()
+        return {
+            'frames_capturados': capturados,
+            'frames_entregados': self.frames_entregados,
+            'frames_descartados': max(0, capturados - self.frames_entregados),
+            'latencia_media_ms': round(media * 1000, 1),
+            'latencia_max_ms': round(self._latencia_max * 1000, 1)
+        }
+
+    def release(self):
+        self.anillo.terminar()
+        self.proceso.join(timeout=2)
+        if self.proceso.is_alive():
+            self.proceso.terminate()
+        self.anillo.cerrar()
+
+
+# ========================================
+# MICROBENCHMARK: ANILLO VS multiprocessing.Queue
+# ========================================
+
+def _productor_cola(cola, forma, cantidad, arrancar):
+    frame = np.random.default_rng(0).integers(0, 255, forma, dtype=np.uint8)
+    arrancar.wait()
+    for _ in range(cantidad):
+        cola.put((time.time(), frame))
+    cola.put(None)
+
+
+def _productor_anillo(anillo, cantidad, arrancar):
+    frame = np.random.default_rng(0).integers(0, 255, anillo.forma, dtype=np.uint8)
+    anillo.marcar_estado(ABIERTA)
+    arrancar.wait()
+    for _ in range(cantidad):
+        # Simula al driver escribiendo en el slot (la copia de la captura)
+        slot, vista = anillo.reservar()
+        np.copyto(vista, frame)
+        anillo.publicar(slot)
+    anillo.terminar()
+    anillo.cerrar()
+
+
+def comparar_transporte(cantidad=500, forma=(480, 640, 3)):
+    """
+    El consumidor recorre cada frame recibido (suma de una fila) y mide
+    frames/s y latencia productor -> consumidor. El tiempo corre desde que
+    se libera al productor (sin contar el arranque del proceso)
+    """
+    contexto = multiprocessing.get_context('spawn')
+    resultados = {}
+
+    # multiprocessing.Queue: cada frame se serializa y copia
+    cola = contexto.Queue(maxsize=4)
+    arrancar = contexto.Event()
+    productor = contexto.Process(target=_productor_cola, args=(cola, forma, cantidad, arrancar))
+    productor.start()
+    recibidos, latencias = 0, []
+    inicio = time.perf_counter()
+    arrancar.set()
+    while True:
+        item = cola.get()
+        if item is None:
+            break
+        instante, frame = item
+        int(frame[forma[0] // 2].sum())
+        latencias.append(time.time() - instante)
+        recibidos += 1
+    duracion = time.perf_counter() - inicio
+    productor.join()
+    resultados['queue'] = (recibidos, duracion, latencias)
+
+    # Anillo en memoria compartida: solo se entrega una vista
+    anillo = AnilloFrames(3, forma, contexto)
+    arrancar = contexto.Event()
+    productor = contexto.Process(target=_productor_anillo, args=(anillo, cantidad, arrancar))
+    productor.start()
+    anillo.esperar_estado()
+    recibidos, latencias = 0, []
+    inicio = time.perf_counter()
+    arrancar.set()
+    while True:
+        ret, frame, _, instante = anillo.leer(timeout=5)
+        if not ret:
+            break
+        int(frame[forma[0] // 2].sum())
+        latencias.append(time.time() - instante)
+        recibidos += 1
+    duracion = time.perf_counter() - inicio
+    productor.join()
+    anillo.cerrar()
+    resultados['anillo'] = (recibidos, duracion, latencias)
+
+    return {
+        nombre: {
+            'frames_recibidos': recibidos,
+            'frames_por_s': round(recibidos / duracion, 1),
+            'latencia_media_ms': round(sum(latencias) / len(latencias) * 1000, 2) if latencias else 0.0,
+            'latencia_max_ms': round(max(latencias) * 1000, 2) if latencias else 0.0
+        }
+        for nombre, (recibidos, duracion, latencias) in resultados.items()
+    }
+
+
+# ========================================
+# PRUEBA DEL MÓDULO
+# ========================================
+
+if __name__ == "__main__":
+    import sys
+
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    print("="*60)
+    print("ANILLO EN MEMORIA COMPARTIDA VS multiprocessing.Queue (640x480x3)")
+    print("="*60)
+    for nombre, datos in comparar_transporte(cantidad).items():
+        print(f"{nombre:>7}: {datos}")
+    print("\n(el anillo entrega siempre el frame más reciente: si el consumidor")
+    print(" es más lento que el productor, los intermedios se descartan)")
@@ -0,0 +1,118 @@
+"""
+Módulo de Apertura Ocular
+Señal continua de ojos abiertos/cerrados calculada con NumPy sobre el ROI
+del rostro, más una máquina de estados con histéresis para contar parpadeos
+"""
+
+import numpy as np
+
+# Banda de ojos dentro de la mitad superior del rostro (fracciones del ROI)
+BANDA_OJOS_DEFECTO = (0.45, 0.95, 0.10, 0.90)
+
+
+def calcular_apertura(roi_gray, banda=BANDA_OJOS_DEFECTO, factor_oscuro=0.6):
+    """
+    Proporción de píxeles oscuros (pupila, iris, pestañas) en la banda de ojos.
+
+    roi_gray: mitad superior del rostro en escala de grises
+    banda: (y0, y1, x0, x1) como fracciones del ROI
+    factor_oscuro: un píxel es oscuro si vale menos que factor * mediana de la banda
+
+    Con los ojos cerrados el párpado cubre la zona oscura y el valor cae.
+    """
+    alto, ancho = roi_gray.shape[:2]
+    y0, y1, x0, x1 = banda
+    zona = roi_gray[int(alto * y0):int(alto * y1), int(ancho * x0):int(ancho * x1)]
+
+    if zona.size == 0:
+        return 0.0
+
+    # La mediana de la piel hace el umbral independiente de la iluminación
+    umbral = np.median(zona) * factor_oscuro
+    return np.count_nonzero(zona < umbral) / zona.size
+
+
+def banda_desde_ojos(ojos, alto_roi, ancho_roi):
+    """
+    Ajusta la banda de ojos a partir de cajas Haar (relativas al ROI).
+    Se descarta el tercio superior de las cajas, donde suelen caer las cejas
+    """
+    if len(ojos) < 2:
+        return None
+
+    cajas = np.asarray(ojos, dtype=float)
+    y0 = cajas[:, 1].min()
+    y1 = (cajas[:, 1] + cajas[:, 3]).max()
+    x0 = cajas[:, 0].min()
+    x1 = (cajas[:, 0] + cajas[:, 2]).max()
+
+    alto = y1 - y0
+    return (
+        max(0.0, (y0 + alto * 0.35) / alto_roi),
+        min(1.0, (y1 - alto * 0.15) / alto_roi),
+        max(0.0, x0 / ancho_roi),
+        min(1.0, x1 / ancho_roi)
+    )
+
+
+class MaquinaParpadeo:
+    def __init__(self, umbral_cierre=0.55, umbral_apertura=0.75, frames_minimos=2,
+                 frames_maximos=15, frames_calibracion=10, alfa_base=0.05):
+        """
+        Detecta parpadeos sobre la señal de apertura relativa a una línea base.
+
+        umbral_cierre / umbral_apertura: histéresis sobre apertura / base
+        frames_minimos / frames_maximos: duración válida de un parpadeo
+            (cierres más largos se consideran ojos cerrados, no parpadeo)
+        frames_calibracion: frames iniciales para estimar la línea base
+        alfa_base: peso del promedio móvil de la línea base (solo con ojos abiertos)
+        """
+        self.umbral_cierre = umbral_cierre
+        self.umbral_apertura = umbral_apertura
+        self.frames_minimos = frames_minimos
+        self.frames_maximos = frames_maximos
+        self.frames_calibracion = frames_calibracion
+        self.alfa_base = alfa_base
+
+        self.linea_base = None
+        self._muestras_calibracion = []
+        self.cerrados = False
+        self.frames_cerrados = 0
+
+    def actualizar(self, apertura):
+        """
+        Procesa una muestra. Devuelve (ojos_cerrados, parpadeo_completado)
+        """
+        # Calibración inicial (se asumen ojos abiertos)
+        if self.linea_base is None:
+            self._muestras_calibracion.append(apertura)
+            if len(self._muestras_calibracion) >= self.frames_calibracion:
+                self.linea_base = float(np.median(self._muestras_calibracion))
+                self._muestras_calibracion = []
+            return False, False
+
+        relativa = apertura / self.linea_base if self.linea_base > 0 else 1.0
+        parpadeo = False
+
+        if self.cerrados:
+            if relativa > self.umbral_apertura:
+                parpadeo = self.frames_minimos <= self.frames_cerrados <= self.frames_maximos
+                self.cerrados = False
+                self.frames_cerrados = 0
+            else:
+                self.frames_cerrados += 1
+        elif relativa < self.umbral_cierre:
+            self.cerrados = True
+            self.frames_cerrados = 1
+        else:
+            # Seguir cambios lentos de iluminación
+            self.linea_base += self.alfa_base * (apertura - self.linea_base)
+
+        return self.cerrados, parpadeo
+
+    def reiniciar(self):
+        """Fuerza una nueva calibración (ej. al perder el rostro)"""
+        self.linea_base = None
+        self._muestras_calibracion = []
+        self.cerrados = False
+        self.frames_cerrados = 0
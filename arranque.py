@@ -0,0 +1,107 @@
+"""
+Arranque en Paralelo
+Imports diferidos con medición de tiempo y pasos de inicialización que
+corren a la vez (voz, cámara, cascadas, Prolog, BD). La apertura de la
+cámara, la carga de XML y la consulta Prolog son llamadas nativas que
+liberan el GIL, así que se solapan de verdad
+"""
+
+import importlib
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TiemposArranque:
+    def __init__(self, salida=print):
+        """
+        Registro de segundos por paso de arranque (imports y subsistemas)
+
+        salida: función que recibe cada línea del reporte
+        """
+        self.salida = salida
+        self.tiempos = {}
+        self.en_curso = set()
+        self._lock = threading.Lock()
+        self._inicio = time.perf_counter()
+
+    def registrar(self, nombre, segundos):
+        with self._lock:
+            self.tiempos[nombre] = segundos
+
+    def medir(self, nombre, funcion, *args, **kwargs):
+        """Ejecuta funcion y registra su duración bajo 'nombre'"""
+        with self._lock:
+            self.en_curso.add(nombre)
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.tiempos[nombre] = time.perf_counter() - inicio
+                self.en_curso.discard(nombre)
+
+    def importar(self, modulo):
+        """Import diferido; solo se registra si el módulo no estaba cargado"""
+        if modulo in sys.modules:
+            return sys.modules[modulo]
+        return self.medir(f"import {modulo}", importlib.import_module, modulo)
+
+    def en_paralelo(self, tareas):
+        """
+        tareas: {nombre: función sin argumentos}. Corre todas a la vez y
+        devuelve {nombre: resultado}; si alguna falla, relanza el primer
+        error después de esperar al resto
+        """
+        with ThreadPoolExecutor(max_workers=len(tareas), thread_name_prefix='arranque') as ejecutor:
+            futuros = {nombre: ejecutor.submit(self.medir, nombre, funcion)
+                       for nombre, funcion in tareas.items()}
+        return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+    def en_segundo_plano(self, nombre, funcion):
+        """Paso que no demora el arranque (ej. conectar a MySQL)"""
+        def ejecutar():
+            try:
+                self.medir(nombre, funcion)
+            except Exception as e:
+                print(f"⚠️ {nombre}: {e}")
+
+        hilo = threading.Thread(target=ejecutar, name=f"arranque-{nombre}", daemon=True)
+        hilo.start()
+        return hilo
+
+    def reportar(self):
+        """Imprime los tiempos registrados y el total desde la creación"""
+        total = time.perf_counter() - self._inicio
+        with self._lock:
+            tiempos = sorted(self.tiempos.items(), key=lambda item: -item[1])
+            en_curso = sorted(self.en_curso)
+
+        self.salida(f"⏱ Arranque en {total:.2f} s")
+        for nombre, segundos in tiempos:
+            self.salida(f"  {nombre:<32}{segundos * 1000:>9.1f} ms")
+        for nombre in en_curso:
+            self.salida(f"  {nombre:<32}{'en curso':>12}")
+        return total
+
+
+# ========================================
+# PRUEBA DEL MÓDULO
+# ========================================
+
+if __name__ == "__main__":
+    arranque = TiemposArranque()
+
+    for modulo in ('numpy', 'cv2', 'requests', 'mysql.connector'):
+        try:
+            arranque.importar(modulo)
+        except ImportError as e:
+            print(f"⚠️ {modulo} no disponible: {e}")
+
+    # Tres esperas de 0.5 s: en paralelo tardan ~0.5 s, no 1.5 s
+    inicio = time.perf_counter()
+    arranque.en_paralelo({f"paso {i}": lambda: time.sleep(0.5) for i in range(3)})
+    print(f"3 pasos de 0.5 s en paralelo: {time.perf_counter() - inicio:.2f} s\n")
+
+    arranque.reportar()
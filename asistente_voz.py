@@ -1,131 +1,257 @@
 """
 Módulo de Síntesis de Voz - VERSIÓN ROBUSTA
-Reinicia el motor entre mensajes para mayor confiabilidad
+Un proceso de voz persistente mantiene el motor vivo; las frases fijas se
+reproducen desde una caché de audio en disco. Sin proceso, reinicia el
+motor entre mensajes (modo robusto original)
 """
 
-import pyttsx3
+import os
+import threading
 import time
 
+from proceso_voz import ProcesoVoz
+
+# Frases fijas: se pre-renderizan a disco al iniciar
+FRASES = {
+    'bienvenida': "Bienvenido al sistema de salud ocupacional. Tu sesión ha comenzado.",
+    'ventilacion': "Se recomienda mejorar la ventilación.",
+    'audifonos': "Considera utilizar audífonos con cancelación de ruido.",
+    'pausa': "Es momento de tomar una pausa de cinco minutos.",
+    'fatiga_visual': "Se han detectado signos de fatiga visual.",
+    'descanso_vista': "Descansa la vista mirando a lo lejos durante veinte segundos.",
+    'postura': "Tu postura no es correcta.",
+    'ajustar_postura': "Ajusta tu posición y realiza algunos estiramientos.",
+    'despedida': "Que tengas un excelente día.",
+    'visual_inicio': "Ejercicio visual veinte, veinte, veinte.",
+    'visual_apartar': "Aparta la mirada de la pantalla.",
+    'visual_objeto': "Busca un objeto a seis metros de distancia.",
+    'visual_concentrar': "Concéntrate en ese objeto durante veinte segundos.",
+    'visual_fin': "Perfecto. Ejercicio completado.",
+    'cuello_inicio': "Estiramiento de cuello.",
+    'cuello_derecha': "Inclina lentamente tu cabeza hacia el hombro derecho.",
+    'cuello_mantener': "Mantén cinco segundos.",
+    'cuello_centro': "Regresa al centro.",
+    'cuello_izquierda': "Ahora inclina hacia el hombro izquierdo.",
+    'cuello_fin': "Regresa al centro. Ejercicio completado."
+}
+
+
 class AsistenteVozRobusto:
-    def __init__(self):
-        """Inicializa configuración de voz"""
+    def __init__(self, en_proceso=True, directorio_cache='cache_voz'):
+        """
+        Inicializa configuración de voz
+
+        en_proceso: usar el proceso de voz persistente con caché de frases
+            (False = motor nuevo por mensaje)
+        directorio_cache: carpeta de audios pre-renderizados
+        """
         self.velocidad = 150
         self.volumen = 1.0
+        self.tiempos_primer_audio = []
+        self.proceso = None
+        # Mensajes esperando o en curso de síntesis
+        self.mensajes_en_cola = 0
+        self._lock_cola = threading.Lock()
+
+        if en_proceso:
+            try:
+                self.proceso = ProcesoVoz(self.velocidad, self.volumen, directorio_cache)
+                pendientes = self.proceso.precalentar(FRASES.values())
+                print(f"✓ Asistente de voz inicializado (proceso persistente, "
+                      f"{len(FRASES) - pendientes}/{len(FRASES)} frases en caché)")
+                return
+            except Exception as e:
+                print(f"⚠️ Proceso de voz no disponible, se usa modo robusto: {e}")
+                self.proceso = None
+
         print("✓ Asistente de voz inicializado (modo robusto)")
-    
-    def hablar(self, texto):
+
+    def hablar(self, texto, cachear=False):
         """
-        Convierte texto a voz con motor independiente
+        Convierte texto a voz (cachear=True para frases fijas)
         """
+        print(f"🔊 Diciendo: {texto}")
+
+        with self._lock_cola:
+            self.mensajes_en_cola += 1
         try:
-            print(f"🔊 Diciendo: {texto}")
-            
-            # Crear motor nuevo para cada mensaje
+            if self.proceso is not None:
+                tiempo = self.proceso.hablar(texto, cachear)
+            else:
+                tiempo = self._hablar_motor_nuevo(texto)
+        finally:
+            with self._lock_cola:
+                self.mensajes_en_cola -= 1
+
+        if tiempo is not None:
+            self.tiempos_primer_audio.append(tiempo)
+
+        # Pausa entre mensajes
+        time.sleep(0.5)
+
+    def frase(self, clave):
+        """Dice una frase fija (desde la caché de audio)"""
+        self.hablar(FRASES[clave], cachear=True)
+
+    def _hablar_motor_nuevo(self, texto):
+        """
+        Motor independiente por mensaje (modo robusto original)
+        """
+        try:
+            inicio = time.time()
+            primer_audio = {}
+
+            # Crear motor nuevo para cada mensaje (pyttsx3 solo se importa en este modo)
+            import pyttsx3
             engine = pyttsx3.init()
             engine.setProperty('rate', self.velocidad)
             engine.setProperty('volume', self.volumen)
-            
+            engine.connect('started-utterance',
+                           lambda name: primer_audio.setdefault('t', time.time()))
+
             # Hablar
             engine.say(texto)
             engine.runAndWait()
-            
+
             # Limpiar
             engine.stop()
             del engine
-            
-            # Pausa entre mensajes
-            time.sleep(0.5)
-            
+
+            return primer_audio.get('t', time.time()) - inicio
+
         except Exception as e:
             print(f"❌ Error: {e}")
-    
+            return None
+
+    def estadisticas(self):
+        """Tiempo hasta el primer audio de los mensajes dichos"""
+        tiempos = self.tiempos_primer_audio
+        if not tiempos:
+            return {'mensajes': 0}
+        return {
+            'mensajes': len(tiempos),
+            'primer_audio_medio_ms': round(sum(tiempos) / len(tiempos) * 1000, 1),
+            'primer_audio_max_ms': round(max(tiempos) * 1000, 1)
+        }
+
+    def cerrar(self):
+        if self.proceso is not None:
+            self.proceso.cerrar()
+            self.proceso = None
+
     # ========================================
     # MENSAJES DEL SISTEMA
     # ========================================
     
     def bienvenida(self):
-        self.hablar("Bienvenido al sistema de salud ocupacional. Tu sesión ha comenzado.")
+        self.frase('bienvenida')
     
     def alerta_co2_alto(self, valor):
         self.hablar(f"Atención. Nivel de dióxido de carbono elevado: {valor} partes por millón.")
         time.sleep(1)
-        self.hablar("Se recomienda mejorar la ventilación.")
+        self.frase('ventilacion')
     
     def alerta_ruido_alto(self, valor):
         self.hablar(f"Nivel de ruido elevado: {valor} decibeles.")
         time.sleep(1)
-        self.hablar("Considera utilizar audífonos con cancelación de ruido.")
+        self.frase('audifonos')
     
     def recordatorio_pausa(self, minutos):
         self.hablar(f"Has trabajado {minutos} minutos sin descanso.")
         time.sleep(1)
-        self.hablar("Es momento de tomar una pausa de cinco minutos.")
+        self.frase('pausa')
     
     def alerta_fatiga_visual(self):
-        self.hablar("Se han detectado signos de fatiga visual.")
+        self.frase('fatiga_visual')
         time.sleep(1)
-        self.hablar("Descansa la vista mirando a lo lejos durante veinte segundos.")
+        self.frase('descanso_vista')
     
     def alerta_fatiga_postural(self):
-        self.hablar("Tu postura no es correcta.")
+        self.frase('postura')
         time.sleep(1)
-        self.hablar("Ajusta tu posición y realiza algunos estiramientos.")
+        self.frase('ajustar_postura')
     
     def despedida(self, minutos_totales):
         self.hablar(f"Sesión finalizada. Has trabajado {minutos_totales} minutos.")
         time.sleep(1)
-        self.hablar("Que tengas un excelente día.")
+        self.frase('despedida')
     
     # ========================================
     # GUÍAS DE EJERCICIOS
     # ========================================
     
+    def pasos_ejercicio_20_20_20(self):
+        """
+        Guía como secuencia de pasos: funciones o segundos de espera
+        (la ejecuta el planificador de alertas con esperas interrumpibles)
+        """
+        return [
+            lambda: print("\n🎯 Iniciando ejercicio visual 20-20-20\n"),
+            lambda: self.frase('visual_inicio'), 2,
+            lambda: self.frase('visual_apartar'), 2,
+            lambda: self.frase('visual_objeto'), 2,
+            lambda: self.frase('visual_concentrar'),
+            lambda: print("   [Esperando 20 segundos...]"), 20,
+            lambda: self.frase('visual_fin')
+        ]
+    
+    def pasos_estiramiento_cuello(self):
+        return [
+            lambda: print("\n🎯 Iniciando estiramiento de cuello\n"),
+            lambda: self.frase('cuello_inicio'), 2,
+            lambda: self.frase('cuello_derecha'), 3,
+            lambda: self.frase('cuello_mantener'), 5,
+            lambda: self.frase('cuello_centro'), 2,
+            lambda: self.frase('cuello_izquierda'), 3,
+            lambda: self.frase('cuello_mantener'), 5,
+            lambda: self.frase('cuello_fin')
+        ]
+    
+    def _ejecutar_pasos(self, pasos):
+        for paso in pasos:
+            if isinstance(paso, (int, float)):
+                time.sleep(paso)
+            else:
+                paso()
+    
     def guiar_ejercicio_20_20_20(self):
-        print("\n🎯 Iniciando ejercicio visual 20-20-20\n")
-        
-        self.hablar("Ejercicio visual veinte, veinte, veinte.")
-        time.sleep(2)
-        
-        self.hablar("Aparta la mirada de la pantalla.")
-        time.sleep(2)
-        
-        self.hablar("Busca un objeto a seis metros de distancia.")
-        time.sleep(2)
-        
-        self.hablar("Concéntrate en ese objeto durante veinte segundos.")
-        print("   [Esperando 20 segundos...]")
-        time.sleep(20)
-        
-        self.hablar("Perfecto. Ejercicio completado.")
+        self._ejecutar_pasos(self.pasos_ejercicio_20_20_20())
     
     def guiar_estiramiento_cuello(self):
-        print("\n🎯 Iniciando estiramiento de cuello\n")
-        
-        self.hablar("Estiramiento de cuello.")
-        time.sleep(2)
-        
-        self.hablar("Inclina lentamente tu cabeza hacia el hombro derecho.")
-        time.sleep(3)
-        
-        self.hablar("Mantén cinco segundos.")
-        time.sleep(5)
-        
-        self.hablar("Regresa al centro.")
-        time.sleep(2)
-        
-        self.hablar("Ahora inclina hacia el hombro izquierdo.")
-        time.sleep(3)
-        
-        self.hablar("Mantén cinco segundos.")
-        time.sleep(5)
-        
-        self.hablar("Regresa al centro. Ejercicio completado.")
+        self._ejecutar_pasos(self.pasos_estiramiento_cuello())
 
 # ========================================
 # PRUEBA DEL MÓDULO
 # ========================================
 
 if __name__ == "__main__":
+    import sys
+    
+    if '--medir' in sys.argv:
+        # Tiempo hasta el primer audio: motor por mensaje vs proceso + caché
+        print("="*60)
+        print("TIEMPO HASTA PRIMER AUDIO")
+        print("="*60 + "\n")
+        claves = ['bienvenida', 'fatiga_visual', 'visual_inicio', 'cuello_inicio', 'pausa']
+        
+        antes = AsistenteVozRobusto(en_proceso=False)
+        for clave in claves:
+            antes.frase(clave)
+        
+        despues = AsistenteVozRobusto()
+        # Esperar a que termine el pre-renderizado (primer uso de la caché)
+        for _ in range(60):
+            if all(os.path.exists(despues.proceso.ruta(FRASES[c])) for c in claves):
+                break
+            time.sleep(1)
+        for clave in claves:
+            despues.frase(clave)
+        despues.cerrar()
+        
+        print(f"\nMotor nuevo por mensaje: {antes.estadisticas()}")
+        print(f"Proceso persistente + caché: {despues.estadisticas()}")
+        sys.exit(0)
+    
     print("="*60)
     print("PRUEBA DEL ASISTENTE DE VOZ - VERSIÓN ROBUSTA")
     print("="*60 + "\n")
@@ -157,4 +283,6 @@ if __name__ == "__main__":
     if respuesta.lower() == 's':
         asistente.guiar_ejercicio_20_20_20()
     
+    print(f"\nTiempo hasta primer audio: {asistente.estadisticas()}")
+    asistente.cerrar()
     print("\n✓ Prueba completada")
\ No newline at end of file
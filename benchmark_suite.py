@@ -0,0 +1,426 @@
+"""
+Suite de Benchmarks del Pipeline Python
+Mide las etapas del detector, las consultas Prolog y el registro a BD sin
+cámara ni servidor MySQL. Entradas fijas (semilla) y resultados en JSON para
+comparar corridas y detectar regresiones
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from detector_fatiga_real import DetectorFatigaReal
+from escritor_detecciones import EscritorDetecciones
+
+SEMILLA = 42
+FPS_STREAM = 30
+
+
+# ========================================
+# ENTRADAS FIJAS
+# ========================================
+
+class FuenteLista:
+    """Fuente en memoria con la interfaz de cv2.VideoCapture"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.indice = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.indice >= len(self.frames):
+            return False, None
+        frame = self.frames[self.indice]
+        self.indice += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def frames_sinteticos(cantidad=60, semilla=SEMILLA):
+    """
+    Frames 640x480 reproducibles: fondo con ruido y un rostro dibujado que se
+    desplaza (la cascada recorre el frame completo igual que con cámara)
+    """
+    rng = np.random.default_rng(semilla)
+    fondo = rng.integers(60, 120, (480, 640, 3), dtype=np.uint8)
+    frames = []
+    for i in range(cantidad):
+        frame = fondo.copy()
+        cx, cy = 320 + int(40 * np.sin(i / 10)), 220 + int(20 * np.cos(i / 15))
+        cv2.ellipse(frame, (cx, cy), (80, 105), 0, 0, 360, (150, 170, 200), -1)
+        for dx in (-32, 32):
+            cv2.ellipse(frame, (cx + dx, cy - 25), (16, 7 if i % 20 else 1), 0, 0, 360, (40, 30, 30), -1)
+        cv2.ellipse(frame, (cx, cy + 45), (30, 8), 0, 0, 360, (60, 60, 140), -1)
+        frames.append(frame)
+    return frames
+
+
+def frames_video(ruta, cantidad=60):
+    """Primeros 'cantidad' frames del video, cargados en memoria"""
+    cap = cv2.VideoCapture(ruta)
+    frames = []
+    while len(frames) < cantidad:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise ValueError(f"No se pudieron leer frames de {ruta}")
+    return frames
+
+
+class RelojVirtual:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+# ========================================
+# BASE DE DATOS LOCAL (sqlite en memoria)
+# ========================================
+
+class _CursorSQLite:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def executemany(self, query, filas):
+        self.cursor.executemany(query.replace('%s', '?'), filas)
+
+    def close(self):
+        self.cursor.close()
+
+
+class _ConexionSQLite:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def cursor(self):
+        return _CursorSQLite(self.conexion.cursor())
+
+    def commit(self):
+        self.conexion.commit()
+
+    def rollback(self):
+        self.conexion.rollback()
+
+
+class PoolSQLite:
+    """Reemplazo local del pool MySQL para EscritorDetecciones (mismas consultas)"""
+
+    def __init__(self):
+        self._conexion = sqlite3.connect(':memory:', check_same_thread=False)
+        self._conexion.execute("""
+            CREATE TABLE deteccion_fatiga (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sesion_id INTEGER NOT NULL,
+                tipo_fatiga TEXT NOT NULL,
+                nivel_fatiga TEXT NOT NULL,
+                indicador TEXT,
+                frecuencia_parpadeo INTEGER,
+                postura_detectada TEXT,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    @contextmanager
+    def conexion(self, timeout=10):
+        yield _ConexionSQLite(self._conexion)
+
+    def filas(self):
+        return self._conexion.execute("SELECT COUNT(*) FROM deteccion_fatiga").fetchone()[0]
+
+
+# ========================================
+# MEDICIÓN
+# ========================================
+
+def resumir_tiempos(tiempos):
+    """Estadísticas en ms de una lista de duraciones en segundos"""
+    ordenados = sorted(tiempos)
+    n = len(ordenados)
+    return {
+        'n': n,
+        'media_ms': round(sum(ordenados) / n * 1000, 6),
+        'p50_ms': round(ordenados[n // 2] * 1000, 6),
+        'p95_ms': round(ordenados[int(0.95 * (n - 1))] * 1000, 6),
+        'min_ms': round(ordenados[0] * 1000, 6),
+        'max_ms': round(ordenados[-1] * 1000, 6)
+    }
+
+
+def _crear_detector(frames=(), archivo_prolog=None, reloj=time.time, **opciones):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return DetectorFatigaReal(
+            None, archivo_prolog=archivo_prolog, fuente_video=FuenteLista(list(frames)),
+            mostrar_video=False, reloj=reloj, **opciones
+        )
+
+
+def bench_detectar_rostro_ojos(frames, repeticiones=3, **opciones):
+    """Cascadas de rostro y ojos sobre el set fijo de frames (un detector nuevo por pasada)"""
+    tiempos = []
+    con_rostro = 0
+    for _ in range(repeticiones):
+        detector = _crear_detector(**opciones)
+        for frame in frames:
+            inicio = time.perf_counter()
+            rostro, _, _ = detector.detectar_rostro_ojos(frame)
+            tiempos.append(time.perf_counter() - inicio)
+            con_rostro += rostro is not None
+    resultado = resumir_tiempos(tiempos)
+    resultado['frames_con_rostro'] = con_rostro // repeticiones
+    resultado['opciones'] = opciones
+    return resultado
+
+
+def bench_stream_sintetico(segundos=600, semilla=SEMILLA):
+    """
+    detectar_parpadeo / analizar_postura / calcular_nivel_fatiga con un
+    stream simulado de 30 fps (reloj virtual, parpadeos y posturas con semilla)
+    """
+    rng = random.Random(semilla)
+    reloj = RelojVirtual()
+    detector = _crear_detector(reloj=reloj)
+
+    ojos_abiertos = [(10, 10, 20, 20), (50, 10, 20, 20)]
+    tiempos = {'detectar_parpadeo': [], 'analizar_postura': [], 'calcular_nivel_fatiga': []}
+    evaluaciones = 0
+    cerrados = 0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(segundos * FPS_STREAM):
+            reloj.t = i / FPS_STREAM
+
+            # Parpadeo de 4 frames con probabilidad ~20/min
+            if cerrados == 0 and rng.random() < 20 / (60 * FPS_STREAM):
+                cerrados = 4
+            ojos = ojos_abiertos[:1] if cerrados else ojos_abiertos
+            cerrados = max(0, cerrados - 1)
+            rostro = (260 + rng.randint(-20, 20), 140 + rng.randint(-60, 120), 160, 170)
+
+            # Como en procesar_frame: el rostro del frame ya está detectado
+            detector.ultimo_rostro = rostro
+
+            inicio = time.perf_counter()
+            detector.detectar_parpadeo(ojos)
+            t1 = time.perf_counter()
+            detector.analizar_postura(rostro)
+            t2 = time.perf_counter()
+            evaluaciones += detector.calcular_nivel_fatiga() is not None
+            t3 = time.perf_counter()
+
+            tiempos['detectar_parpadeo'].append(t1 - inicio)
+            tiempos['analizar_postura'].append(t2 - t1)
+            tiempos['calcular_nivel_fatiga'].append(t3 - t2)
+
+    resultado = {nombre: resumir_tiempos(valores) for nombre, valores in tiempos.items()}
+    resultado['evaluaciones'] = evaluaciones
+    return resultado
+
+
+def bench_actualizar_prolog(archivo_prolog='salud_ocupacional.pl', repeticiones=200, semilla=SEMILLA):
+    """Ida y vuelta de actualizar_prolog (dos hechos + consulta) contra la base de conocimiento"""
+    detector = _crear_detector(archivo_prolog=archivo_prolog)
+    if detector.prolog is None:
+        return {'omitido': 'SWI-Prolog / pyswip no disponible'}
+
+    rng = random.Random(semilla)
+    niveles = ('bajo', 'moderado', 'alto')
+    tiempos = []
+    altas = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            altas += detector.actualizar_prolog(rng.choice(niveles), rng.choice(niveles))
+            tiempos.append(time.perf_counter() - inicio)
+
+    resultado = resumir_tiempos(tiempos)
+    resultado['fatiga_general_alta'] = altas
+    return resultado
+
+
+def bench_registrar_deteccion(filas=5000, tamano_lote=50):
+    """
+    registrar_deteccion (encolado en el loop de video) y vaciado por lotes
+    del EscritorDetecciones contra sqlite en memoria
+    """
+    pool = PoolSQLite()
+    escritor = EscritorDetecciones(tamano_lote=tamano_lote, capacidad=filas, en_hilo=False, pool=pool)
+    detector = _crear_detector(escritor=escritor)
+    detector.sesion_id = 1
+
+    tiempos = []
+    for i in range(filas):
+        inicio = time.perf_counter()
+        detector.registrar_deteccion('visual' if i % 2 else 'postural', 'moderado', f"Indicador {i}")
+        tiempos.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while escritor.vaciar():
+            pass
+    duracion = time.perf_counter() - inicio
+
+    return {
+        'registrar': resumir_tiempos(tiempos),
+        'vaciado_filas_por_s': round(pool.filas() / duracion, 1) if duracion > 0 else 0.0,
+        'lote': escritor.estadisticas()
+    }
+
+
+# ========================================
+# SUITE
+# ========================================
+
+BENCHMARKS = ('detectar_rostro_ojos', 'stream_sintetico', 'actualizar_prolog', 'registrar_deteccion')
+
+
+def _version_codigo():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def ejecutar_suite(video=None, cantidad_frames=60, solo=None, archivo_prolog='salud_ocupacional.pl'):
+    seleccion = solo or BENCHMARKS
+    frames = frames_video(video, cantidad_frames) if video else frames_sinteticos(cantidad_frames)
+    cv2.setNumThreads(1)
+
+    resultados = {
+        'entorno': {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': _version_codigo(),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'cpus': cv2.getNumberOfCPUs(),
+            'semilla': SEMILLA,
+            'frames': video or f"sinteticos x{len(frames)}"
+        },
+        'benchmarks': {}
+    }
+
+    for nombre in seleccion:
+        print(f"▶ {nombre}...", file=sys.stderr)
+        if nombre == 'detectar_rostro_ojos':
+            resultados['benchmarks'][nombre] = {
+                'completo': bench_detectar_rostro_ojos(frames),
+                'seguimiento_5': bench_detectar_rostro_ojos(frames, intervalo_redeteccion=5),
+                'apertura': bench_detectar_rostro_ojos(frames, metodo_parpadeo='apertura')
+            }
+        elif nombre == 'stream_sintetico':
+            resultados['benchmarks'][nombre] = bench_stream_sintetico()
+        elif nombre == 'actualizar_prolog':
+            resultados['benchmarks'][nombre] = bench_actualizar_prolog(archivo_prolog)
+        elif nombre == 'registrar_deteccion':
+            resultados['benchmarks'][nombre] = bench_registrar_deteccion()
+
+    return resultados
+
+
+def _medianas(datos, prefijo=''):
+    """Aplana {ruta: p50_ms} para comparar corridas"""
+    medianas = {}
+    for clave, valor in datos.items():
+        if isinstance(valor, dict):
+            if 'p50_ms' in valor:
+                medianas[prefijo + clave] = valor['p50_ms']
+            medianas.update(_medianas(valor, f"{prefijo}{clave}."))
+    return medianas
+
+
+def comparar(base, actual, tolerancia=0.2, piso_ms=0.005, benchmarks=None):
+    """
+    Lista de (métrica, p50 base, p50 actual, empeoró) y si alguna empeoró.
+    Empeora si supera la tolerancia relativa y además el piso absoluto
+    (las micro-operaciones de microsegundos no fallan por ruido). Una
+    métrica de la base que falta en la corrida actual (benchmark caído u
+    omitido) cuenta como regresión: actual None
+
+    benchmarks: benchmarks corridos esta vez (por defecto todos los de la base)
+    """
+    medianas_base = _medianas(base['benchmarks'])
+    medianas_actual = _medianas(actual['benchmarks'])
+    filas = []
+    regresion = False
+    for clave, valor_base in medianas_base.items():
+        if benchmarks is not None and clave.split('.')[0] not in benchmarks:
+            continue
+        valor_actual = medianas_actual.get(clave)
+        if valor_actual is None:
+            empeoro = True
+        else:
+            empeoro = (valor_actual > valor_base * (1 + tolerancia) and
+                       valor_actual - valor_base > piso_ms)
+        filas.append((clave, valor_base, valor_actual, empeoro))
+        regresion = regresion or empeoro
+    return filas, regresion
+
+
+# ========================================
+# EJECUCIÓN PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del pipeline (sin cámara ni MySQL)")
+    parser.add_argument('--video', default=None, help="Video para el set de frames (por defecto sintéticos)")
+    parser.add_argument('--frames', type=int, default=60, help="Frames del set fijo")
+    parser.add_argument('--solo', nargs='+', choices=BENCHMARKS, default=None)
+    parser.add_argument('--salida', default=None, help="Archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument('--comparar', default=None, metavar='BASE.json',
+                        help="Compara las medianas contra una corrida anterior")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="Empeoramiento relativo aceptado de p50 (0.2 = 20%%)")
+    parser.add_argument('--piso-ms', type=float, default=0.005,
+                        help="Empeoramiento absoluto mínimo de p50 para fallar (ms)")
+    args = parser.parse_args()
+
+    resultados = ejecutar_suite(args.video, args.frames, args.solo)
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + "\n")
+        print(f"✓ Resultados en {args.salida}", file=sys.stderr)
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        filas, regresion = comparar(base, resultados, args.tolerancia, args.piso_ms,
+                                    args.solo or BENCHMARKS)
+        for clave, valor_base, valor_actual, empeoro in filas:
+            estado = "✗" if empeoro else "✓"
+            if valor_actual is None:
+                print(f"{estado} {clave}: {valor_base} ms -> sin resultado", file=sys.stderr)
+            elif valor_base > 0:
+                print(f"{estado} {clave}: {valor_base} -> {valor_actual} ms "
+                      f"(x{valor_actual / valor_base:.2f})", file=sys.stderr)
+            else:
+                print(f"{estado} {clave}: {valor_base} -> {valor_actual} ms", file=sys.stderr)
+        sys.exit(1 if regresion else 0)
@@ -0,0 +1,151 @@
+"""
+Comparación de rendimiento del detector de fatiga sobre un video grabado
+Procesa el mismo clip con distintas configuraciones y reporta FPS
+"""
+
+import argparse
+import time
+
+from detector_fatiga_real import DetectorFatigaReal
+
+
+def medir_configuracion(ruta_video, max_frames=None, **opciones):
+    """
+    Procesa el clip completo sin ventana y devuelve métricas de la corrida
+    """
+    detector = DetectorFatigaReal(
+        None,
+        archivo_prolog=None,
+        fuente_video=ruta_video,
+        captura_en_hilo=False,
+        mostrar_video=False,
+        **opciones
+    )
+
+    frames = 0
+    frames_con_rostro = 0
+    inicio = time.perf_counter()
+    inicio_cpu = time.process_time()
+
+    try:
+        while max_frames is None or frames < max_frames:
+            ret, frame = detector.leer_frame()
+            if not ret:
+                break
+
+            rostro, ojos, _ = detector.detectar_rostro_ojos(frame)
+            detector.detectar_parpadeo(ojos)
+            detector.analizar_postura(rostro)
+
+            frames += 1
+            if rostro is not None:
+                frames_con_rostro += 1
+    finally:
+        duracion = time.perf_counter() - inicio
+        cpu = time.process_time() - inicio_cpu
+        detector.cerrar()
+
+    return {
+        'opciones': opciones,
+        'frames': frames,
+        'fps': round(frames / duracion, 1) if duracion > 0 else 0.0,
+        'cpu_ms_por_frame': round(cpu * 1000 / frames, 2) if frames else 0.0,
+        'frames_con_rostro': frames_con_rostro,
+        'parpadeos': detector.contador_parpadeos
+    }
+
+
+def comparar_intervalos(ruta_video, intervalos, max_frames=None):
+    """
+    Compara detección completa en cada frame contra seguimiento cada N frames
+    """
+    resultados = []
+    for intervalo in intervalos:
+        resultado = medir_configuracion(
+            ruta_video, max_frames, intervalo_redeteccion=intervalo
+        )
+        resultados.append(resultado)
+    return resultados
+
+
+def comparar_escalas(ruta_video, escalas, escala_ojos=1.0, max_frames=None):
+    """
+    Compara la resolución nativa contra detección reducida de rostros.
+    La primera corrida (escala 1.0) es la referencia de parpadeos
+    """
+    resultados = [medir_configuracion(ruta_video, max_frames)]
+    for escala in escalas:
+        resultado = medir_configuracion(
+            ruta_video, max_frames,
+            escala_deteccion=escala, escala_ojos=escala_ojos
+        )
+        resultados.append(resultado)
+    return resultados
+
+
+def comparar_parpadeo(ruta_video, intervalo_ojos_haar=15, max_frames=None):
+    """
+    Compara el conteo por cascada de ojos contra la señal de apertura ocular
+    """
+    return [
+        medir_configuracion(ruta_video, max_frames, metodo_parpadeo='haar'),
+        medir_configuracion(ruta_video, max_frames, metodo_parpadeo='apertura',
+                            intervalo_ojos_haar=intervalo_ojos_haar)
+    ]
+
+
+def imprimir_resultados(resultados, tolerancia_parpadeos=None):
+    """
+    tolerancia_parpadeos: desviación relativa máxima aceptada contra la
+    primera corrida (ej. 0.1 = ±10%)
+    """
+    base = resultados[0]
+    fps_base = base['fps'] or 1.0
+    cpu_base = base['cpu_ms_por_frame'] or 1.0
+
+    print("\n" + "="*60)
+    print("RESULTADOS")
+    print("="*60)
+    for r in resultados:
+        linea = (f"{r['opciones'] or 'original'}: {r['fps']} fps (x{r['fps'] / fps_base:.2f}) | "
+                 f"CPU {r['cpu_ms_por_frame']} ms/frame (x{r['cpu_ms_por_frame'] / cpu_base:.2f}) | "
+                 f"rostro en {r['frames_con_rostro']}/{r['frames']} frames | "
+                 f"parpadeos: {r['parpadeos']}")
+
+        if tolerancia_parpadeos is not None:
+            desviacion = abs(r['parpadeos'] - base['parpadeos']) / max(base['parpadeos'], 1)
+            estado = "✓" if desviacion <= tolerancia_parpadeos else "✗"
+            linea += f" ({estado} {desviacion:.0%} vs referencia)"
+
+        print(linea)
+    print("="*60)
+
+
+# ========================================
+# EJECUCIÓN PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del detector de fatiga")
+    parser.add_argument('video', help="Ruta del clip de referencia")
+    parser.add_argument('--intervalos', type=int, nargs='+', default=[1, 5, 10],
+                        help="Intervalos de redetección a comparar (1 = comportamiento original)")
+    parser.add_argument('--escalas', type=float, nargs='+', default=None,
+                        help="Escalas de detección de rostros a comparar contra 1.0")
+    parser.add_argument('--escala-ojos', type=float, default=1.0)
+    parser.add_argument('--tolerancia', type=float, default=0.1,
+                        help="Desviación de parpadeos aceptada contra la referencia")
+    parser.add_argument('--comparar-parpadeo', action='store_true',
+                        help="Compara parpadeos por cascada de ojos contra apertura ocular")
+    parser.add_argument('--intervalo-ojos-haar', type=int, default=15)
+    parser.add_argument('--max-frames', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.comparar_parpadeo:
+        resultados = comparar_parpadeo(args.video, args.intervalo_ojos_haar, args.max_frames)
+        imprimir_resultados(resultados, args.tolerancia)
+    elif args.escalas:
+        resultados = comparar_escalas(args.video, args.escalas, args.escala_ojos, args.max_frames)
+        imprimir_resultados(resultados, args.tolerancia)
+    else:
+        imprimir_resultados(comparar_intervalos(args.video, args.intervalos, args.max_frames))
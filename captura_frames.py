@@ -0,0 +1,171 @@
+"""
+Módulo de Captura de Video en Hilo Dedicado
+Un hilo lector conserva solo el frame más reciente y descarta los atrasados
+"""
+
+import threading
+import time
+
+import cv2
+
+
+class CapturaUltimoFrame:
+    def __init__(self, fuente=0, ancho=640, alto=480, buffer_size=1, fourcc=None):
+        """
+        Abre la fuente de video y configura buffer del driver y FOURCC
+        (fourcc=None deja el códec del driver, ej. 'MJPG' para forzarlo)
+        """
+        # Último frame disponible (protegido por la condición)
+        self._condicion = threading.Condition()
+        self._frame = None
+        self._t_captura = 0.0
+        self._secuencia = 0
+        self._secuencia_entregada = 0
+        self._corriendo = False
+        self._thread = None
+
+        # Métricas
+        self.frames_capturados = 0
+        self.frames_entregados = 0
+        self.frames_descartados = 0
+        self.t_ultimo_entregado = 0.0
+        self._latencia_total = 0.0
+        self._latencia_max = 0.0
+        self._latencias_medidas = 0
+
+        self.cap = cv2.VideoCapture(fuente)
+        if self.cap.isOpened():
+            configurar_captura(self.cap, ancho, alto, buffer_size, fourcc)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def iniciar(self):
+        """Arranca el hilo lector"""
+        self._corriendo = True
+        self._thread = threading.Thread(target=self._leer_continuamente, daemon=True)
+        self._thread.start()
+        return self
+
+    def _leer_continuamente(self):
+        """
+        Thread que lee del driver sin pausa y sobrescribe el frame pendiente
+        """
+        while self._corriendo:
+            ret, frame = self.cap.read()
+            t_captura = time.perf_counter()
+
+            with self._condicion:
+                if not ret:
+                    self._corriendo = False
+                    self._condicion.notify_all()
+                    break
+
+                # Si el frame anterior no se entregó, se pierde
+                if self._secuencia > self._secuencia_entregada:
+                    self.frames_descartados += 1
+
+                self._frame = frame
+                self._t_captura = t_captura
+                self._secuencia += 1
+                self.frames_capturados += 1
+                self._condicion.notify_all()
+
+    def activa(self):
+        """False cuando el hilo lector terminó (fin de la fuente o error)"""
+        return self._corriendo
+
+    def read(self, timeout=2.0):
+        """
+        Devuelve (ret, frame) con el frame más nuevo aún no entregado.
+        Misma interfaz que cv2.VideoCapture.read(); ret=False con activa()
+        True es solo una espera vencida (la cámara sigue abierta)
+        """
+        with self._condicion:
+            hay_nuevo = self._condicion.wait_for(
+                lambda: self._secuencia > self._secuencia_entregada or not self._corriendo,
+                timeout=timeout
+            )
+            if not hay_nuevo or self._secuencia == self._secuencia_entregada:
+                return False, None
+
+            self._secuencia_entregada = self._secuencia
+            self.frames_entregados += 1
+            self.t_ultimo_entregado = self._t_captura
+            return True, self._frame
+
+    def registrar_analisis(self):
+        """
+        Registra la latencia captura-análisis del último frame entregado.
+        Llamar al terminar de procesarlo.
+        """
+        if self.t_ultimo_entregado == 0.0:
+            return
+
+        latencia = time.perf_counter() - self.t_ultimo_entregado
+        self._latencia_total += latencia
+        self._latencias_medidas += 1
+        if latencia > self._latencia_max:
+            self._latencia_max = latencia
+
+    def estadisticas(self):
+        """Resumen de frames y latencia desde el inicio"""
+        media = self._latencia_total / self._latencias_medidas if self._latencias_medidas else 0.0
+        return {
+            'frames_capturados': self.frames_capturados,
+            'frames_entregados': self.frames_entregados,
+            'frames_descartados': self.frames_descartados,
+            'latencia_media_ms': round(media * 1000, 1),
+            'latencia_max_ms': round(self._latencia_max * 1000, 1)
+        }
+
+    def release(self):
+        """Detiene el hilo lector y libera la cámara"""
+        self._corriendo = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.cap.release()
+
+
+def configurar_captura(cap, ancho=640, alto=480, buffer_size=1, fourcc=None):
+    """
+    Aplica resolución, tamaño de buffer del driver y FOURCC a un VideoCapture
+    """
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, ancho)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, alto)
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+
+# ========================================
+# PRUEBA DEL MÓDULO
+# ========================================
+
+if __name__ == "__main__":
+    print("="*60)
+    print("PRUEBA DE CAPTURA EN HILO DEDICADO")
+    print("="*60 + "\n")
+
+    captura = CapturaUltimoFrame(0)
+    if not captura.isOpened():
+        print("❌ No se pudo abrir la cámara")
+        exit(1)
+
+    captura.iniciar()
+
+    # Simular un análisis lento (~100 ms por frame)
+    inicio = time.time()
+    while time.time() - inicio < 10:
+        ret, frame = captura.read()
+        if not ret:
+            if captura.activa():
+                continue
+            break
+        time.sleep(0.1)
+        captura.registrar_analisis()
+
+    captura.release()
+    print(captura.estadisticas())
+    print("\n✓ Prueba completada")
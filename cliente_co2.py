@@ -0,0 +1,263 @@
+"""
+Cliente de Lecturas de CO2 (API del ESP32)
+Mantiene una sesión HTTP keep-alive, pide solo lecturas nuevas (ETag +
+parámetro desde) y adapta el intervalo de consulta a la cercanía del umbral
+"""
+
+import time
+
+UMBRAL_CO2 = 1200
+
+
+class ClienteCO2:
+    def __init__(self, api_url='http://localhost:3001', umbral=UMBRAL_CO2,
+                 intervalo_min=1.0, intervalo_max=15.0, rango_cercania=400,
+                 cambio_minimo=10, factor_crecimiento=1.5, timeout=5):
+        """
+        umbral: ppm de CO2 crítico (umbral_default(co2_critico) en Prolog)
+        intervalo_min / intervalo_max: límites del intervalo de consulta (s)
+        rango_cercania: ppm bajo el umbral en que el intervalo empieza a reducirse
+        cambio_minimo: ppm por debajo de los cuales la lectura se considera plana
+        factor_crecimiento: cuánto crece el intervalo con lecturas planas
+        """
+        self.url = f"{api_url}/api/sensores/ultimas"
+        self.umbral = umbral
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.rango_cercania = rango_cercania
+        self.cambio_minimo = cambio_minimo
+        self.factor_crecimiento = factor_crecimiento
+        self.timeout = timeout
+
+        # Una sola conexión TCP reutilizada entre consultas (se crea en la primera)
+        self._sesion = None
+
+        # Estado de consultas condicionales / incrementales
+        self.etag = None
+        self.ultimo_timestamp = None
+        self.ultimo_valor = None
+        self._instante_ultimo_valor = None
+        self.instante_ultima_respuesta = None
+        self.intervalo = intervalo_max
+
+        # Métricas
+        self.peticiones = 0
+        self.sin_cambios = 0
+        self.lecturas_nuevas = 0
+        self.errores = 0
+
+    @property
+    def sesion(self):
+        # requests se importa en la primera consulta, no al arrancar
+        if self._sesion is None:
+            import requests
+            self._sesion = requests.Session()
+        return self._sesion
+
+    def obtener_lectura(self):
+        """
+        Devuelve el valor de CO2 si llegó una lectura nueva, None si no hay
+        cambios (304 o sin lecturas posteriores) o hubo error
+        """
+        import requests
+
+        parametros = {'tipo': 'co2'}
+        if self.ultimo_timestamp:
+            parametros['desde'] = self.ultimo_timestamp
+        encabezados = {'If-None-Match': self.etag} if self.etag else {}
+
+        self.peticiones += 1
+        try:
+            response = self.sesion.get(self.url, params=parametros,
+                                       headers=encabezados, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.errores += 1
+            print(f"⚠️ Error obteniendo lectura CO2: {e}")
+            return None
+
+        if response.status_code == 304:
+            self.sin_cambios += 1
+            self.instante_ultima_respuesta = time.monotonic()
+            return None
+
+        if response.status_code != 200:
+            self.errores += 1
+            return None
+
+        self.instante_ultima_respuesta = time.monotonic()
+
+        self.etag = response.headers.get('ETag')
+        data = response.json()
+        lectura = data.get('lecturas', {}).get('co2') if data.get('success') else None
+        if lectura is None or lectura.get('timestamp') == self.ultimo_timestamp:
+            self.sin_cambios += 1
+            return None
+
+        self.ultimo_timestamp = lectura.get('timestamp')
+        self.lecturas_nuevas += 1
+        return lectura['valor']
+
+    def actualizar_intervalo(self, valor):
+        """
+        Calcula el próximo intervalo de consulta.
+        valor: lectura nueva o None si no hubo cambios
+        """
+        ahora = time.monotonic()
+
+        if valor is None or self.ultimo_valor is None:
+            if valor is not None:
+                self.ultimo_valor = valor
+                self._instante_ultimo_valor = ahora
+            # Sin datos nuevos: se espera un poco más cada vez
+            self.intervalo = min(self.intervalo * self.factor_crecimiento,
+                                 self._intervalo_por_cercania(self.ultimo_valor))
+            return self.intervalo
+
+        cambio = valor - self.ultimo_valor
+        transcurrido = max(ahora - self._instante_ultimo_valor, 1e-3)
+        self.ultimo_valor = valor
+        self._instante_ultimo_valor = ahora
+
+        objetivo = self._intervalo_por_cercania(valor)
+
+        if abs(cambio) < self.cambio_minimo:
+            # Lectura plana: crecer gradualmente hasta el objetivo
+            self.intervalo = min(self.intervalo * self.factor_crecimiento, objetivo)
+        else:
+            self.intervalo = objetivo
+            # Subiendo: consultar al menos dos veces antes de cruzar el umbral
+            velocidad = cambio / transcurrido
+            if velocidad > 0 and valor < self.umbral:
+                tiempo_al_umbral = (self.umbral - valor) / velocidad
+                self.intervalo = min(self.intervalo, tiempo_al_umbral / 2)
+
+        self.intervalo = max(self.intervalo_min, self.intervalo)
+        return self.intervalo
+
+    def _intervalo_por_cercania(self, valor):
+        if valor is None:
+            return self.intervalo_max
+        distancia = abs(self.umbral - valor)
+        fraccion = min(1.0, distancia / self.rango_cercania)
+        return self.intervalo_min + (self.intervalo_max - self.intervalo_min) * fraccion
+
+    def antiguedad_consulta(self):
+        """Segundos desde la última respuesta válida de la API (None si ninguna)"""
+        if self.instante_ultima_respuesta is None:
+            return None
+        return time.monotonic() - self.instante_ultima_respuesta
+
+    def estadisticas(self):
+        return {
+            'peticiones': self.peticiones,
+            'sin_cambios': self.sin_cambios,
+            'lecturas_nuevas': self.lecturas_nuevas,
+            'errores': self.errores,
+            'intervalo_s': round(self.intervalo, 2)
+        }
+
+    def cerrar(self):
+        if self._sesion is not None:
+            self._sesion.close()
+
+
+# ========================================
+# PRUEBA DEL MÓDULO (servidor HTTP local de prueba)
+# ========================================
+
+if __name__ == "__main__":
+    import hashlib
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    # Escenario: CO2 estable, rampa hasta superar 1200 ppm y estable otra vez
+    inicio_escenario = time.monotonic()
+    escenario = [(0, 600), (8, 600), (16, 1000), (20, 1300), (30, 1300)]
+    PASO_LECTURA = 0.5
+    conexiones = []
+
+    def co2_simulado(segundos):
+        for (t0, v0), (t1, v1) in zip(escenario, escenario[1:]):
+            if segundos <= t1:
+                return round(v0 + (v1 - v0) * (segundos - t0) / (t1 - t0))
+        return escenario[-1][1]
+
+    class ServidorPrueba(BaseHTTPRequestHandler):
+        """Imita GET /api/sensores/ultimas de server.js (ETag + desde)"""
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            conexiones.append(self.client_address)
+            super().setup()
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            consulta = parse_qs(urlparse(self.path).query)
+            # El ESP32 publica una lectura cada PASO_LECTURA segundos
+            paso = int((time.monotonic() - inicio_escenario) / PASO_LECTURA)
+            timestamp = f"t{paso:06d}"
+            lecturas = {}
+            if consulta.get('desde', [''])[0] < timestamp:
+                lecturas['co2'] = {
+                    'valor': co2_simulado(paso * PASO_LECTURA),
+                    'unidad': 'ppm',
+                    'timestamp': timestamp
+                }
+            cuerpo = json.dumps({'success': True, 'lecturas': lecturas}).encode()
+            etag = '"' + hashlib.sha1(cuerpo).hexdigest() + '"'
+
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), ServidorPrueba)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{servidor.server_address[1]}"
+
+    print("="*60)
+    print("PRUEBA DEL CLIENTE CO2 (servidor local)")
+    print("="*60)
+
+    cliente = ClienteCO2(api_url, intervalo_min=0.25, intervalo_max=4.0)
+    cruce_real = None
+    deteccion = None
+
+    while time.monotonic() - inicio_escenario < escenario[-1][0]:
+        co2 = cliente.obtener_lectura()
+        intervalo = cliente.actualizar_intervalo(co2)
+        transcurrido = time.monotonic() - inicio_escenario
+        if co2 is not None:
+            print(f"[{transcurrido:5.1f} s] CO2: {co2} ppm → siguiente consulta en {intervalo:.2f} s")
+            if co2 > UMBRAL_CO2 and deteccion is None:
+                deteccion = transcurrido
+        time.sleep(intervalo)
+
+    # Primer instante en que el servidor publicó un valor sobre el umbral
+    paso = 0
+    while co2_simulado(paso * PASO_LECTURA) <= UMBRAL_CO2:
+        paso += 1
+    cruce_real = paso * PASO_LECTURA
+
+    print("\n" + "="*60)
+    print(f"Cruce del umbral: {cruce_real:.1f} s | detectado: "
+          f"{deteccion:.1f} s (retraso {deteccion - cruce_real:.2f} s, "
+          f"intervalo máximo {cliente.intervalo_max} s)" if deteccion else "❌ Cruce no detectado")
+    print(f"Estadísticas: {cliente.estadisticas()}")
+    print(f"Conexiones TCP abiertas: {len(conexiones)} (keep-alive)")
+    print("="*60)
+
+    cliente.cerrar()
+    servidor.shutdown()
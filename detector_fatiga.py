@@ -5,26 +5,39 @@ Sin cámara real, con datos generados automáticamente
 
 import time
 import random
-import mysql.connector
 from datetime import datetime
+from almacenamiento_local import obtener_almacen
+from pool_conexiones import DB_CONFIG
 
 class DetectorFatigaSimulado:
-    def __init__(self, db_config):
+    def __init__(self, db_config, almacen=None, reloj=time.time, rng=None):
         """
         Inicializa el detector de fatiga simulado
+        
+        almacen: almacén local ya creado (por defecto el compartido, que
+            sincroniza con MySQL en segundo plano)
+        reloj: función que devuelve epoch en segundos; define el avance de la
+            fatiga y el timestamp de cada detección (ej. RelojVirtual acelerado)
+        rng: generador aleatorio (random.Random(semilla) para repetir la simulación)
         """
-        # Conexión a base de datos
-        self.db = mysql.connector.connect(**db_config)
-        self.cursor = self.db.cursor(dictionary=True)
+        # Escritura local con sincronización diferida
+        self.almacen = almacen or obtener_almacen(db_config)
+        self.reloj = reloj
+        self.rng = rng or random
         
         # Variables de simulación
         self.parpadeos_por_minuto = 15
         self.postura_actual = "correcta"
-        self.tiempo_inicio = time.time()
+        self.tiempo_inicio = self.reloj()
         
         # Sesión activa
         self.sesion_id = None
         
+        # Misma interfaz que DetectorFatigaReal para SistemaSaludOcupacional
+        self.prolog = None
+        self.frames_analizados = 0
+        self.fps_actual = None
+        
         print("✓ Detector de fatiga simulado inicializado")
     
     def establecer_sesion(self, sesion_id):
@@ -38,25 +51,25 @@ class DetectorFatigaSimulado:
         """
         Simula la detección de fatiga con variaciones aleatorias
         """
-        tiempo_transcurrido = time.time() - self.tiempo_inicio
+        tiempo_transcurrido = self.reloj() - self.tiempo_inicio
         
         # Simular aumento gradual de fatiga con el tiempo
         minutos = tiempo_transcurrido / 60
         
         # Fatiga visual (aumenta con el tiempo)
         if minutos < 30:
-            self.parpadeos_por_minuto = random.randint(15, 20)
+            self.parpadeos_por_minuto = self.rng.randint(15, 20)
             nivel_visual = "bajo"
         elif minutos < 60:
-            self.parpadeos_por_minuto = random.randint(20, 25)
+            self.parpadeos_por_minuto = self.rng.randint(20, 25)
             nivel_visual = "moderado"
         else:
-            self.parpadeos_por_minuto = random.randint(25, 35)
+            self.parpadeos_por_minuto = self.rng.randint(25, 35)
             nivel_visual = "alto"
         
         # Fatiga postural (varía aleatoriamente)
         posturas = ["correcta", "correcta", "cabeza_baja", "cabeza_inclinada"]
-        self.postura_actual = random.choice(posturas)
+        self.postura_actual = self.rng.choice(posturas)
         
         if self.postura_actual == "correcta":
             nivel_postural = "bajo"
@@ -83,37 +96,35 @@ class DetectorFatigaSimulado:
     
     def registrar_deteccion(self, tipo_fatiga, nivel, indicador, datos_extra=None):
         """
-        Registra detección de fatiga en la base de datos
+        Registra detección de fatiga (local; se sube a MySQL en segundo plano)
         """
         if self.sesion_id is None:
             print("⚠️ No hay sesión activa")
             return
         
-        try:
-            query = """
-                INSERT INTO deteccion_fatiga 
-                (sesion_id, tipo_fatiga, nivel_fatiga, indicador, 
-                 frecuencia_parpadeo, postura_detectada)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            
-            frecuencia = datos_extra.get('parpadeos') if datos_extra else None
-            postura = datos_extra.get('postura') if datos_extra else None
-            
-            self.cursor.execute(query, (
-                self.sesion_id,
-                tipo_fatiga,
-                nivel,
-                indicador,
-                frecuencia,
-                postura
-            ))
-            self.db.commit()
-            
+        frecuencia = datos_extra.get('parpadeos') if datos_extra else None
+        postura = datos_extra.get('postura') if datos_extra else None
+        
+        if self.almacen.registrar((
+            self.sesion_id,
+            tipo_fatiga,
+            nivel,
+            indicador,
+            frecuencia,
+            postura,
+            datetime.fromtimestamp(self.reloj()).strftime('%Y-%m-%d %H:%M:%S')
+        )):
             print(f"📝 Fatiga {tipo_fatiga}: {nivel}")
-            
-        except Exception as e:
-            print(f"❌ Error registrando fatiga: {e}")
+    
+    def actualizar_prolog(self, nivel_visual, nivel_postural, esperar=True, timeout=2.0):
+        """Sin base de conocimiento en modo simulado"""
+        return False if esperar else None
+    
+    def estadisticas_captura(self):
+        return None
+    
+    def estadisticas_escritura(self):
+        return self.almacen.estadisticas()
     
     def analizar_y_registrar(self):
         """
@@ -122,7 +133,7 @@ class DetectorFatigaSimulado:
         # Simular detección
         resultado = self.simular_deteccion_fatiga()
         
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Análisis de Fatiga:")
+        print(f"\n[{datetime.fromtimestamp(self.reloj()).strftime('%H:%M:%S')}] Análisis de Fatiga:")
         print(f"  👁️  Visual: {resultado['visual']} (Parpadeos: {resultado['parpadeos']}/min)")
         print(f"  🧍 Postural: {resultado['postural']} (Postura: {resultado['postura']})")
         print(f"  🧠 Cognitiva: {resultado['cognitiva']}")
@@ -173,10 +184,9 @@ class DetectorFatigaSimulado:
     
     def cerrar(self):
         """
-        Cierra conexiones
+        Cierra el detector tras subir lo pendiente a MySQL
         """
-        self.cursor.close()
-        self.db.close()
+        self.almacen.cerrar()
         print("✓ Detector de fatiga cerrado")
 
 # ========================================
@@ -184,42 +194,21 @@ class DetectorFatigaSimulado:
 # ========================================
 
 if __name__ == "__main__":
-    # Configuración de base de datos
-    db_config = {
-        'host': 'localhost',
-        'user': 'root',
-        'password': '',  # Vacío para XAMPP
-        'database': 'salud_ocupacional'
-    }
-    
     # Crear detector
-    detector = DetectorFatigaSimulado(db_config)
+    detector = DetectorFatigaSimulado(DB_CONFIG)
     
     # Obtener sesión activa
     try:
-        conexion = mysql.connector.connect(**db_config)
-        cursor = conexion.cursor(dictionary=True)
-        cursor.execute("SELECT id FROM sesiones_trabajo WHERE estado = 'activa' ORDER BY id DESC LIMIT 1")
-        sesion = cursor.fetchone()
-        
-        if sesion:
-            detector.establecer_sesion(sesion['id'])
-            print(f"✓ Usando sesión activa: {sesion['id']}\n")
-        else:
-            print("⚠️ No hay sesión activa. Iniciando una nueva...")
-            cursor.execute("""
-                INSERT INTO sesiones_trabajo (usuario_id, fecha, hora_inicio, estado)
-                VALUES (1, CURDATE(), CURTIME(), 'activa')
-            """)
-            conexion.commit()
-            detector.establecer_sesion(cursor.lastrowid)
+        sesion_id, creada = detector.almacen.obtener_o_crear_sesion()
         
-        cursor.close()
-        conexion.close()
+        if creada:
+            print("⚠️ No hay sesión activa. Se inició una nueva...")
+        detector.establecer_sesion(sesion_id)
+        print(f"✓ Usando sesión activa: {sesion_id}\n")
         
     except Exception as e:
         print(f"❌ Error obteniendo sesión: {e}")
         exit(1)
     
     # Ejecutar monitor (análisis cada 60 segundos)
-    detector.ejecutar_monitor_continuo(intervalo=60)
\ No newline at end of file
+    detector.ejecutar_monitor_continuo(intervalo=60)
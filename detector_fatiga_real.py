@@ -5,90 +5,347 @@ Integrado con Prolog para inferencias
 
 import cv2
 import time
-import mysql.connector
 from datetime import datetime
-from pyswip import Prolog
+from almacenamiento_local import obtener_almacen
+from arranque import TiemposArranque
+from pool_conexiones import DB_CONFIG
+from captura_frames import CapturaUltimoFrame, configurar_captura
+from anillo_frames import CapturaMemoriaCompartida
+from perfilador import PERFIL_INACTIVO, Perfilador
+from ventana_fatiga import (
+    CABEZA_ALTA, CABEZA_BAJA, CABEZA_INCLINADA, CORRECTA, POSTURAS, SIN_DETECCION,
+    UMBRAL_PERCLOS_ALTO, UMBRAL_PERCLOS_MODERADO, VentanaFatiga, nivel_postural
+)
+from apertura_ocular import (
+    BANDA_OJOS_DEFECTO, MaquinaParpadeo, banda_desde_ojos, calcular_apertura
+)
+
+ORDEN_NIVELES = {'bajo': 0, 'moderado': 1, 'alto': 2}
 
 class DetectorFatigaReal:
-    def __init__(self, db_config, archivo_prolog='salud_ocupacional.pl'):
+    def __init__(self, db_config, archivo_prolog='salud_ocupacional.pl', fuente_video=0,
+                 captura_en_hilo=True, buffer_size=1, fourcc=None, intervalo_redeteccion=1,
+                 escala_deteccion=1.0, escala_ojos=1.0, metodo_parpadeo='haar',
+                 intervalo_ojos_haar=15, reloj=time.time, mostrar_video=True, escritor=None,
+                 captura_en_proceso=False, perfilar=False, intervalo_perfil=10.0,
+                 duracion_ventana=60.0, intervalo_evaluacion=60.0, intervalo_minimo_cambio=10.0,
+                 suavizado_postura=0.2, arranque=None):
         """
         Inicializa el detector con cámara real
+
+        db_config / archivo_prolog: None para trabajar sin BD o sin Prolog
+        captura_en_hilo: un hilo lector conserva solo el frame más reciente
+        buffer_size / fourcc: configuración del buffer y códec del driver
+            (fourcc=None respeta el códec por defecto; ej. 'MJPG' para forzarlo)
+        intervalo_redeteccion: frames entre detecciones completas del rostro
+            (1 = detección completa en cada frame; >1 = seguimiento entre detecciones)
+        escala_deteccion: factor de reducción para la cascada de rostros (ej. 0.5)
+        escala_ojos: factor de reducción del ROI para la cascada de ojos
+            (la ventana mínima de haarcascade_eye es 20x20: con rostros pequeños usar >= 0.75)
+        metodo_parpadeo: 'haar' (menos de 2 ojos = cerrados) o 'apertura'
+            (señal NumPy de apertura ocular con histéresis)
+        intervalo_ojos_haar: en modo 'apertura', frames entre pasadas de la
+            cascada de ojos (solo para ubicar la banda de ojos y dibujar)
+        fuente_video: índice de cámara, ruta de video o un objeto con read()/release()
+            (ej. FuenteFrames de reproduccion_offline)
+        reloj: función que devuelve segundos; define la ventana deslizante
+            (en reproducción sigue el tiempo del video)
+        mostrar_video: False para correr sin ventana (sin imshow/waitKey)
+        escritor: destino de las detecciones con registrar()/cerrar() (por defecto el
+            almacén local SQLite que sincroniza con MySQL; o un EscritorDetecciones)
+        captura_en_proceso: la lectura del driver corre en otro proceso y los
+            frames llegan por memoria compartida (vista de solo lectura, sin copias)
+        perfilar: medir cada etapa del frame (p50/p95/p99 y FPS); apagado no lee el reloj
+        intervalo_perfil: segundos entre resúmenes impresos (None = solo al cerrar)
+        duracion_ventana: segundos de la ventana deslizante de parpadeos y PERCLOS
+        intervalo_evaluacion: segundos entre resultados de calcular_nivel_fatiga
+            con niveles sin cambios
+        intervalo_minimo_cambio: segundos mínimos entre resultados cuando un
+            nivel sube (se informa antes del intervalo de evaluación)
+        suavizado_postura: factor de la media móvil exponencial del centro y la
+            proporción del rostro (1 = sin suavizar)
+        arranque: TiemposArranque donde registrar cámara, cascadas y Prolog
+            (se cargan en paralelo)
         """
         print("Inicializando detector de fatiga con cámara...")
         
-        # Conexión a base de datos
-        self.db = mysql.connector.connect(**db_config)
-        self.cursor = self.db.cursor(dictionary=True)
+        # Escritura local (SQLite) con sincronización diferida a MySQL
+        if escritor is not None:
+            self.escritor = escritor
+        elif db_config is not None:
+            self.escritor = obtener_almacen(db_config)
+        else:
+            self.escritor = None
+        
+        self.reloj = reloj
+        self.mostrar_video = mostrar_video
+        self.perfil = Perfilador(intervalo_perfil) if perfilar else PERFIL_INACTIVO
+        self.arranque = arranque or TiemposArranque()
+        
+        # Cámara, clasificadores Haar y base Prolog se cargan a la vez
+        self.prolog = None
+        self.fuente_externa = hasattr(fuente_video, 'read')
+        self.captura_en_hilo = (captura_en_hilo or captura_en_proceso) and not self.fuente_externa
+        pasos = {
+            'camara': lambda: self._abrir_camara(fuente_video, captura_en_proceso, buffer_size, fourcc),
+            'cascadas': self._cargar_cascadas
+        }
+        if archivo_prolog is not None:
+            pasos['prolog'] = lambda: self._cargar_prolog(archivo_prolog)
+        self.arranque.en_paralelo(pasos)
+        
+        # Variables de estado
+        self.contador_parpadeos = 0
+        self.ojos_cerrados_frames = 0
+        self.umbral_parpadeo = 3
+        self.ojos_cerrados = False
+        self.postura_actual = "desconocida"
         
-        # Inicializar Prolog
+        # Postura suavizada (media móvil exponencial de la caja del rostro)
+        self.suavizado_postura = suavizado_postura
+        self.centro_y_suave = None
+        self.ratio_suave = None
+        
+        # Señal de apertura ocular (modo 'apertura')
+        self.metodo_parpadeo = metodo_parpadeo
+        self.intervalo_ojos_haar = max(1, intervalo_ojos_haar)
+        self.maquina_parpadeo = MaquinaParpadeo()
+        self.banda_ojos = BANDA_OJOS_DEFECTO
+        self.apertura_actual = None
+        self.frames_analizados = 0
+        
+        # FPS del último segundo (lo actualiza el loop de cámara; lectores externos solo lo leen)
+        self.fps_actual = None
+        self._t_fps = time.monotonic()
+        self._frames_fps = 0
+        
+        # Seguimiento de rostro entre detecciones completas
+        self.intervalo_redeteccion = max(1, intervalo_redeteccion)
+        self.margen_seguimiento = 0.25
+        self.ultimo_rostro = None
+        self.frames_desde_deteccion = 0
+        
+        # Resolución de detección (las cajas se devuelven en coordenadas completas)
+        self.escala_deteccion = escala_deteccion
+        self.escala_ojos = escala_ojos
+        
+        # Métricas: ventana deslizante de parpadeos y ojos cerrados (memoria fija)
+        self.ventana = VentanaFatiga(duracion_ventana)
+        self.tiempo_inicio_ventana = self.reloj()
+        self.intervalo_evaluacion = intervalo_evaluacion
+        self.intervalo_minimo_cambio = intervalo_minimo_cambio
+        self.ultima_evaluacion = None
+        self.ultimos_niveles = None
+        
+        # Sesión activa
+        self.sesion_id = None
+        
+        print("✓ Detector de fatiga inicializado completamente\n")
+    
+    def _cargar_prolog(self, archivo_prolog):
+        """Motor compartido en hilo dedicado (pyswip se importa recién aquí)"""
         try:
-            self.prolog = Prolog()
-            self.prolog.consult(archivo_prolog)
+            motor_prolog = self.arranque.importar('motor_prolog')
+            self.prolog = motor_prolog.obtener_motor(archivo_prolog)
             print("✓ Base de conocimiento Prolog cargada")
         except Exception as e:
             print(f"⚠️ Error cargando Prolog: {e}")
             self.prolog = None
+    
+    def _abrir_camara(self, fuente_video, captura_en_proceso, buffer_size, fourcc):
+        if self.fuente_externa:
+            self.cap = fuente_video
+        elif self.captura_en_hilo and captura_en_proceso:
+            self.cap = CapturaMemoriaCompartida(fuente_video, 640, 480, buffer_size, fourcc)
+        elif self.captura_en_hilo:
+            self.cap = CapturaUltimoFrame(fuente_video, 640, 480, buffer_size, fourcc)
+        else:
+            self.cap = cv2.VideoCapture(fuente_video)
         
-        # Inicializar cámara
-        self.cap = cv2.VideoCapture(0)
         if not self.cap.isOpened():
             print("❌ No se pudo abrir la cámara")
             raise Exception("Cámara no disponible")
         
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        print("✓ Cámara inicializada (640x480)")
-        
-        # Cargar clasificadores de OpenCV
+        if self.fuente_externa:
+            print("✓ Fuente de video externa")
+        elif self.captura_en_hilo and captura_en_proceso:
+            print("✓ Cámara inicializada (640x480, captura en proceso con memoria compartida)")
+        elif self.captura_en_hilo:
+            self.cap.iniciar()
+            print("✓ Cámara inicializada (640x480, captura en hilo dedicado)")
+        else:
+            configurar_captura(self.cap, 640, 480, buffer_size, fourcc)
+            print("✓ Cámara inicializada (640x480)")
+    
+    def _cargar_cascadas(self):
         cascade_path = cv2.data.haarcascades
         self.face_cascade = cv2.CascadeClassifier(cascade_path + 'haarcascade_frontalface_default.xml')
         self.eye_cascade = cv2.CascadeClassifier(cascade_path + 'haarcascade_eye.xml')
         print("✓ Clasificadores Haar cargados")
-        
-        # Variables de estado
-        self.contador_parpadeos = 0
-        self.ojos_cerrados_frames = 0
-        self.umbral_parpadeo = 3
-        self.postura_actual = "desconocida"
-        
-        # Métricas
-        self.tiempo_inicio_minuto = time.time()
-        self.parpadeos_ultimo_minuto = []
-        
-        # Sesión activa
-        self.sesion_id = None
-        
-        print("✓ Detector de fatiga inicializado completamente\n")
     
     def establecer_sesion(self, sesion_id):
         """Establece la sesión activa"""
         self.sesion_id = sesion_id
         print(f"✓ Sesión establecida: {sesion_id}")
     
+    def leer_frame(self):
+        """
+        Lee el siguiente frame a analizar
+        """
+        self.perfil.iniciar_frame()
+        resultado = self.cap.read()
+        self.perfil.marca('cap.read')
+        return resultado
+    
+    def captura_activa(self):
+        """
+        Tras un read() fallido: True si fue solo una espera vencida de la
+        captura en hilo/proceso (seguir leyendo), False si la fuente terminó
+        """
+        activa = getattr(self.cap, 'activa', None)
+        return activa() if activa is not None else False
+    
+    def registrar_frame_analizado(self):
+        """
+        Marca el fin del análisis del frame actual (latencia captura-análisis)
+        """
+        if self.captura_en_hilo:
+            self.cap.registrar_analisis()
+    
+    def estadisticas_captura(self):
+        """
+        Frames descartados y latencia captura-análisis (solo captura en hilo o proceso)
+        """
+        if self.captura_en_hilo:
+            return self.cap.estadisticas()
+        return None
+    
     def detectar_rostro_ojos(self, frame):
         """
         Detecta rostro y ojos en el frame
         """
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        # Detectar rostros
+        # Frame de memoria compartida (solo lectura): se copia solo si se va a mostrar
+        dibujar = frame.flags.writeable or self.mostrar_video
+        if not frame.flags.writeable and self.mostrar_video:
+            frame = frame.copy()
+        
+        # Imagen reducida para la cascada de rostros
+        if self.escala_deteccion != 1.0:
+            gray_det = cv2.resize(gray, None, fx=self.escala_deteccion, fy=self.escala_deteccion,
+                                  interpolation=cv2.INTER_AREA)
+        else:
+            gray_det = gray
+        self.perfil.marca('cvtColor')
+        
+        # Seguir el último rostro mientras no toque detección completa
+        rostro = None
+        if (self.ultimo_rostro is not None and
+                self.frames_desde_deteccion < self.intervalo_redeteccion):
+            rostro = self._seguir_rostro(gray_det)
+        
+        if rostro is None:
+            rostro = self._detectar_rostro_completo(gray_det)
+            self.frames_desde_deteccion = 1
+        else:
+            self.frames_desde_deteccion += 1
+        self.perfil.marca('cascada_rostro')
+        
+        rostro_perdido = rostro is None and self.ultimo_rostro is not None
+        self.ultimo_rostro = rostro
+        self.frames_analizados += 1
+        ahora = time.monotonic()
+        if ahora - self._t_fps >= 1.0:
+            self.fps_actual = (self.frames_analizados - self._frames_fps) / (ahora - self._t_fps)
+            self._t_fps, self._frames_fps = ahora, self.frames_analizados
+        
+        if rostro is None:
+            self.apertura_actual = None
+            if rostro_perdido:
+                # Un cierre a medias no se completa con el rostro de vuelta
+                self.maquina_parpadeo.reiniciar()
+            return None, [], frame
+        
+        (x, y, w, h) = rostro
+        if dibujar:
+            cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+        
+        # Detectar ojos solo en la mitad superior del rostro
+        roi_gray = gray[y:y+h//2, x:x+w]
+        roi_color = frame[y:y+h//2, x:x+w]
+        
+        if self.metodo_parpadeo == 'apertura':
+            ojos = self._actualizar_apertura(roi_gray)
+        else:
+            ojos = self._detectar_ojos(roi_gray)
+        self.perfil.marca('cascada_ojos')
+        
+        # Dibujar ojos
+        if dibujar:
+            for (ex, ey, ew, eh) in ojos:
+                cv2.rectangle(roi_color, (ex, ey), (ex+ew, ey+eh), (0, 255, 0), 2)
+        
+        return rostro, ojos, frame
+    
+    def _detectar_rostro_completo(self, gray_det):
+        """
+        Detección Haar sobre el frame completo (a escala de detección)
+        """
+        tamano_min = self._tamano_minimo_rostro()
         rostros = self.face_cascade.detectMultiScale(
-            gray, 
+            gray_det, 
             scaleFactor=1.1,
             minNeighbors=5,
-            minSize=(100, 100)
+            minSize=(tamano_min, tamano_min)
         )
         
         if len(rostros) == 0:
-            return None, [], frame
+            return None
         
         # Tomar primer rostro
-        (x, y, w, h) = rostros[0]
-        cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+        return self._a_resolucion_completa(rostros[0])
+    
+    def _seguir_rostro(self, gray_det):
+        """
+        Busca el rostro en una ventana ampliada alrededor del último detectado.
+        Devuelve None si se pierde (se fuerza detección completa)
+        """
+        escala = self.escala_deteccion
+        (x, y, w, h) = (int(v * escala) for v in self.ultimo_rostro)
+        margen_x = int(w * self.margen_seguimiento)
+        margen_y = int(h * self.margen_seguimiento)
+        
+        alto, ancho = gray_det.shape[:2]
+        x0 = max(0, x - margen_x)
+        y0 = max(0, y - margen_y)
+        x1 = min(ancho, x + w + margen_x)
+        y1 = min(alto, y + h + margen_y)
+        
+        # Solo tamaños cercanos al anterior: pocas escalas que evaluar
+        tamano_min = self._tamano_minimo_rostro()
+        rostros = self.face_cascade.detectMultiScale(
+            gray_det[y0:y1, x0:x1],
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(max(tamano_min, int(w * 0.8)), max(tamano_min, int(h * 0.8))),
+            maxSize=(int(w * 1.25) + 1, int(h * 1.25) + 1)
+        )
         
-        # Detectar ojos en región del rostro
-        roi_gray = gray[y:y+h, x:x+w]
-        roi_color = frame[y:y+h, x:x+w]
+        if len(rostros) == 0:
+            return None
+        
+        (rx, ry, rw, rh) = rostros[0]
+        return self._a_resolucion_completa((rx + x0, ry + y0, rw, rh))
+    
+    def _detectar_ojos(self, roi_gray):
+        """
+        Detecta ojos en el ROI (a escala de ojos). Cajas relativas al ROI original
+        """
+        escala = self.escala_ojos
+        if escala != 1.0:
+            roi_gray = cv2.resize(roi_gray, None, fx=escala, fy=escala,
+                                  interpolation=cv2.INTER_AREA)
         
         ojos = self.eye_cascade.detectMultiScale(
             roi_gray,
@@ -97,114 +354,201 @@ class DetectorFatigaReal:
             minSize=(20, 20)
         )
         
-        # Dibujar ojos
-        for (ex, ey, ew, eh) in ojos:
-            cv2.rectangle(roi_color, (ex, ey), (ex+ew, ey+eh), (0, 255, 0), 2)
+        if escala != 1.0 and len(ojos) > 0:
+            ojos = (ojos / escala).astype(int)
         
-        return rostros[0], ojos, frame
+        return ojos
+    
+    def _actualizar_apertura(self, roi_gray):
+        """
+        Calcula la apertura ocular del frame. La cascada de ojos solo corre
+        cada intervalo_ojos_haar frames para reubicar la banda de ojos
+        """
+        ojos = []
+        if (self.frames_analizados - 1) % self.intervalo_ojos_haar == 0:
+            ojos = self._detectar_ojos(roi_gray)
+            banda = banda_desde_ojos(ojos, *roi_gray.shape[:2])
+            if banda is not None:
+                self.banda_ojos = banda
+        
+        self.apertura_actual = calcular_apertura(roi_gray, self.banda_ojos)
+        return ojos
+    
+    def _tamano_minimo_rostro(self):
+        # 100 px a resolución completa; 24 px es la ventana de la cascada
+        return max(24, int(100 * self.escala_deteccion))
+    
+    def _a_resolucion_completa(self, caja):
+        """
+        Convierte una caja de la imagen de detección a coordenadas del frame
+        """
+        escala = self.escala_deteccion
+        return tuple(int(round(int(v) / escala)) for v in caja)
     
     def detectar_parpadeo(self, ojos):
         """
         Detecta parpadeo basado en número de ojos visibles
+        (o en la señal de apertura en modo 'apertura')
         """
+        if self.metodo_parpadeo == 'apertura':
+            return self._detectar_parpadeo_apertura()
+        
         if len(ojos) < 2:
             self.ojos_cerrados_frames += 1
         else:
             if self.ojos_cerrados_frames >= self.umbral_parpadeo:
-                self.contador_parpadeos += 1
-                print(f"Parpadeo detectado (Total: {self.contador_parpadeos})")
+                self._contar_parpadeo()
             self.ojos_cerrados_frames = 0
         
-        return len(ojos) < 2
+        self.ojos_cerrados = len(ojos) < 2
+        # Sin rostro no hay medición de los ojos para el PERCLOS
+        if self.ultimo_rostro is not None:
+            self.ventana.registrar_frame(self.reloj(), self.ojos_cerrados)
+        return self.ojos_cerrados
+    
+    def _detectar_parpadeo_apertura(self):
+        # Sin rostro no hay señal: se conserva el estado anterior
+        if self.apertura_actual is None:
+            return self.ojos_cerrados
+        
+        self.ojos_cerrados, parpadeo = self.maquina_parpadeo.actualizar(self.apertura_actual)
+        if parpadeo:
+            self._contar_parpadeo()
+        self.ventana.registrar_frame(self.reloj(), self.ojos_cerrados)
+        
+        return self.ojos_cerrados
+    
+    def _contar_parpadeo(self):
+        # contador_parpadeos es el total de la sesión; la tasa sale de la ventana
+        self.contador_parpadeos += 1
+        self.ventana.registrar_parpadeo(self.reloj())
+        print(f"Parpadeo detectado (Total: {self.contador_parpadeos})")
+    
+    def frecuencia_parpadeo(self):
+        """Parpadeos por minuto en la ventana deslizante"""
+        return round(self.ventana.frecuencia_parpadeo(self.reloj()))
     
     def analizar_postura(self, rostro, altura_frame=480):
         """
-        Analiza postura basándose en posición del rostro
+        Analiza postura basándose en posición del rostro (suavizada) y la
+        acumula en la ventana como código entero
         """
         if rostro is None:
-            return "sin_deteccion"
+            # Al perder el rostro se reinicia el suavizado
+            self.centro_y_suave = None
+            self.ventana.registrar_postura(self.reloj(), SIN_DETECCION)
+            return POSTURAS[SIN_DETECCION]
         
         (x, y, w, h) = rostro
         centro_y = y + h/2
+        ratio = w / h
+        
+        if self.centro_y_suave is None:
+            self.centro_y_suave = centro_y
+            self.ratio_suave = ratio
+        else:
+            alfa = self.suavizado_postura
+            self.centro_y_suave += alfa * (centro_y - self.centro_y_suave)
+            self.ratio_suave += alfa * (ratio - self.ratio_suave)
         
         # Detectar postura según posición vertical
-        if centro_y < altura_frame * 0.35:
-            postura = "cabeza_alta"
-        elif centro_y > altura_frame * 0.65:
-            postura = "cabeza_baja"
+        if self.centro_y_suave < altura_frame * 0.35:
+            codigo = CABEZA_ALTA
+        elif self.centro_y_suave > altura_frame * 0.65:
+            codigo = CABEZA_BAJA
+        # Detectar inclinación por ratio ancho/alto
+        elif self.ratio_suave < 0.7:
+            codigo = CABEZA_INCLINADA
         else:
-            # Detectar inclinación por ratio ancho/alto
-            ratio = w / h
-            if ratio < 0.7:
-                postura = "cabeza_inclinada"
-            else:
-                postura = "correcta"
-        
-        self.postura_actual = postura
-        return postura
+            codigo = CORRECTA
+        
+        self.ventana.registrar_postura(self.reloj(), codigo)
+        self.postura_actual = POSTURAS[codigo]
+        return self.postura_actual
     
     def calcular_nivel_fatiga(self):
         """
-        Calcula nivel de fatiga cada minuto
+        Evalúa la fatiga sobre la ventana deslizante en cada llamada
+        
+        Devuelve un resultado cada intervalo_evaluacion segundos, o antes si
+        sube algún nivel (con al menos intervalo_minimo_cambio entre
+        resultados); None en el resto de las llamadas y hasta llenar la ventana
         """
-        tiempo_transcurrido = time.time() - self.tiempo_inicio_minuto
+        ahora = self.reloj()
+        if ahora - self.tiempo_inicio_ventana < self.ventana.duracion:
+            return None
+        
+        frecuencia = round(self.ventana.frecuencia_parpadeo(ahora))
+        perclos = self.ventana.perclos(ahora)
+        
+        # Determinar nivel de fatiga visual
+        # Normal: 15-20 parpadeos/minuto
+        if frecuencia > 25:
+            nivel_visual = "alto"
+        elif frecuencia > 20:
+            nivel_visual = "moderado"
+        else:
+            nivel_visual = "bajo"
         
-        if tiempo_transcurrido >= 60:
-            frecuencia = self.contador_parpadeos
-            self.parpadeos_ultimo_minuto.append(frecuencia)
-            
-            # Determinar nivel de fatiga visual
-            # Normal: 15-20 parpadeos/minuto
-            if frecuencia > 25:
+        # PERCLOS solo con la señal de apertura: en modo 'haar' cada ojo no
+        # detectado cuenta como cerrado y el porcentaje sale inflado
+        if self.metodo_parpadeo == 'apertura':
+            if perclos >= UMBRAL_PERCLOS_ALTO:
                 nivel_visual = "alto"
-            elif frecuencia > 20:
+            elif perclos >= UMBRAL_PERCLOS_MODERADO and nivel_visual == "bajo":
                 nivel_visual = "moderado"
-            else:
-                nivel_visual = "bajo"
-            
-            # Fatiga postural
-            if self.postura_actual in ["cabeza_baja", "cabeza_inclinada"]:
-                nivel_postural = "alto"
-            elif self.postura_actual == "cabeza_alta":
-                nivel_postural = "moderado"
-            else:
-                nivel_postural = "bajo"
-            
-            resultado = {
-                'visual': nivel_visual,
-                'postural': nivel_postural,
-                'frecuencia_parpadeo': frecuencia
-            }
-            
-            # Reiniciar contadores
-            self.contador_parpadeos = 0
-            self.tiempo_inicio_minuto = time.time()
-            
-            return resultado
         
-        return None
+        # Fatiga postural: fracción de la ventana fuera de la postura correcta
+        fracciones = self.ventana.fracciones_postura(ahora)
+        nivel_post = nivel_postural(fracciones)
+        
+        niveles = (ORDEN_NIVELES[nivel_visual], ORDEN_NIVELES[nivel_post])
+        if self.ultima_evaluacion is not None:
+            transcurrido = ahora - self.ultima_evaluacion
+            sube = (niveles[0] > self.ultimos_niveles[0] or niveles[1] > self.ultimos_niveles[1])
+            if transcurrido < self.intervalo_evaluacion and not (
+                    sube and transcurrido >= self.intervalo_minimo_cambio):
+                return None
+        
+        self.ultima_evaluacion = ahora
+        self.ultimos_niveles = niveles
+        
+        return {
+            'visual': nivel_visual,
+            'postural': nivel_post,
+            'frecuencia_parpadeo': frecuencia,
+            'perclos': round(perclos, 3),
+            'posturas': {POSTURAS[c]: round(fracciones[c], 3)
+                         for c in (CORRECTA, CABEZA_ALTA, CABEZA_BAJA, CABEZA_INCLINADA)}
+        }
     
-    def actualizar_prolog(self, nivel_visual, nivel_postural):
+    def actualizar_prolog(self, nivel_visual, nivel_postural, esperar=True, timeout=2.0):
         """
         Actualiza hechos dinámicos en Prolog
+        
+        esperar=False devuelve el Future sin bloquear ({'fatiga_general_alta': bool})
         """
         if self.prolog is None:
-            return
+            return False if esperar else None
+        
+        # Un solo lote: ambos niveles + consulta de fatiga general
+        futuro = self.prolog.enviar_lote(
+            [
+                ('actualizar_fatiga', ('visual', nivel_visual)),
+                ('actualizar_fatiga', ('postural', nivel_postural))
+            ],
+            ['fatiga_general_alta']
+        )
+        
+        if not esperar:
+            return futuro
         
         try:
-            # Actualizar fatiga visual
-            list(self.prolog.query("retractall(nivel_fatiga(visual, _))"))
-            list(self.prolog.query(f"assertz(nivel_fatiga(visual, {nivel_visual}))"))
-            
-            # Actualizar fatiga postural
-            list(self.prolog.query("retractall(nivel_fatiga(postural, _))"))
-            list(self.prolog.query(f"assertz(nivel_fatiga(postural, {nivel_postural}))"))
-            
+            resultado = futuro.result(timeout=timeout)
             print(f"Prolog actualizado - Visual: {nivel_visual}, Postural: {nivel_postural}")
             
             # Consultar si hay fatiga general alta
-            resultado = list(self.prolog.query("fatiga_general_alta"))
-            if len(resultado) > 0:
+            if resultado['fatiga_general_alta']:
                 print("⚠️ Prolog detectó: FATIGA GENERAL ALTA")
                 return True
             
@@ -215,38 +559,37 @@ class DetectorFatigaReal:
     
     def registrar_deteccion(self, tipo_fatiga, nivel, indicador):
         """
-        Registra detección en base de datos
+        Guarda la detección en el escritor (no depende de MySQL)
         """
-        if self.sesion_id is None:
+        if self.sesion_id is None or self.escritor is None:
             return
         
-        try:
-            query = """
-                INSERT INTO deteccion_fatiga 
-                (sesion_id, tipo_fatiga, nivel_fatiga, indicador, 
-                 frecuencia_parpadeo, postura_detectada)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            
-            self.cursor.execute(query, (
-                self.sesion_id,
-                tipo_fatiga,
-                nivel,
-                indicador,
-                self.contador_parpadeos,
-                self.postura_actual
-            ))
-            self.db.commit()
-            
-        except Exception as e:
-            print(f"❌ Error registrando: {e}")
+        if not self.escritor.registrar((
+            self.sesion_id,
+            tipo_fatiga,
+            nivel,
+            indicador,
+            self.frecuencia_parpadeo(),
+            self.postura_actual
+        )):
+            print("⚠️ Cola de detecciones llena, registro descartado")
+    
+    def estadisticas_escritura(self):
+        """
+        Profundidad de cola y latencia de escritura a BD
+        """
+        if self.escritor is not None:
+            return self.escritor.estadisticas()
+        return None
     
     def agregar_info_frame(self, frame, rostro, ojos, postura):
         """
         Agrega información visual al frame
         """
-        # Información de parpadeos
-        cv2.putText(frame, f"Parpadeos: {self.contador_parpadeos}", 
+        # Información de parpadeos (ventana deslizante)
+        ahora = self.reloj()
+        cv2.putText(frame, f"Parpadeos: {round(self.ventana.frecuencia_parpadeo(ahora))}/min  "
+                    f"PERCLOS: {self.ventana.perclos(ahora):.0%}", 
                     (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         
         # Información de postura
@@ -255,30 +598,43 @@ class DetectorFatigaReal:
                     (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color_postura, 2)
         
         # Estado de ojos
-        estado_ojos = "Cerrados" if len(ojos) < 2 else "Abiertos"
+        estado_ojos = "Cerrados" if self.ojos_cerrados else "Abiertos"
         cv2.putText(frame, f"Ojos: {estado_ojos}", 
                     (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
     
+    def procesar_frame(self, frame):
+        """
+        Análisis completo de un frame: rostro, ojos, parpadeo, postura y
+        niveles de fatiga (niveles es None salvo cuando hay una evaluación nueva)
+        """
+        # Detectar rostro y ojos
+        rostro, ojos, frame_anotado = self.detectar_rostro_ojos(frame)
+        
+        # Detectar parpadeo
+        self.detectar_parpadeo(ojos)
+        
+        # Analizar postura
+        postura = self.analizar_postura(rostro)
+        
+        # Calcular niveles de fatiga (ventana deslizante)
+        niveles = self.calcular_nivel_fatiga()
+        self.perfil.marca('parpadeo_postura')
+        
+        return rostro, ojos, postura, niveles, frame_anotado
+    
     def ejecutar_monitor_continuo(self):
         try:
             while True:
-                ret, frame = self.cap.read()
+                ret, frame = self.leer_frame()
                 
                 if not ret:
+                    if self.captura_activa():
+                        print("⚠️ Cámara sin frames nuevos, esperando...")
+                        continue
                     print("❌ Error capturando frame")
                     break
                 
-                # Detectar rostro y ojos
-                rostro, ojos, frame_anotado = self.detectar_rostro_ojos(frame)
-                
-                # Detectar parpadeo
-                self.detectar_parpadeo(ojos)
-                
-                # Analizar postura
-                postura = self.analizar_postura(rostro)
-                
-                # Calcular niveles de fatiga (cada minuto)
-                niveles = self.calcular_nivel_fatiga()
+                rostro, ojos, postura, niveles, frame_anotado = self.procesar_frame(frame)
                 
                 if niveles:
                     print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Análisis de fatiga:")
@@ -296,15 +652,33 @@ class DetectorFatigaReal:
                                         f"Parpadeos: {niveles['frecuencia_parpadeo']}/min")
                     self.registrar_deteccion('postural', niveles['postural'], 
                                         f"Postura: {self.postura_actual}")
+                    
+                    estadisticas = self.estadisticas_captura()
+                    if estadisticas:
+                        print(f"Captura: {estadisticas}")
+                    
+                    estadisticas = self.estadisticas_escritura()
+                    if estadisticas:
+                        print(f"BD: {estadisticas}")
+                    self.perfil.marca('minuto')
+                
+                if not self.mostrar_video:
+                    self.registrar_frame_analizado()
+                    continue
                 
                 # Agregar información al frame
                 self.agregar_info_frame(frame_anotado, rostro, ojos, postura)
+                self.registrar_frame_analizado()
+                self.perfil.marca('agregar_info_frame')
                 
                 # Mostrar frame
                 cv2.imshow('Monitor de Fatiga - Salud Ocupacional', frame_anotado)
+                self.perfil.marca('imshow')
                 
                 # Salir con 'q'
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                tecla = cv2.waitKey(1) & 0xFF
+                self.perfil.marca('waitKey')
+                if tecla == ord('q'):
                     break
                 
         except KeyboardInterrupt:
@@ -317,9 +691,11 @@ class DetectorFatigaReal:
         Libera recursos
         """
         self.cap.release()
-        cv2.destroyAllWindows()
-        self.cursor.close()
-        self.db.close()
+        if self.mostrar_video:
+            cv2.destroyAllWindows()
+        if self.escritor is not None:
+            self.escritor.cerrar()
+        self.perfil.reportar()
         print("✓ Recursos liberados")
 
 # ========================================
@@ -327,36 +703,12 @@ class DetectorFatigaReal:
 # ========================================
 
 if __name__ == "__main__":
-    # Configuración
-    db_config = {
-        'host': 'localhost',
-        'user': 'root',
-        'password': '',
-        'database': 'salud_ocupacional'
-    }
-    
     # Obtener sesión activa
     try:
-        conexion = mysql.connector.connect(**db_config)
-        cursor = conexion.cursor(dictionary=True)
-        cursor.execute("SELECT id FROM sesiones_trabajo WHERE estado = 'activa' ORDER BY id DESC LIMIT 1")
-        sesion = cursor.fetchone()
-        
-        if not sesion:
-            cursor.execute("""
-                INSERT INTO sesiones_trabajo (usuario_id, fecha, hora_inicio, estado)
-                VALUES (1, CURDATE(), CURTIME(), 'activa')
-            """)
-            conexion.commit()
-            sesion_id = cursor.lastrowid
-        else:
-            sesion_id = sesion['id']
-        
-        cursor.close()
-        conexion.close()
+        sesion_id, _ = obtener_almacen(DB_CONFIG).obtener_o_crear_sesion()
         
         # Crear detector
-        detector = DetectorFatigaReal(db_config)
+        detector = DetectorFatigaReal(DB_CONFIG)
         detector.establecer_sesion(sesion_id)
         
         # Ejecutar monitor
@@ -365,4 +717,4 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
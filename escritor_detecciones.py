@@ -0,0 +1,174 @@
+"""
+Escritor en Segundo Plano para deteccion_fatiga
+Las detecciones se encolan sin bloquear el loop de video y un hilo escritor
+las inserta por lotes (executemany + un commit por lote)
+"""
+
+import queue
+import threading
+import time
+
+from pool_conexiones import obtener_pool
+
+QUERY_INSERTAR_DETECCION = """
+    INSERT INTO deteccion_fatiga
+    (sesion_id, tipo_fatiga, nivel_fatiga, indicador,
+     frecuencia_parpadeo, postura_detectada)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+# Marca de fin para el hilo escritor
+_FIN = object()
+
+
+class EscritorDetecciones:
+    def __init__(self, db_config=None, tamano_lote=50, intervalo_flush=5.0, capacidad=1000,
+                 en_hilo=True, pool=None):
+        """
+        db_config: configuración MySQL (cada lote usa una conexión prestada del pool)
+        tamano_lote: filas que disparan una escritura inmediata
+        intervalo_flush: segundos máximos que una fila espera en la cola
+        capacidad: tamaño de la cola; si se llena, las filas nuevas se descartan
+        en_hilo: False para no crear hilo escritor; quien lo usa llama a vaciar()
+            periódicamente (ej. una tarea del loop asyncio)
+        pool: objeto con conexion() ya creado (por defecto el pool compartido de db_config)
+        """
+        self.tamano_lote = tamano_lote
+        self.intervalo_flush = intervalo_flush
+        self.cola = queue.Queue(maxsize=capacidad)
+
+        self.pool = pool if pool is not None else obtener_pool(db_config)
+
+        # Métricas
+        self.filas_escritas = 0
+        self.filas_fallidas = 0
+        self.filas_descartadas = 0
+        self.lotes_escritos = 0
+        self._intentos = 0
+        self._latencia_total = 0.0
+        self._latencia_max = 0.0
+
+        self._thread = None
+        if en_hilo:
+            self._thread = threading.Thread(target=self._ejecutar, daemon=True)
+            self._thread.start()
+
+    def registrar(self, fila):
+        """
+        Encola una fila (sesion_id, tipo, nivel, indicador, frecuencia, postura).
+        Nunca bloquea: devuelve False si la cola está llena
+        """
+        try:
+            self.cola.put_nowait(fila)
+            return True
+        except queue.Full:
+            self.filas_descartadas += 1
+            return False
+
+    def _ejecutar(self):
+        """
+        Thread escritor: junta filas hasta completar un lote o vencer el intervalo
+        """
+        lote = []
+        limite = time.monotonic() + self.intervalo_flush
+
+        while True:
+            try:
+                item = self.cola.get(timeout=max(0.0, limite - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _FIN:
+                self._escribir(lote)
+                break
+
+            if item is not None:
+                lote.append(item)
+                # Vaciar lo que ya esté en cola sin esperar
+                while len(lote) < self.tamano_lote:
+                    try:
+                        siguiente = self.cola.get_nowait()
+                    except queue.Empty:
+                        break
+                    if siguiente is _FIN:
+                        self._escribir(lote)
+                        return
+                    lote.append(siguiente)
+
+            if len(lote) >= self.tamano_lote or time.monotonic() >= limite:
+                self._escribir(lote)
+                lote = []
+                limite = time.monotonic() + self.intervalo_flush
+
+    def _escribir(self, lote):
+        if not lote:
+            return
+
+        inicio = time.perf_counter()
+        try:
+            with self.pool.conexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    cursor.executemany(QUERY_INSERTAR_DETECCION, lote)
+                    conexion.commit()
+                except Exception:
+                    conexion.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            self.filas_escritas += len(lote)
+            self.lotes_escritos += 1
+        except Exception as e:
+            self.filas_fallidas += len(lote)
+            print(f"❌ Error escribiendo lote de {len(lote)} detecciones: {e}")
+        finally:
+            latencia = time.perf_counter() - inicio
+            self._intentos += 1
+            self._latencia_total += latencia
+            if latencia > self._latencia_max:
+                self._latencia_max = latencia
+
+    def vaciar(self):
+        """
+        Escribe de inmediato un lote con lo que haya en cola.
+        Devuelve la cantidad de filas del lote (0 si la cola estaba vacía)
+        """
+        lote = []
+        while len(lote) < self.tamano_lote:
+            try:
+                lote.append(self.cola.get_nowait())
+            except queue.Empty:
+                break
+        self._escribir(lote)
+        return len(lote)
+    
+    def profundidad_cola(self):
+        return self.cola.qsize()
+
+    def estadisticas(self):
+        """Profundidad de cola, filas y latencia de escritura por lote"""
+        media = self._latencia_total / self._intentos if self._intentos else 0.0
+        return {
+            'profundidad_cola': self.profundidad_cola(),
+            'filas_escritas': self.filas_escritas,
+            'filas_fallidas': self.filas_fallidas,
+            'filas_descartadas': self.filas_descartadas,
+            'lotes_escritos': self.lotes_escritos,
+            'latencia_media_ms': round(media * 1000, 1),
+            'latencia_max_ms': round(self._latencia_max * 1000, 1)
+        }
+
+    def cerrar(self, timeout=10):
+        """
+        Escribe lo pendiente antes de terminar
+        """
+        if self._thread is None:
+            while self.vaciar():
+                pass
+            return
+        
+        try:
+            self.cola.put(_FIN, timeout=timeout)
+        except queue.Full:
+            print("⚠️ Cola de detecciones llena al cerrar")
+        self._thread.join(timeout=timeout)
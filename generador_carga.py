@@ -0,0 +1,261 @@
+"""
+Generador de Carga Multiusuario Acelerado
+N usuarios simulados (DetectorFatigaSimulado) con sesiones concurrentes
+sobre un reloj virtual comprimido: un turno de 8 horas corre en segundos
+por los mismos caminos que el sistema real (SQLite local con sincronización
+a MySQL, resúmenes incrementales y evaluación de reglas). Con la misma
+semilla la carga generada es idéntica
+"""
+
+import contextlib
+import heapq
+import os
+import random
+import time
+
+from almacenamiento_local import AlmacenLocal
+from detector_fatiga import DetectorFatigaSimulado
+from pool_conexiones import DB_CONFIG
+from reglas_nativas import EvaluadorIncremental
+
+
+@contextlib.contextmanager
+def _silencio():
+    """Descarta los prints por análisis (miles por segundo de carga)"""
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        yield
+
+
+class RelojVirtual:
+    def __init__(self, inicio=None, factor=None):
+        """
+        inicio: epoch virtual del arranque (por defecto ahora)
+        factor: segundos virtuales por segundo real (60 = una hora por
+            minuto). None = sin esperas: el tiempo avanza al siguiente evento
+        """
+        self.inicio = inicio if inicio is not None else time.time()
+        self.factor = factor
+        self._actual = self.inicio
+        self._arranque = time.perf_counter()
+
+    def __call__(self):
+        if self.factor is None:
+            return self._actual
+        return self.inicio + (time.perf_counter() - self._arranque) * self.factor
+
+    def esperar_hasta(self, instante):
+        """Avanza (o duerme en tiempo real) hasta el instante virtual"""
+        if self.factor is None:
+            self._actual = max(self._actual, instante)
+            return
+        restante = (instante - self()) / self.factor
+        if restante > 0:
+            time.sleep(restante)
+
+
+class UsuarioSimulado:
+    def __init__(self, indice, almacen, reloj, rng, evaluador, usuario_id, inicio):
+        """
+        Un puesto de trabajo: detector simulado con su sesión y su
+        evaluador de reglas
+        """
+        self.indice = indice
+        self.reloj = reloj
+        self.rng = rng
+        self.evaluador = evaluador
+        self.detector = DetectorFatigaSimulado(None, almacen=almacen, reloj=reloj, rng=rng)
+        self.detector.tiempo_inicio = inicio
+        self.detector.establecer_sesion(almacen.crear_sesion(usuario_id, inicio))
+        self.co2 = rng.uniform(450, 700)
+
+        # Métricas
+        self.analisis = 0
+        self.eventos = 0
+        self.pausas = 0
+
+    def paso(self):
+        """Un análisis de fatiga más la lectura de CO2 y las reglas afectadas"""
+        resultado = self.detector.analizar_y_registrar()
+        self.analisis += 1
+
+        # Paseo aleatorio del CO2 con deriva hacia arriba (sala sin ventilar)
+        self.co2 = min(2500.0, max(400.0, self.co2 + self.rng.gauss(8, 40)))
+
+        ahora = self.reloj()
+        for tipo in ('visual', 'postural', 'cognitiva'):
+            self.evaluador.actualizar_fatiga(tipo, resultado[tipo])
+        self.evaluador.actualizar_sensor('co2', round(self.co2), time.strftime('%H:%M:%S', time.localtime(ahora)))
+        self.evaluador.actualizar_sesion(1, int((ahora - self.detector.tiempo_inicio) // 60))
+
+        for evento in self.evaluador.evaluar():
+            self.eventos += 1
+            if evento['regla'] == 'requiere_pausa' and evento['valor']:
+                self.pausas += 1
+
+
+class GeneradorCarga:
+    def __init__(self, usuarios=10, factor=None, semilla=7, intervalo=60, db_config=None,
+                 ruta='salud_carga.db', archivo_prolog='salud_ocupacional.pl', usuario_id=1,
+                 inicio=None):
+        """
+        usuarios: sesiones simultáneas
+        factor: compresión del tiempo (ver RelojVirtual; None = lo más rápido posible)
+        semilla: semilla del generador (usuario i usa semilla + i)
+        intervalo: segundos virtuales entre análisis de cada usuario
+        db_config: MySQL central (None = solo local)
+        ruta: SQLite local propio, separado del de producción
+        usuario_id: dueño de las sesiones (debe existir en MySQL)
+        inicio: epoch virtual del turno (por defecto ahora; fijo = timestamps
+            repetibles, o días pasados para poblar los resúmenes)
+        """
+        self.usuarios = usuarios
+        self.semilla = semilla
+        self.intervalo = intervalo
+        self.db_config = db_config
+        self.reloj = RelojVirtual(inicio, factor)
+        self.almacen = AlmacenLocal(db_config, ruta=ruta)
+
+        # Los arranques se reparten en el primer intervalo
+        azar = random.Random(semilla)
+        self.puestos = []
+        with _silencio():
+            for i in range(usuarios):
+                inicio = self.reloj.inicio + azar.uniform(0, intervalo)
+                self.puestos.append(UsuarioSimulado(
+                    i, self.almacen, self.reloj, random.Random(semilla + i),
+                    EvaluadorIncremental(archivo_prolog), usuario_id, inicio
+                ))
+
+        # Métricas
+        self.atraso_max = 0.0
+        self.segundos_reales = 0.0
+
+    def ejecutar(self, horas=8.0, detalle=False, espera_subida=600.0):
+        """
+        Corre el turno de 'horas' virtuales y cierra las sesiones. Con MySQL
+        espera hasta 'espera_subida' segundos a que todo quede subido.
+        Devuelve las estadísticas
+        """
+        fin = self.reloj.inicio + horas * 3600
+        cola = [(p.detector.tiempo_inicio, p.indice) for p in self.puestos]
+        heapq.heapify(cola)
+
+        salida = contextlib.nullcontext() if detalle else _silencio()
+        inicio = time.perf_counter()
+        with salida:
+            while cola and cola[0][0] < fin:
+                instante, indice = heapq.heappop(cola)
+                self.reloj.esperar_hasta(instante)
+                atraso = self.reloj() - instante
+                if atraso > self.atraso_max:
+                    self.atraso_max = atraso
+
+                self.puestos[indice].paso()
+                heapq.heappush(cola, (instante + self.intervalo, indice))
+
+            self.reloj.esperar_hasta(fin)
+            for puesto in self.puestos:
+                self.almacen.finalizar_sesion(puesto.detector.sesion_id, fin)
+        self.segundos_reales = time.perf_counter() - inicio
+
+        if self.db_config is not None:
+            self._esperar_subida(espera_subida)
+        self.almacen.cerrar()
+        return self.estadisticas(horas)
+
+    def _esperar_subida(self, timeout):
+        """
+        Vacía el almacén hasta que no quedan detecciones locales o se agota
+        el timeout (sin conexión se reintenta cada segundo)
+        """
+        limite = time.monotonic() + timeout
+        while self.almacen.pendientes() and time.monotonic() < limite:
+            if not self.almacen.vaciar():
+                time.sleep(1.0)
+
+    def pendientes(self):
+        """Detecciones que no llegaron a MySQL (None si no se sincroniza)"""
+        return self.almacen.pendientes() if self.db_config is not None else None
+
+    def resumir(self):
+        """Resume todo lo subido (marca y agrega en la misma llamada)"""
+        from resumenes import ResumidorIncremental
+
+        resumidor = ResumidorIncremental(self.db_config)
+        resumidor.resumir_todo()
+        return resumidor.estadisticas()
+
+    def estadisticas(self, horas):
+        analisis = sum(p.analisis for p in self.puestos)
+        filas = self.almacen.filas_locales
+        evaluadores = [p.evaluador.estadisticas() for p in self.puestos]
+        return {
+            'usuarios': self.usuarios,
+            'horas_virtuales': horas,
+            'segundos_reales': round(self.segundos_reales, 2),
+            'compresion': round(horas * 3600 / self.segundos_reales) if self.segundos_reales else None,
+            'analisis': analisis,
+            'filas': filas,
+            'filas_por_segundo': round(filas / self.segundos_reales) if self.segundos_reales else None,
+            'atraso_max_s': round(self.atraso_max, 1),
+            'pendientes': self.pendientes(),
+            'eventos_reglas': sum(p.eventos for p in self.puestos),
+            'pausas_recomendadas': sum(p.pausas for p in self.puestos),
+            'evaluaciones': sum(e['evaluaciones'] for e in evaluadores),
+            'evaluaciones_evitadas': sum(e['evaluaciones_evitadas'] for e in evaluadores),
+            'almacen': self.almacen.estadisticas()
+        }
+
+
+# ========================================
+# EJECUCIÓN PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Carga multiusuario con reloj acelerado")
+    parser.add_argument('--usuarios', type=int, default=10, help="Sesiones simultáneas")
+    parser.add_argument('--factor', type=float, default=None,
+                        help="Segundos virtuales por segundo real (sin valor: sin esperas)")
+    parser.add_argument('--horas', type=float, default=8.0, help="Duración virtual del turno")
+    parser.add_argument('--semilla', type=int, default=7, help="Semilla de la carga")
+    parser.add_argument('--intervalo', type=int, default=60, help="Segundos virtuales entre análisis")
+    parser.add_argument('--inicio', default=None, metavar="'AAAA-MM-DD HH:MM'",
+                        help="Inicio virtual del turno (por defecto ahora)")
+    parser.add_argument('--ruta', default='salud_carga.db', help="SQLite local de la prueba")
+    parser.add_argument('--sin-bd', action='store_true', help="No sincronizar con MySQL")
+    parser.add_argument('--espera-subida', type=float, default=600.0, metavar='SEGUNDOS',
+                        help="Tope de espera para subir a MySQL lo pendiente al terminar")
+    parser.add_argument('--resumir', action='store_true', help="Actualizar los resúmenes al terminar")
+    parser.add_argument('--detalle', action='store_true', help="Mostrar cada análisis")
+    args = parser.parse_args()
+
+    db_config = None if args.sin_bd else DB_CONFIG
+    inicio = None
+    if args.inicio:
+        inicio = time.mktime(time.strptime(args.inicio, '%Y-%m-%d %H:%M'))
+    generador = GeneradorCarga(args.usuarios, args.factor, args.semilla, args.intervalo,
+                               db_config, args.ruta, inicio=inicio)
+
+    print(f"▶ {args.usuarios} usuarios, {args.horas:g} h virtuales, "
+          f"{'sin esperas' if args.factor is None else f'factor {args.factor:g}'}, semilla {args.semilla}")
+    estadisticas = generador.ejecutar(args.horas, args.detalle, args.espera_subida)
+
+    print("\n" + "="*60)
+    print("RESULTADO DE LA CARGA")
+    print("="*60)
+    for clave, valor in estadisticas.items():
+        print(f"  {clave}: {valor}")
+
+    if args.resumir:
+        if db_config is None:
+            print("⚠️ --resumir requiere MySQL (omitido con --sin-bd)")
+        else:
+            if estadisticas['pendientes']:
+                print(f"⚠️ {estadisticas['pendientes']} filas sin subir: los resúmenes "
+                      f"no las incluyen (se suben en la próxima ejecución)")
+            try:
+                print(f"✓ Resúmenes: {generador.resumir()}")
+            except Exception as e:
+                print(f"❌ Error actualizando resúmenes: {e}")
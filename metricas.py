@@ -0,0 +1,102 @@
+"""
+Endpoint de Métricas (formato de texto Prometheus)
+Servidor HTTP local en un thread propio. Cada scrape solo lee contadores
+que los componentes ya mantienen: no toma locks del loop de cámara
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PUERTO_METRICAS = 9101
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def formatear_prometheus(muestras):
+    """
+    muestras: iterable de (nombre, tipo, ayuda, valor); valor None se omite
+    """
+    lineas = []
+    for nombre, tipo, ayuda, valor in muestras:
+        if valor is None:
+            continue
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        lineas.append(f"{nombre} {int(valor) if isinstance(valor, (bool, int)) else float(valor)}")
+    return "\n".join(lineas) + "\n"
+
+
+class ServidorMetricas:
+    def __init__(self, colector, puerto=PUERTO_METRICAS, host='127.0.0.1'):
+        """
+        colector: función sin argumentos que devuelve las muestras
+            (nombre, tipo, ayuda, valor) al momento del scrape
+        host: por defecto solo local
+        """
+        self.colector = colector
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                try:
+                    cuerpo = formatear_prometheus(servidor.colector()).encode('utf-8')
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', TIPO_CONTENIDO)
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, puerto), Manejador)
+        self.httpd.daemon_threads = True
+        self.puerto = self.httpd.server_address[1]
+        self._thread = None
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"✓ Métricas en http://{self.httpd.server_address[0]}:{self.puerto}/metrics")
+        return self
+
+    def cerrar(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ========================================
+# PRUEBA DEL MÓDULO
+# ========================================
+
+if __name__ == "__main__":
+    import time
+    import urllib.request
+
+    inicio = time.monotonic()
+    contador = {'frames': 0}
+
+    def colector():
+        contador['frames'] += 30
+        return [
+            ('salud_frames_analizados_total', 'counter', "Frames analizados", contador['frames']),
+            ('salud_uptime_segundos', 'gauge', "Segundos desde el inicio", time.monotonic() - inicio),
+            ('salud_sin_valor', 'gauge', "Se omite", None)
+        ]
+
+    servidor = ServidorMetricas(colector, puerto=0).iniciar()
+    url = f"http://127.0.0.1:{servidor.puerto}/metrics"
+
+    print(urllib.request.urlopen(url).read().decode('utf-8'))
+
+    repeticiones = 200
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        urllib.request.urlopen(url).read()
+    print(f"Scrape: {(time.perf_counter() - t0) / repeticiones * 1000:.2f} ms de media")
+    servidor.cerrar()
@@ -0,0 +1,77 @@
+-- ========================================
+-- MIGRACIÓN: TABLAS DE RESÚMENES POR HORA Y POR DÍA
+-- (las llena resumenes.py de forma incremental)
+-- Idempotente: se puede aplicar sobre una base ya creada con schema.sql
+--   mysql -u root -p < migracion_resumenes.sql
+-- ========================================
+
+USE salud_ocupacional;
+
+CREATE TABLE IF NOT EXISTS resumen_fatiga_hora (
+    sesion_id INT NOT NULL,
+    hora DATETIME NOT NULL,
+    tipo_fatiga ENUM('visual', 'postural', 'cognitiva') NOT NULL,
+    detecciones INT NOT NULL DEFAULT 0,
+    nivel_bajo INT NOT NULL DEFAULT 0,
+    nivel_moderado INT NOT NULL DEFAULT 0,
+    nivel_alto INT NOT NULL DEFAULT 0,
+    suma_parpadeo BIGINT NOT NULL DEFAULT 0,
+    muestras_parpadeo INT NOT NULL DEFAULT 0,
+    promedio_parpadeo DECIMAL(10, 2) AS (suma_parpadeo / NULLIF(muestras_parpadeo, 0)),
+    PRIMARY KEY (sesion_id, hora, tipo_fatiga),
+    FOREIGN KEY (sesion_id) REFERENCES sesiones_trabajo(id) ON DELETE CASCADE,
+    INDEX idx_hora (hora)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_fatiga_dia (
+    sesion_id INT NOT NULL,
+    dia DATE NOT NULL,
+    tipo_fatiga ENUM('visual', 'postural', 'cognitiva') NOT NULL,
+    detecciones INT NOT NULL DEFAULT 0,
+    nivel_bajo INT NOT NULL DEFAULT 0,
+    nivel_moderado INT NOT NULL DEFAULT 0,
+    nivel_alto INT NOT NULL DEFAULT 0,
+    suma_parpadeo BIGINT NOT NULL DEFAULT 0,
+    muestras_parpadeo INT NOT NULL DEFAULT 0,
+    promedio_parpadeo DECIMAL(10, 2) AS (suma_parpadeo / NULLIF(muestras_parpadeo, 0)),
+    PRIMARY KEY (sesion_id, dia, tipo_fatiga),
+    FOREIGN KEY (sesion_id) REFERENCES sesiones_trabajo(id) ON DELETE CASCADE,
+    INDEX idx_dia (dia)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_sensores_hora (
+    sesion_id INT NOT NULL,
+    hora DATETIME NOT NULL,
+    tipo_sensor ENUM('co2', 'ruido', 'temperatura') NOT NULL,
+    lecturas INT NOT NULL DEFAULT 0,
+    minimo DECIMAL(10, 2),
+    maximo DECIMAL(10, 2),
+    suma DECIMAL(16, 2) NOT NULL DEFAULT 0,
+    promedio DECIMAL(10, 2) AS (suma / NULLIF(lecturas, 0)),
+    PRIMARY KEY (sesion_id, hora, tipo_sensor),
+    FOREIGN KEY (sesion_id) REFERENCES sesiones_trabajo(id) ON DELETE CASCADE,
+    INDEX idx_hora (hora)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_sensores_dia (
+    sesion_id INT NOT NULL,
+    dia DATE NOT NULL,
+    tipo_sensor ENUM('co2', 'ruido', 'temperatura') NOT NULL,
+    lecturas INT NOT NULL DEFAULT 0,
+    minimo DECIMAL(10, 2),
+    maximo DECIMAL(10, 2),
+    suma DECIMAL(16, 2) NOT NULL DEFAULT 0,
+    promedio DECIMAL(10, 2) AS (suma / NULLIF(lecturas, 0)),
+    PRIMARY KEY (sesion_id, dia, tipo_sensor),
+    FOREIGN KEY (sesion_id) REFERENCES sesiones_trabajo(id) ON DELETE CASCADE,
+    INDEX idx_dia (dia)
+);
+
+-- Marca de agua por tabla de origen: ultimo_id ya agregado y visto_id
+-- (máximo id observado en la pasada anterior, límite de la siguiente)
+CREATE TABLE IF NOT EXISTS resumen_marcas (
+    tabla VARCHAR(64) PRIMARY KEY,
+    ultimo_id INT NOT NULL DEFAULT 0,
+    visto_id INT NOT NULL DEFAULT 0,
+    actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
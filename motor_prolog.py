@@ -0,0 +1,189 @@
+"""
+Motor de Inferencia Prolog en Hilo Dedicado
+Un único hilo es dueño de la instancia Prolog(): las actualizaciones de
+hechos llegan por cola en lotes, se ejecutan como llamadas pyswip
+precompiladas (Functor) y los resultados vuelven como futures
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from ctypes import c_double
+
+from pyswip import Prolog
+from pyswip.core import (
+    PL_discard_foreign_frame, PL_new_term_ref, PL_open_foreign_frame, _lib, term_t
+)
+from pyswip.easy import Functor, Term, call
+
+# pyswip no expone PL_put_float
+_PL_put_float = _lib.PL_put_float
+_PL_put_float.argtypes = [term_t, c_double]
+
+# Predicados de actualización de salud_ocupacional.pl (nombre -> aridad)
+PREDICADOS_ACTUALIZACION = {
+    'actualizar_fatiga': 2,
+    'actualizar_sensor': 3,
+    'actualizar_actuador': 2,
+    'actualizar_sesion': 2
+}
+
+# Marca de fin para el hilo del motor
+_FIN = object()
+
+_motores = {}
+_lock_motores = threading.Lock()
+
+
+def _argumento(valor):
+    """
+    Convierte un valor Python a argumento pyswip (str = átomo)
+    """
+    if isinstance(valor, float):
+        if valor.is_integer():
+            return int(valor)
+        termino = PL_new_term_ref()
+        _PL_put_float(termino, valor)
+        return Term(termino)
+    return valor
+
+
+class MotorInferencia:
+    def __init__(self, archivo_prolog='salud_ocupacional.pl', timeout_inicio=10):
+        """
+        Arranca el hilo del motor y carga la base de conocimiento en él
+        """
+        self.archivo_prolog = archivo_prolog
+        self.cola = queue.Queue()
+
+        # Métricas
+        self.pedidos_procesados = 0
+        self.errores = 0
+        self._latencia_total = 0.0
+        self._latencia_max = 0.0
+
+        listo = Future()
+        self._thread = threading.Thread(target=self._ejecutar, args=(listo,), daemon=True)
+        self._thread.start()
+
+        # Propaga errores de carga (ej. archivo inexistente) al constructor
+        listo.result(timeout=timeout_inicio)
+
+    # ========================================
+    # API PÚBLICA (cualquier hilo)
+    # ========================================
+
+    def enviar_lote(self, actualizaciones=(), consultas=()):
+        """
+        Encola un lote y devuelve un Future con {consulta: bool}
+
+        actualizaciones: [(predicado, (args...)), ...] ej. ('actualizar_fatiga', ('visual', 'alto'))
+        consultas: nombres de reglas sin argumentos ej. ('fatiga_general_alta',)
+        """
+        futuro = Future()
+        self.cola.put(('lote', (tuple(actualizaciones), tuple(consultas)), futuro))
+        return futuro
+
+    def actualizar_fatiga(self, tipo, nivel):
+        return self.enviar_lote([('actualizar_fatiga', (tipo, nivel))])
+
+    def actualizar_sensor(self, tipo, valor, timestamp):
+        return self.enviar_lote([('actualizar_sensor', (tipo, valor, timestamp))])
+
+    def consultar(self, texto, maxresult=-1):
+        """
+        Consulta libre (se parsea): devuelve un Future con la lista de soluciones
+        """
+        futuro = Future()
+        self.cola.put(('consulta', (texto, maxresult), futuro))
+        return futuro
+
+    def estadisticas(self):
+        media = self._latencia_total / self.pedidos_procesados if self.pedidos_procesados else 0.0
+        return {
+            'profundidad_cola': self.cola.qsize(),
+            'pedidos_procesados': self.pedidos_procesados,
+            'errores': self.errores,
+            'latencia_media_ms': round(media * 1000, 2),
+            'latencia_max_ms': round(self._latencia_max * 1000, 2)
+        }
+
+    def cerrar(self, timeout=5):
+        self.cola.put((_FIN, None, None))
+        self._thread.join(timeout=timeout)
+
+    # ========================================
+    # HILO DEL MOTOR
+    # ========================================
+
+    def _ejecutar(self, listo):
+        try:
+            self.prolog = Prolog()
+            self.prolog.consult(self.archivo_prolog)
+
+            # Functors precompilados: se construyen una sola vez
+            self._functores = {
+                nombre: Functor(nombre, aridad)
+                for nombre, aridad in PREDICADOS_ACTUALIZACION.items()
+            }
+            self._reglas = {}
+            print("✓ Motor Prolog listo (hilo dedicado)")
+            listo.set_result(True)
+        except Exception as e:
+            listo.set_exception(e)
+            return
+
+        while True:
+            tipo, datos, futuro = self.cola.get()
+            if tipo is _FIN:
+                break
+
+            if not futuro.set_running_or_notify_cancel():
+                continue
+
+            inicio = time.perf_counter()
+            try:
+                if tipo == 'lote':
+                    futuro.set_result(self._procesar_lote(*datos))
+                else:
+                    texto, maxresult = datos
+                    futuro.set_result(list(self.prolog.query(texto, maxresult=maxresult)))
+            except Exception as e:
+                self.errores += 1
+                futuro.set_exception(e)
+            finally:
+                latencia = time.perf_counter() - inicio
+                self.pedidos_procesados += 1
+                self._latencia_total += latencia
+                if latencia > self._latencia_max:
+                    self._latencia_max = latencia
+
+    def _procesar_lote(self, actualizaciones, consultas):
+        # Los términos creados se liberan al descartar el frame
+        frame = PL_open_foreign_frame()
+        try:
+            for predicado, argumentos in actualizaciones:
+                functor = self._functores[predicado]
+                if not call(functor(*[_argumento(a) for a in argumentos])):
+                    raise RuntimeError(f"Falló {predicado}{tuple(argumentos)}")
+
+            resultados = {}
+            for regla in consultas:
+                if regla not in self._reglas:
+                    self._reglas[regla] = Functor(regla, 0)
+                resultados[regla] = bool(call(self._reglas[regla]()))
+            return resultados
+        finally:
+            PL_discard_foreign_frame(frame)
+
+
+def obtener_motor(archivo_prolog='salud_ocupacional.pl'):
+    """
+    Devuelve el motor compartido para la base de conocimiento
+    (pyswip usa un único motor SWI-Prolog por proceso)
+    """
+    with _lock_motores:
+        if archivo_prolog not in _motores:
+            _motores[archivo_prolog] = MotorInferencia(archivo_prolog)
+        return _motores[archivo_prolog]
@@ -0,0 +1,182 @@
+"""
+Perfilador de Etapas del Loop de Visión
+Mide cada etapa del frame (lectura, cvtColor, cascadas, dibujo, imshow...)
+en histogramas logarítmicos de tamaño fijo y reporta p50/p95/p99 y FPS
+"""
+
+import math
+import time
+
+# Cubetas logarítmicas: 20 por década de 1 µs a 10 s (error de ~6% por cubeta)
+_CUBETAS_POR_DECADA = 20
+_EXPONENTE_MINIMO = -6
+_NUM_CUBETAS = _CUBETAS_POR_DECADA * 7 + 1
+
+
+class HistogramaTiempos:
+    __slots__ = ('cubetas', 'cantidad', 'total', 'maximo')
+
+    def __init__(self):
+        self.cubetas = [0] * _NUM_CUBETAS
+        self.cantidad = 0
+        self.total = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos):
+        if segundos > 0:
+            indice = int((math.log10(segundos) - _EXPONENTE_MINIMO) * _CUBETAS_POR_DECADA)
+            indice = min(max(indice, 0), _NUM_CUBETAS - 1)
+        else:
+            indice = 0
+
+        self.cubetas[indice] += 1
+        self.cantidad += 1
+        self.total += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def percentil(self, p):
+        """Segundos del percentil p (centro geométrico de su cubeta)"""
+        if not self.cantidad:
+            return 0.0
+
+        objetivo = p / 100 * self.cantidad
+        acumulado = 0
+        for indice, cuenta in enumerate(self.cubetas):
+            acumulado += cuenta
+            if acumulado >= objetivo and cuenta:
+                centro = 10 ** ((indice + 0.5) / _CUBETAS_POR_DECADA + _EXPONENTE_MINIMO)
+                return min(centro, self.maximo)
+        return self.maximo
+
+    def resumen(self):
+        return {
+            'n': self.cantidad,
+            'media_ms': round(self.total / self.cantidad * 1000, 3) if self.cantidad else 0.0,
+            'p50_ms': round(self.percentil(50) * 1000, 3),
+            'p95_ms': round(self.percentil(95) * 1000, 3),
+            'p99_ms': round(self.percentil(99) * 1000, 3)
+        }
+
+
+class Perfilador:
+    def __init__(self, intervalo_reporte=10.0, reloj=time.perf_counter, salida=print):
+        """
+        Tiempos por vuelta: cada marca(etapa) registra lo transcurrido desde
+        la marca anterior (o desde iniciar_frame)
+
+        intervalo_reporte: segundos entre resúmenes impresos (None = solo a pedido)
+        salida: función que recibe cada línea del resumen
+        """
+        self.intervalo_reporte = intervalo_reporte
+        self.reloj = reloj
+        self.salida = salida
+
+        self.histogramas = {}
+        self.histograma_frame = HistogramaTiempos()
+        self._t_frame = None
+        self._t_marca = None
+        self._inicio_ventana = reloj()
+
+    def iniciar_frame(self):
+        """Cierra el frame anterior y abre uno nuevo"""
+        ahora = self.reloj()
+        if self._t_frame is not None:
+            self.histograma_frame.registrar(ahora - self._t_frame)
+            if self.intervalo_reporte and ahora - self._inicio_ventana >= self.intervalo_reporte:
+                self.reportar()
+                ahora = self.reloj()
+        self._t_frame = self._t_marca = ahora
+
+    def marca(self, etapa):
+        ahora = self.reloj()
+        if self._t_marca is None:
+            self._t_marca = ahora
+            return
+
+        histograma = self.histogramas.get(etapa)
+        if histograma is None:
+            histograma = self.histogramas[etapa] = HistogramaTiempos()
+        histograma.registrar(ahora - self._t_marca)
+        self._t_marca = ahora
+
+    def resumen(self):
+        """Percentiles por etapa y FPS de la ventana actual"""
+        duracion = self.reloj() - self._inicio_ventana
+        frames = self.histograma_frame.cantidad
+        return {
+            'frames': frames,
+            'fps': round(frames / duracion, 1) if duracion > 0 else 0.0,
+            'frame': self.histograma_frame.resumen(),
+            'etapas': {etapa: h.resumen() for etapa, h in self.histogramas.items()}
+        }
+
+    def reportar(self):
+        """Imprime el resumen y empieza una ventana nueva"""
+        datos = self.resumen()
+        self.salida(f"⏱ Perfil de etapas ({datos['frames']} frames, {datos['fps']} fps)")
+        self.salida(f"  {'etapa':<20}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for etapa, fila in list(datos['etapas'].items()) + [('frame completo', datos['frame'])]:
+            self.salida(f"  {etapa:<20}{fila['n']:>7}{fila['p50_ms']:>10.3f}"
+                        f"{fila['p95_ms']:>10.3f}{fila['p99_ms']:>10.3f}")
+
+        self.histogramas = {}
+        self.histograma_frame = HistogramaTiempos()
+        self._inicio_ventana = self.reloj()
+        return datos
+
+
+class PerfiladorInactivo:
+    """Perfilador apagado: mismas llamadas, sin leer el reloj"""
+
+    def iniciar_frame(self):
+        pass
+
+    def marca(self, etapa):
+        pass
+
+    def resumen(self):
+        return None
+
+    def reportar(self):
+        return None
+
+
+PERFIL_INACTIVO = PerfiladorInactivo()
+
+
+# ========================================
+# PRUEBA DEL MÓDULO
+# ========================================
+
+if __name__ == "__main__":
+    import sys
+
+    print("="*60)
+    print("COSTO DEL PERFILADOR POR MARCA")
+    print("="*60)
+
+    repeticiones = 200000
+    for nombre, perfil in (('inactivo', PERFIL_INACTIVO), ('activo', Perfilador(None))):
+        perfil.iniciar_frame()
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            perfil.marca('etapa')
+        costo = (time.perf_counter() - inicio) / repeticiones
+        print(f"{nombre:>9}: {costo * 1e9:.0f} ns por marca")
+
+    if len(sys.argv) > 1:
+        from detector_fatiga_real import DetectorFatigaReal
+
+        detector = DetectorFatigaReal(
+            None, archivo_prolog=None, fuente_video=sys.argv[1], captura_en_hilo=False,
+            mostrar_video=False, perfilar=True, intervalo_perfil=None
+        )
+        while True:
+            ret, frame = detector.leer_frame()
+            if not ret:
+                break
+            detector.procesar_frame(frame)
+        print()
+        # cerrar() imprime el perfil acumulado
+        detector.cerrar()
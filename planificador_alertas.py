@@ -0,0 +1,271 @@
+"""
+Planificador de Alertas por Prioridad
+Ordena las alertas según prioridad_alerta/2 de la base de conocimiento,
+fusiona duplicados del mismo tipo, descarta alertas vencidas y permite que
+una alerta más prioritaria interrumpa un ejercicio guiado en curso
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+from perfilador import HistogramaTiempos
+from reglas_nativas import cargar_hechos
+
+# Tipo de alerta del sistema -> alerta de prioridad_alerta/2
+ALERTA_PROLOG = {
+    'co2_alto': 'co2_critico',
+    'fatiga_visual': 'fatiga_alta',
+    'fatiga_postural': 'postura_inadecuada',
+    'ruido_alto': 'ruido_excesivo',
+    'pausa': 'tiempo_trabajo_largo'
+}
+
+PRIORIDAD_DEFECTO = 3
+
+# Segundos que una alerta sigue siendo útil mientras espera
+VIGENCIA_DEFECTO = {
+    'co2_alto': 300,
+    'fatiga_visual': 120,
+    'fatiga_postural': 120
+}
+
+
+def cargar_prioridades(archivo_prolog='salud_ocupacional.pl'):
+    """
+    {tipo_alerta: prioridad} desde prioridad_alerta/2 (1 = alta)
+    """
+    prioridades_prolog = {}
+    for alerta, prioridad in cargar_hechos(archivo_prolog).get('prioridad_alerta', []):
+        prioridades_prolog.setdefault(alerta, prioridad)
+
+    return {
+        tipo: prioridades_prolog.get(alerta, PRIORIDAD_DEFECTO)
+        for tipo, alerta in ALERTA_PROLOG.items()
+    }
+
+
+class PlanificadorAlertas:
+    def __init__(self, pasos_alerta, prioridades=None, vigencias=None,
+                 archivo_prolog='salud_ocupacional.pl', reloj=time.monotonic):
+        """
+        pasos_alerta: función alerta -> lista de pasos. Cada paso es una
+            función (se ejecuta) o un número (segundos de espera interrumpible).
+            Un paso 'ejercicio' marca el inicio de la guía: desde ahí la
+            secuencia tiene un nivel menos de prioridad y puede ser interrumpida
+        prioridades: {tipo: prioridad}; por defecto se leen de la base de conocimiento
+        vigencias: {tipo: segundos}; alertas más viejas se descartan sin hablar
+        """
+        self.pasos_alerta = pasos_alerta
+        self.prioridades = prioridades or cargar_prioridades(archivo_prolog)
+        self.vigencias = vigencias or VIGENCIA_DEFECTO
+        self.reloj = reloj
+
+        self._heap = []
+        self._pendientes = {}
+        self._secuencia = itertools.count()
+        self._condicion = threading.Condition()
+        self._corriendo = False
+        self._prioridad_actual = None
+        self._thread = None
+
+        # Métricas
+        self.atendidas = 0
+        self.fusionadas = 0
+        self.vencidas = 0
+        self.interrumpidas = 0
+        # Latencia alerta -> voz en cubetas fijas (no crece con el uso)
+        self.latencias = HistogramaTiempos()
+
+    def prioridad(self, tipo):
+        return self.prioridades.get(tipo, PRIORIDAD_DEFECTO)
+
+    # ========================================
+    # API PÚBLICA (cualquier hilo)
+    # ========================================
+
+    def encolar(self, alerta):
+        """
+        Agrega una alerta. Si ya hay una pendiente del mismo tipo se fusiona:
+        conserva su lugar y antigüedad, con los datos más recientes
+        """
+        tipo = alerta['tipo']
+        with self._condicion:
+            existente = self._pendientes.get(tipo)
+            if existente is not None:
+                existente['alerta'] = alerta
+                self.fusionadas += 1
+                return
+
+            entrada = {'alerta': alerta, 'creada': self.reloj()}
+            self._pendientes[tipo] = entrada
+            heapq.heappush(self._heap, (self.prioridad(tipo), next(self._secuencia), entrada))
+            # Despierta al worker (para atenderla o para interrumpir)
+            self._condicion.notify_all()
+
+    def iniciar(self):
+        self._corriendo = True
+        self._thread = threading.Thread(target=self._ejecutar, daemon=True)
+        self._thread.start()
+
+    def pendientes(self):
+        with self._condicion:
+            return len(self._pendientes)
+
+    def estadisticas(self):
+        """Alertas atendidas/fusionadas/vencidas y latencia alerta -> voz"""
+        latencias = self.latencias
+        resultado = {
+            'atendidas': self.atendidas,
+            'fusionadas': self.fusionadas,
+            'vencidas': self.vencidas,
+            'interrumpidas': self.interrumpidas,
+            'pendientes': self.pendientes()
+        }
+        if latencias.cantidad:
+            resultado['latencia_media_ms'] = round(latencias.total / latencias.cantidad * 1000, 1)
+            resultado['latencia_p95_ms'] = round(latencias.percentil(95) * 1000, 1)
+            resultado['latencia_max_ms'] = round(latencias.maximo * 1000, 1)
+        return resultado
+
+    def cerrar(self, timeout=5):
+        with self._condicion:
+            self._corriendo = False
+            self._condicion.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    # ========================================
+    # WORKER
+    # ========================================
+
+    def _siguiente(self):
+        """
+        Espera la próxima alerta vigente (None al cerrar)
+        """
+        with self._condicion:
+            while self._corriendo:
+                while self._heap:
+                    _, _, entrada = heapq.heappop(self._heap)
+                    tipo = entrada['alerta']['tipo']
+                    del self._pendientes[tipo]
+
+                    edad = self.reloj() - entrada['creada']
+                    if edad > self.vigencias.get(tipo, float('inf')):
+                        self.vencidas += 1
+                        print(f"⌛ Alerta {tipo} vencida ({edad:.0f} s), se descarta")
+                        continue
+                    return entrada
+                self._condicion.wait()
+            return None
+
+    def _hay_mas_prioritaria(self):
+        return bool(self._heap) and self._heap[0][0] < self._prioridad_actual
+
+    def _esperar(self, segundos):
+        """
+        Espera interrumpible: True si llegó una alerta más prioritaria
+        """
+        limite = self.reloj() + segundos
+        with self._condicion:
+            while self._corriendo and not self._hay_mas_prioritaria():
+                restante = limite - self.reloj()
+                if restante <= 0:
+                    return False
+                self._condicion.wait(restante)
+            return True
+
+    def _ejecutar(self):
+        while True:
+            entrada = self._siguiente()
+            if entrada is None:
+                break
+
+            alerta = entrada['alerta']
+            tipo = alerta['tipo']
+            with self._condicion:
+                self._prioridad_actual = self.prioridad(tipo)
+
+            primer_paso = True
+            try:
+                for paso in self.pasos_alerta(alerta):
+                    if paso == 'ejercicio':
+                        # La guía cede ante alertas de su misma prioridad
+                        with self._condicion:
+                            self._prioridad_actual += 1
+                        continue
+
+                    if isinstance(paso, (int, float)):
+                        if self._esperar(paso):
+                            if self._corriendo:
+                                self.interrumpidas += 1
+                                print(f"⏸ Se interrumpe {tipo} por una alerta más prioritaria")
+                            break
+                        continue
+
+                    if primer_paso:
+                        self.latencias.registrar(self.reloj() - entrada['creada'])
+                        primer_paso = False
+                    paso()
+
+                    with self._condicion:
+                        if self._prioridad_actual > self.prioridad(tipo) and self._hay_mas_prioritaria():
+                            self.interrumpidas += 1
+                            print(f"⏸ Se interrumpe {tipo} por una alerta más prioritaria")
+                            break
+
+                self.atendidas += 1
+            except Exception as e:
+                print(f"✗ Error procesando alerta: {e}")
+            finally:
+                with self._condicion:
+                    self._prioridad_actual = None
+
+
+# ========================================
+# PRUEBA DEL MÓDULO
+# ========================================
+
+if __name__ == "__main__":
+    inicio = time.monotonic()
+
+    def decir(texto):
+        def paso():
+            print(f"[{time.monotonic() - inicio:5.2f} s] 🔊 {texto}")
+            time.sleep(0.2)
+        return paso
+
+    def pasos(alerta):
+        if alerta['tipo'] == 'co2_alto':
+            return [decir(f"CO2 elevado: {alerta['valor']} ppm")]
+        return [
+            decir(f"Alerta {alerta['tipo']}"), 0.2, 'ejercicio',
+            decir("Paso 1 del ejercicio"), 1.0,
+            decir("Paso 2 del ejercicio"), 1.0,
+            decir("Ejercicio completado")
+        ]
+
+    print("="*60)
+    print("PRUEBA DEL PLANIFICADOR DE ALERTAS")
+    print("="*60)
+
+    planificador = PlanificadorAlertas(pasos, vigencias={'fatiga_postural': 0.5})
+    print(f"Prioridades: {planificador.prioridades}")
+    planificador.iniciar()
+
+    planificador.encolar({'tipo': 'fatiga_postural', 'nivel': 'alto'})
+    time.sleep(0.8)
+    # Llega CO2 durante el ejercicio: lo interrumpe. Los duplicados se fusionan
+    planificador.encolar({'tipo': 'co2_alto', 'valor': 1250})
+    planificador.encolar({'tipo': 'co2_alto', 'valor': 1290})
+    # fatiga_visual espera detrás de CO2; la postural, de menor prioridad,
+    # vence antes de ser atendida
+    planificador.encolar({'tipo': 'fatiga_visual', 'nivel': 'alto'})
+    planificador.encolar({'tipo': 'fatiga_postural', 'nivel': 'moderado'})
+    time.sleep(0.1)
+    planificador.encolar({'tipo': 'co2_alto', 'valor': 1310})
+
+    time.sleep(3)
+    planificador.cerrar()
+    print(f"\nEstadísticas: {planificador.estadisticas()}")
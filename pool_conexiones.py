@@ -0,0 +1,186 @@
+"""
+Pool de Conexiones MySQL Compartido
+Todos los componentes Python piden prestadas conexiones a un único pool
+(mysql.connector.pooling) en lugar de abrir conexiones propias
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Configuración única de base de datos (sobrescribible por variables de entorno)
+DB_CONFIG = {
+    'host': os.environ.get('SALUD_DB_HOST', 'localhost'),
+    'user': os.environ.get('SALUD_DB_USER', 'root'),
+    'password': os.environ.get('SALUD_DB_PASSWORD', ''),
+    'database': os.environ.get('SALUD_DB_NAME', 'salud_ocupacional')
+}
+
+TAMANO_POOL_DEFECTO = int(os.environ.get('SALUD_DB_POOL', '5'))
+
+_pools = {}
+_lock_pools = threading.Lock()
+
+
+class PoolConexiones:
+    def __init__(self, db_config=None, tamano=TAMANO_POOL_DEFECTO, nombre='salud_ocupacional',
+                 reintentos=3, espera_reintento=1.0):
+        """
+        db_config: configuración MySQL (por defecto DB_CONFIG)
+        tamano: conexiones máximas abiertas contra el servidor
+        reintentos / espera_reintento: reconexión ante fallas del servidor
+        """
+        self.db_config = dict(db_config or DB_CONFIG)
+        self.tamano = tamano
+        self.nombre = nombre
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+
+        self.pool = None
+        self._lock = threading.Lock()
+        # Limita los préstamos simultáneos: al agotarse se espera en vez de fallar
+        self._disponibles = threading.BoundedSemaphore(tamano)
+
+        # Métricas
+        self.prestamos = 0
+        self.fallas = 0
+
+        # mysql.connector se importa recién aquí (no en el arranque de quien importa el módulo)
+        import mysql.connector
+
+        try:
+            self._crear_pool()
+        except mysql.connector.Error as e:
+            # Se reintenta en el primer préstamo
+            print(f"⚠️ Pool MySQL no disponible todavía: {e}")
+
+    def _crear_pool(self):
+        from mysql.connector import pooling
+
+        with self._lock:
+            if self.pool is None:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name=self.nombre,
+                    pool_size=self.tamano,
+                    pool_reset_session=True,
+                    **self.db_config
+                )
+                print(f"✓ Pool MySQL creado ({self.tamano} conexiones)")
+
+    def obtener(self, timeout=10):
+        """
+        Presta una conexión (get_connection reabre las que el servidor
+        cerró). Devolverla con devolver()
+        """
+        if not self._disponibles.acquire(timeout=timeout):
+            raise TimeoutError("Pool de conexiones agotado")
+
+        try:
+            return self._obtener_sana()
+        except Exception:
+            self._disponibles.release()
+            raise
+
+    def _obtener_sana(self):
+        import mysql.connector
+
+        ultimo_error = None
+
+        for intento in range(self.reintentos):
+            try:
+                if self.pool is None:
+                    self._crear_pool()
+
+                conexion = self.pool.get_connection()
+                self.prestamos += 1
+                return conexion
+
+            except mysql.connector.Error as e:
+                ultimo_error = e
+                self.fallas += 1
+                time.sleep(self.espera_reintento * (intento + 1))
+
+        raise ultimo_error
+
+    def devolver(self, conexion):
+        """Regresa la conexión al pool"""
+        try:
+            conexion.close()
+        finally:
+            self._disponibles.release()
+
+    @contextmanager
+    def conexion(self, timeout=10):
+        """
+        Uso: with pool.conexion() as conexion: ...
+        """
+        conexion = self.obtener(timeout)
+        try:
+            yield conexion
+        finally:
+            self.devolver(conexion)
+
+    def verificar(self):
+        """Health check completo contra el servidor"""
+        try:
+            with self.conexion(timeout=2) as conexion:
+                cursor = conexion.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def estadisticas(self):
+        return {
+            'tamano': self.tamano,
+            'prestamos': self.prestamos,
+            'fallas': self.fallas
+        }
+
+
+def obtener_pool(db_config=None, tamano=TAMANO_POOL_DEFECTO):
+    """
+    Devuelve el pool compartido para la configuración (uno por servidor/BD)
+    """
+    config = dict(db_config or DB_CONFIG)
+    clave = tuple(sorted((k, str(v)) for k, v in config.items()))
+
+    with _lock_pools:
+        if clave not in _pools:
+            nombre = f"salud_ocupacional_{len(_pools)}"
+            _pools[clave] = PoolConexiones(config, tamano, nombre)
+        return _pools[clave]
+
+
+def obtener_o_crear_sesion(pool=None, usuario_id=1):
+    """
+    Devuelve (sesion_id, creada) de la sesión activa más reciente,
+    creando una nueva si no existe
+    """
+    pool = pool or obtener_pool()
+
+    with pool.conexion() as conexion:
+        cursor = conexion.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id FROM sesiones_trabajo
+            WHERE estado = 'activa'
+            ORDER BY id DESC LIMIT 1
+        """)
+        sesion = cursor.fetchone()
+
+        if sesion:
+            cursor.close()
+            return sesion['id'], False
+
+        cursor.execute("""
+            INSERT INTO sesiones_trabajo (usuario_id, fecha, hora_inicio, estado)
+            VALUES (%s, CURDATE(), CURTIME(), 'activa')
+        """, (usuario_id,))
+        conexion.commit()
+        sesion_id = cursor.lastrowid
+        cursor.close()
+
+    return sesion_id, True
@@ -0,0 +1,217 @@
+"""
+Proceso de Síntesis de Voz Persistente
+Un proceso worker mantiene un único motor pyttsx3 vivo. Las frases fijas se
+pre-renderizan a disco con save_to_file y se reproducen desde caché; solo el
+texto dinámico se sintetiza en vivo
+"""
+
+import hashlib
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+# Marca de fin para el proceso
+_FIN = None
+
+
+def ruta_cache(directorio, texto, velocidad, volumen):
+    """Archivo de audio de la frase (clave: texto + velocidad + volumen)"""
+    clave = hashlib.sha1(f"{texto}|{velocidad}|{volumen}".encode('utf-8')).hexdigest()
+    return os.path.join(directorio, f"{clave}.wav")
+
+
+def _reproductor():
+    """Devuelve una función que reproduce un WAV (bloqueante) o None"""
+    if sys.platform == 'win32':
+        import winsound
+        return lambda ruta: winsound.PlaySound(ruta, winsound.SND_FILENAME)
+
+    for programa in ('afplay', 'paplay', 'aplay'):
+        ejecutable = shutil.which(programa)
+        if ejecutable:
+            return lambda ruta: subprocess.run(
+                [ejecutable, ruta], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+    return None
+
+
+def _proceso_voz(pedidos, respuestas, velocidad, volumen):
+    """
+    Loop del worker. Pedidos: (tipo, id, texto, ruta)
+        'decir'       -> síntesis en vivo (si trae ruta, se cachea después)
+        'reproducir'  -> audio desde caché
+        'precalentar' -> texto = [(texto, ruta), ...] a renderizar en ratos libres
+    Respuestas: (id, 'hecho' | 'error', instante del primer audio | mensaje);
+    al arrancar (None, 'listo' | 'error', None | mensaje)
+    """
+    try:
+        import pyttsx3
+
+        engine = pyttsx3.init()
+        engine.setProperty('rate', velocidad)
+        engine.setProperty('volume', volumen)
+    except Exception as e:
+        # El padre cae al modo robusto sin esperar el timeout de inicio
+        respuestas.put((None, 'error', f"{type(e).__name__}: {e}"))
+        return
+
+    primer_audio = {}
+    engine.connect('started-utterance', lambda name: primer_audio.setdefault('t', time.time()))
+
+    reproducir = _reproductor()
+    por_renderizar = []
+    respuestas.put((None, 'listo', None))
+
+    def renderizar(texto, ruta):
+        if os.path.exists(ruta):
+            return
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        temporal = ruta + '.tmp.wav'
+        engine.save_to_file(texto, temporal)
+        engine.runAndWait()
+        if os.path.exists(temporal) and os.path.getsize(temporal) > 0:
+            os.replace(temporal, ruta)
+
+    while True:
+        # Los pedidos en vivo tienen prioridad; se renderiza en los ratos libres
+        try:
+            pedido = pedidos.get(block=not por_renderizar)
+        except queue.Empty:
+            try:
+                renderizar(*por_renderizar.pop(0))
+            except Exception as e:
+                print(f"⚠️ No se pudo renderizar frase: {e}")
+            continue
+
+        if pedido is _FIN:
+            break
+
+        tipo, id_pedido, texto, ruta = pedido
+        try:
+            if tipo == 'precalentar':
+                por_renderizar.extend(texto)
+                continue
+
+            if tipo == 'reproducir' and reproducir is not None and os.path.exists(ruta):
+                instante = time.time()
+                reproducir(ruta)
+            else:
+                primer_audio.clear()
+                engine.say(texto)
+                engine.runAndWait()
+                instante = primer_audio.get('t', time.time())
+                if ruta:
+                    por_renderizar.append((texto, ruta))
+
+            respuestas.put((id_pedido, 'hecho', instante))
+        except Exception as e:
+            respuestas.put((id_pedido, 'error', str(e)))
+
+    engine.stop()
+
+
+class ProcesoVoz:
+    def __init__(self, velocidad=150, volumen=1.0, directorio_cache='cache_voz', timeout_inicio=15):
+        """
+        Arranca el worker (spawn: pyttsx3/COM no sobreviven a fork)
+        """
+        self.velocidad = velocidad
+        self.volumen = volumen
+        self.directorio_cache = directorio_cache
+
+        contexto = multiprocessing.get_context('spawn')
+        self.pedidos = contexto.Queue()
+        self.respuestas = contexto.Queue()
+        self.proceso = contexto.Process(
+            target=_proceso_voz,
+            args=(self.pedidos, self.respuestas, velocidad, volumen),
+            daemon=True
+        )
+        self.proceso.start()
+
+        self._lock = threading.Lock()
+        self._siguiente_id = 0
+
+        try:
+            _, estado, dato = self._esperar_respuesta(timeout_inicio)
+        except Exception:
+            self.cerrar(timeout=1)
+            raise
+        if estado != 'listo':
+            self.cerrar(timeout=1)
+            raise RuntimeError(f"El proceso de voz no inició: {dato}")
+
+    def _esperar_respuesta(self, timeout):
+        """
+        Siguiente respuesta del worker. Si el proceso muere no se espera el
+        timeout completo: RuntimeError en cuanto se nota
+        """
+        limite = time.monotonic() + timeout
+        while True:
+            try:
+                return self.respuestas.get(timeout=min(0.2, max(0.0, limite - time.monotonic())))
+            except queue.Empty:
+                if not self.proceso.is_alive():
+                    raise RuntimeError(f"El proceso de voz terminó (código {self.proceso.exitcode})")
+                if time.monotonic() >= limite:
+                    raise
+
+    def precalentar(self, frases):
+        """
+        Encola el renderizado de las frases que todavía no están en caché
+        """
+        pendientes = [
+            (texto, self.ruta(texto)) for texto in frases
+            if not os.path.exists(self.ruta(texto))
+        ]
+        if pendientes:
+            self.pedidos.put(('precalentar', None, pendientes, None))
+        return len(pendientes)
+
+    def ruta(self, texto):
+        return ruta_cache(self.directorio_cache, texto, self.velocidad, self.volumen)
+
+    def hablar(self, texto, cachear=False, timeout=60):
+        """
+        Habla y espera a que termine. Devuelve el tiempo hasta el primer
+        audio en segundos (None si falló)
+
+        cachear: True para frases fijas (se reproducen desde disco)
+        """
+        with self._lock:
+            self._siguiente_id += 1
+            id_pedido = self._siguiente_id
+            ruta = self.ruta(texto) if cachear else None
+            tipo = 'reproducir' if ruta and os.path.exists(ruta) else 'decir'
+
+            inicio = time.time()
+            self.pedidos.put((tipo, id_pedido, texto, ruta))
+
+            while True:
+                try:
+                    id_respuesta, estado, dato = self._esperar_respuesta(timeout)
+                except queue.Empty:
+                    print(f"⚠️ Sin respuesta del proceso de voz: {texto}")
+                    return None
+                except RuntimeError as e:
+                    print(f"❌ {e}: {texto}")
+                    return None
+                if id_respuesta == id_pedido:
+                    break
+
+            if estado != 'hecho':
+                print(f"❌ Error: {dato}")
+                return None
+            return max(0.0, dato - inicio)
+
+    def cerrar(self, timeout=5):
+        if self.proceso.is_alive():
+            self.pedidos.put(_FIN)
+        self.proceso.join(timeout=timeout)
+        if self.proceso.is_alive():
+            self.proceso.terminate()
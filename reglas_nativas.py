@@ -0,0 +1,593 @@
+"""
+Evaluador Nativo de Reglas (espejo de salud_ocupacional.pl)
+Carga los hechos estáticos de la base de conocimiento al iniciar, compila los
+rangos estandar_* en tablas de intervalos con búsqueda binaria y evalúa las
+reglas en microsegundos, sin ida y vuelta a SWI-Prolog
+"""
+
+import re
+from bisect import bisect_right
+from collections import OrderedDict
+
+# hecho(arg1, arg2, ...).  (una cláusula por línea, sin cuerpo)
+_PATRON_HECHO = re.compile(r"^([a-z]\w*)\((.*)\)\.\s*(%.*)?$")
+_PATRON_ARGUMENTO = re.compile(r"\s*('(?:[^'\\]|\\.)*'|[^,]+)\s*(?:,|$)")
+
+TIPOS_FATIGA = ('visual', 'postural', 'cognitiva')
+
+
+def _convertir(texto):
+    texto = texto.strip()
+    if texto.startswith("'") and texto.endswith("'"):
+        return texto[1:-1]
+    try:
+        return int(texto)
+    except ValueError:
+        pass
+    try:
+        return float(texto)
+    except ValueError:
+        return texto
+
+
+def cargar_hechos(archivo_prolog='salud_ocupacional.pl'):
+    """
+    Lee los hechos (cláusulas sin cuerpo) del archivo en orden de aparición.
+    Devuelve {predicado: [tupla_argumentos, ...]}
+    """
+    hechos = {}
+    with open(archivo_prolog, encoding='utf-8') as archivo:
+        for linea in archivo:
+            linea = linea.strip()
+            if ':-' in linea:
+                continue
+            coincidencia = _PATRON_HECHO.match(linea)
+            if not coincidencia:
+                continue
+            nombre, argumentos = coincidencia.group(1), coincidencia.group(2)
+            valores = tuple(_convertir(a) for a in _PATRON_ARGUMENTO.findall(argumentos))
+            hechos.setdefault(nombre, []).append(valores)
+    return hechos
+
+
+class TablaIntervalos:
+    """
+    Rangos [min, max] sin solapamiento: nivel por búsqueda binaria.
+    Los huecos entre rangos (ej. 800.5 entre 800 y 801) no tienen nivel,
+    igual que en Prolog
+    """
+
+    def __init__(self, rangos):
+        ordenados = sorted(rangos, key=lambda r: r[1])
+        self.minimos = [r[1] for r in ordenados]
+        self.maximos = [r[2] for r in ordenados]
+        self.niveles = [r[0] for r in ordenados]
+
+        for i in range(1, len(ordenados)):
+            if self.minimos[i] <= self.maximos[i - 1]:
+                raise ValueError(f"Rangos solapados: {ordenados[i - 1]} y {ordenados[i]}")
+
+    def buscar(self, valor):
+        i = bisect_right(self.minimos, valor) - 1
+        if i >= 0 and valor <= self.maximos[i]:
+            return self.niveles[i]
+        return None
+
+
+class EvaluadorReglas:
+    def __init__(self, archivo_prolog='salud_ocupacional.pl'):
+        """
+        Compila los hechos estáticos y toma los dinámicos iniciales del archivo
+        """
+        hechos = cargar_hechos(archivo_prolog)
+
+        # Tablas de intervalos
+        self.tabla_co2 = TablaIntervalos(hechos.get('estandar_co2', []))
+        self.tabla_ruido = TablaIntervalos(hechos.get('estandar_ruido', []))
+        self.tabla_temperatura = TablaIntervalos(hechos.get('estandar_temperatura', []))
+
+        # Umbrales y tablas auxiliares
+        self.umbrales = {nombre: valor for nombre, valor in hechos.get('umbral_default', [])}
+        self.tiempos_trabajo_continuo = [t[0] for t in hechos.get('tiempo_trabajo_continuo', [])]
+        self.acciones = {}
+        for situacion, accion, _ in hechos.get('accion_correctiva', []):
+            self.acciones.setdefault(situacion, []).append(accion)
+        self.ejercicios = {}
+        for tipo, descripcion, _ in hechos.get('ejercicio', []):
+            self.ejercicios.setdefault(tipo, []).append(descripcion)
+        self.prioridades = {}
+        for alerta, prioridad in hechos.get('prioridad_alerta', []):
+            self.prioridades.setdefault(alerta, []).append(prioridad)
+
+        # Hechos dinámicos (el orden imita assertz: lo actualizado va al final)
+        self.lecturas = OrderedDict(
+            (tipo, (valor, timestamp)) for tipo, valor, timestamp in hechos.get('lectura_sensor', [])
+        )
+        self.niveles_fatiga = OrderedDict(hechos.get('nivel_fatiga', []))
+        self.estado = OrderedDict(hechos.get('estado_actual', []))
+        self.sesiones = OrderedDict(
+            (sesion_id, (hora, minutos)) for sesion_id, hora, minutos in hechos.get('sesion_trabajo', [])
+        )
+
+    # ========================================
+    # ACTUALIZACIÓN (equivalentes a actualizar_*)
+    # ========================================
+
+    def actualizar_sensor(self, tipo, valor, timestamp=''):
+        self.lecturas.pop(tipo, None)
+        self.lecturas[tipo] = (valor, timestamp)
+
+    def actualizar_fatiga(self, tipo, nivel):
+        self.niveles_fatiga.pop(tipo, None)
+        self.niveles_fatiga[tipo] = nivel
+
+    def actualizar_actuador(self, actuador, estado):
+        self.estado.pop(actuador, None)
+        self.estado[actuador] = estado
+
+    def actualizar_sesion(self, sesion_id, minutos):
+        if sesion_id not in self.sesiones:
+            return False
+        hora, _ = self.sesiones.pop(sesion_id)
+        self.sesiones[sesion_id] = (hora, minutos)
+        return True
+
+    # ========================================
+    # REGLAS
+    # ========================================
+
+    def _lectura(self, tipo):
+        lectura = self.lecturas.get(tipo)
+        return None if lectura is None else lectura[0]
+
+    def calidad_aire(self):
+        co2 = self._lectura('co2')
+        return None if co2 is None else self.tabla_co2.buscar(co2)
+
+    def nivel_ruido(self):
+        ruido = self._lectura('ruido')
+        return None if ruido is None else self.tabla_ruido.buscar(ruido)
+
+    def nivel_temperatura(self):
+        temperatura = self._lectura('temperatura')
+        return None if temperatura is None else self.tabla_temperatura.buscar(temperatura)
+
+    def condicion_critica_co2(self):
+        co2 = self._lectura('co2')
+        umbral = self.umbrales.get('co2_critico')
+        return co2 is not None and umbral is not None and co2 >= umbral
+
+    def requiere_ventilacion(self):
+        return self.condicion_critica_co2() and self.estado.get('ventilador') == 'apagado'
+
+    def _soluciones_fatiga_alta(self):
+        # La disyunción de fatiga_general_alta tiene éxito una vez por tipo en alto
+        return sum(1 for tipo in TIPOS_FATIGA if self.niveles_fatiga.get(tipo) == 'alto')
+
+    def fatiga_general_alta(self):
+        return self._soluciones_fatiga_alta() > 0
+
+    def _soluciones_pausa(self):
+        return sum(
+            1
+            for _, minutos in self.sesiones.values()
+            for maximo in self.tiempos_trabajo_continuo
+            if minutos >= maximo
+        )
+
+    def requiere_pausa(self):
+        return self._soluciones_pausa() > 0
+
+    def recomendar_ejercicio(self):
+        """Lista de (tipo, descripción) en el orden de soluciones de Prolog"""
+        return [
+            (tipo, descripcion)
+            for tipo, nivel in self.niveles_fatiga.items()
+            if nivel in ('alto', 'moderado')
+            for descripcion in self.ejercicios.get(tipo, [])
+        ]
+
+    def ambiente_optimo(self):
+        return (self.calidad_aire() == 'optimo' and
+                self.nivel_ruido() in ('silencioso', 'tranquilo') and
+                not self.fatiga_general_alta())
+
+    def accion_prioritaria(self):
+        """Acciones para CO2 crítico (vacío si no aplica)"""
+        if not self.condicion_critica_co2():
+            return []
+        prioridades_uno = self.prioridades.get('co2_critico', []).count(1)
+        return [accion for accion in self.acciones.get('co2_alto', []) for _ in range(prioridades_uno)]
+
+    def necesita_intervencion_multiple(self):
+        return (self.condicion_critica_co2() and
+                self.fatiga_general_alta() and
+                self.requiere_pausa())
+
+    def acciones_recomendadas(self):
+        """Mismo resultado (orden y repeticiones) que el findall de Prolog"""
+        acciones = []
+        if self.condicion_critica_co2():
+            acciones.extend(self.acciones.get('co2_alto', []))
+        acciones.extend(self.acciones.get('fatiga_visual', []) * self._soluciones_fatiga_alta())
+        acciones.extend(self.acciones.get('tiempo_prolongado', []) * self._soluciones_pausa())
+        return acciones
+
+    def estado_sistema(self):
+        """Primera solución de estado_sistema/1 como dict (None si falla)"""
+        calidad = self.calidad_aire()
+        ruido = self.nivel_ruido()
+        ventilador = self.estado.get('ventilador')
+        if calidad is None or ruido is None or ventilador is None or not self.sesiones:
+            return None
+        _, minutos = next(iter(self.sesiones.values()))
+        return {
+            'calidad_aire': calidad,
+            'ruido': ruido,
+            'ventilador': ventilador,
+            'minutos_trabajo': minutos
+        }
+
+    def sistema_en_alerta(self):
+        return (self.condicion_critica_co2() or
+                self.fatiga_general_alta() or
+                self.requiere_pausa())
+
+
+# ========================================
+# EVALUACIÓN INCREMENTAL
+# ========================================
+
+# Predicado dinámico -> método que lo actualiza
+PREDICADOS_DINAMICOS = {
+    'lectura_sensor': 'actualizar_sensor',
+    'nivel_fatiga': 'actualizar_fatiga',
+    'estado_actual': 'actualizar_actuador',
+    'sesion_trabajo': 'actualizar_sesion'
+}
+
+# cabeza :- cuerpo.  (puede ocupar varias líneas)
+_PATRON_REGLA = re.compile(r"^([a-z]\w*)(?:\([^)]*\))?\s*:-(.*?)\.\s*$", re.MULTILINE | re.DOTALL)
+# llamada(primer_argumento  o  átomo suelto
+_PATRON_LLAMADA = re.compile(r"\b([a-z]\w*)\b(?:\(\s*([^,()\s]+))?")
+
+
+def construir_grafo_dependencias(archivo_prolog='salud_ocupacional.pl'):
+    """
+    Lee las reglas del archivo y devuelve {(predicado_dinamico, clave): {reglas}}.
+    clave es el primer argumento cuando es un átomo (ej. lectura_sensor/co2)
+    o None cuando la regla lee cualquier hecho del predicado.
+    Las dependencias entre reglas se resuelven de forma transitiva
+    """
+    with open(archivo_prolog, encoding='utf-8') as archivo:
+        texto = ''.join(l for l in archivo if not l.lstrip().startswith('%'))
+
+    directas = {}
+    for cabeza, cuerpo in _PATRON_REGLA.findall(texto):
+        # Los predicados actualizar_* escriben hechos, no los leen
+        if 'assertz' in cuerpo or 'retractall' in cuerpo:
+            continue
+        directas.setdefault(cabeza, set())
+        for nombre, argumento in _PATRON_LLAMADA.findall(cuerpo):
+            if nombre in PREDICADOS_DINAMICOS:
+                clave = argumento if re.match(r"^[a-z]\w*$", argumento) else None
+                directas[cabeza].add((nombre, clave))
+            elif nombre != cabeza:
+                directas[cabeza].add(nombre)
+
+    def hechos_leidos(regla, visitadas):
+        leidos = set()
+        for dependencia in directas.get(regla, ()):
+            if isinstance(dependencia, tuple):
+                leidos.add(dependencia)
+            elif dependencia in directas and dependencia not in visitadas:
+                leidos |= hechos_leidos(dependencia, visitadas | {dependencia})
+        return leidos
+
+    grafo = {}
+    for regla in directas:
+        for hecho in hechos_leidos(regla, {regla}):
+            grafo.setdefault(hecho, set()).add(regla)
+    return grafo
+
+
+class EvaluadorIncremental(EvaluadorReglas):
+    def __init__(self, archivo_prolog='salud_ocupacional.pl', reglas=None):
+        """
+        Mantiene en caché las conclusiones y solo reevalúa las reglas que leen
+        el hecho dinámico que cambió. Los cambios de conclusión se emiten como
+        eventos a los suscriptores
+
+        reglas: reglas a vigilar (por defecto todas las del grafo con método nativo)
+        """
+        super().__init__(archivo_prolog)
+        self.grafo = construir_grafo_dependencias(archivo_prolog)
+
+        disponibles = {r for reglas_hecho in self.grafo.values() for r in reglas_hecho}
+        self.reglas = sorted(
+            r for r in (reglas or disponibles) if callable(getattr(self, r, None))
+        )
+        self.conclusiones = {regla: getattr(self, regla)() for regla in self.reglas}
+        self._pendientes = set()
+        self._suscriptores = []
+
+        # Métricas
+        self.evaluaciones = 0
+        self.evaluaciones_evitadas = 0
+
+    def suscribir(self, callback):
+        """
+        callback(evento) con evento = {'regla', 'anterior', 'valor'}
+        """
+        self._suscriptores.append(callback)
+
+    def _invalidar(self, predicado, clave):
+        for regla in self.grafo.get((predicado, clave), ()):
+            if regla in self.conclusiones:
+                self._pendientes.add(regla)
+        for regla in self.grafo.get((predicado, None), ()):
+            if regla in self.conclusiones:
+                self._pendientes.add(regla)
+
+    # Solo invalidan si el valor realmente cambió
+
+    def actualizar_sensor(self, tipo, valor, timestamp=''):
+        anterior = self.lecturas.get(tipo)
+        super().actualizar_sensor(tipo, valor, timestamp)
+        if anterior is None or anterior[0] != valor:
+            self._invalidar('lectura_sensor', tipo)
+
+    def actualizar_fatiga(self, tipo, nivel):
+        anterior = self.niveles_fatiga.get(tipo)
+        ultimo = next(reversed(self.niveles_fatiga), None)
+        super().actualizar_fatiga(tipo, nivel)
+        if anterior != nivel:
+            self._invalidar('nivel_fatiga', tipo)
+        elif ultimo != tipo:
+            # Mismo nivel pero cambia el orden de soluciones (assertz)
+            self._invalidar('nivel_fatiga', None)
+
+    def actualizar_actuador(self, actuador, estado):
+        anterior = self.estado.get(actuador)
+        super().actualizar_actuador(actuador, estado)
+        if anterior != estado:
+            self._invalidar('estado_actual', actuador)
+
+    def actualizar_sesion(self, sesion_id, minutos):
+        anterior = self.sesiones.get(sesion_id)
+        ultimo = next(reversed(self.sesiones), None)
+        if not super().actualizar_sesion(sesion_id, minutos):
+            return False
+        if anterior[1] != minutos or ultimo != sesion_id:
+            # sesion_trabajo se indexa por ID numérico: toda lectura depende
+            self._invalidar('sesion_trabajo', None)
+        return True
+
+    def evaluar(self):
+        """
+        Reevalúa solo las reglas afectadas y devuelve la lista de eventos
+        (conclusiones que cambiaron)
+        """
+        eventos = []
+        pendientes, self._pendientes = self._pendientes, set()
+        self.evaluaciones += len(pendientes)
+        self.evaluaciones_evitadas += len(self.reglas) - len(pendientes)
+
+        for regla in sorted(pendientes):
+            valor = getattr(self, regla)()
+            anterior = self.conclusiones[regla]
+            if valor != anterior:
+                self.conclusiones[regla] = valor
+                eventos.append({'regla': regla, 'anterior': anterior, 'valor': valor})
+
+        for evento in eventos:
+            for callback in self._suscriptores:
+                try:
+                    callback(evento)
+                except Exception as e:
+                    print(f"❌ Error en suscriptor de {evento['regla']}: {e}")
+
+        return eventos
+
+    def conclusion(self, regla):
+        """
+        Valor vigente de la regla (evalúa pendientes antes de responder)
+        """
+        if self._pendientes:
+            self.evaluar()
+        return self.conclusiones[regla]
+
+    def estadisticas(self):
+        total = self.evaluaciones + self.evaluaciones_evitadas
+        return {
+            'reglas': len(self.reglas),
+            'evaluaciones': self.evaluaciones,
+            'evaluaciones_evitadas': self.evaluaciones_evitadas,
+            'ahorro_pct': round(100 * self.evaluaciones_evitadas / total, 1) if total else 0.0
+        }
+
+
+# ========================================
+# EQUIVALENCIA CONTRA PROLOG
+# ========================================
+
+def verificar_equivalencia(archivo_prolog='salud_ocupacional.pl', combinaciones=2000, semilla=7):
+    """
+    Compara el evaluador nativo contra la base de conocimiento real en todo
+    el espacio de entradas. Devuelve la lista de diferencias encontradas
+    """
+    import itertools
+    import random
+    from pyswip import Prolog
+
+    prolog = Prolog()
+    prolog.consult(archivo_prolog)
+    nativo = EvaluadorReglas(archivo_prolog)
+    diferencias = []
+
+    def consultar(texto):
+        return list(prolog.query(texto))
+
+    def valor_prolog(regla):
+        soluciones = consultar(f"{regla}(X)")
+        return str(soluciones[0]['X']) if soluciones else None
+
+    def booleano_prolog(regla):
+        return len(consultar(regla)) > 0
+
+    def lista_prolog(regla):
+        soluciones = consultar(f"{regla}(L)")
+        return [str(a) for a in soluciones[0]['L']] if soluciones else None
+
+    def comparar(descripcion, esperado, obtenido):
+        if esperado != obtenido:
+            diferencias.append((descripcion, esperado, obtenido))
+
+    def fijar_estado(co2, ruido, temperatura, niveles, minutos, ventilador):
+        for tipo, valor in (('co2', co2), ('ruido', ruido), ('temperatura', temperatura)):
+            consultar(f"actualizar_sensor({tipo}, {valor}, 't')")
+            nativo.actualizar_sensor(tipo, valor, 't')
+        for tipo, nivel in zip(TIPOS_FATIGA, niveles):
+            consultar(f"actualizar_fatiga({tipo}, {nivel})")
+            nativo.actualizar_fatiga(tipo, nivel)
+        consultar(f"actualizar_actuador(ventilador, {ventilador})")
+        nativo.actualizar_actuador('ventilador', ventilador)
+        consultar(f"actualizar_sesion(1, {minutos})")
+        nativo.actualizar_sesion(1, minutos)
+
+    def comparar_todo(contexto):
+        comparar(f"calidad_aire {contexto}", valor_prolog('calidad_aire'), nativo.calidad_aire())
+        comparar(f"nivel_ruido {contexto}", valor_prolog('nivel_ruido'), nativo.nivel_ruido())
+        for regla in ('condicion_critica_co2', 'requiere_ventilacion', 'fatiga_general_alta',
+                      'requiere_pausa', 'ambiente_optimo', 'necesita_intervencion_multiple',
+                      'sistema_en_alerta'):
+            comparar(f"{regla} {contexto}", booleano_prolog(regla), getattr(nativo, regla)())
+        comparar(f"acciones_recomendadas {contexto}",
+                 lista_prolog('acciones_recomendadas'), nativo.acciones_recomendadas())
+        comparar(f"accion_prioritaria {contexto}",
+                 [str(s['A']) for s in consultar("accion_prioritaria(A)")],
+                 nativo.accion_prioritaria())
+        comparar(f"recomendar_ejercicio {contexto}",
+                 [(str(s['T']), str(s['D'])) for s in consultar("recomendar_ejercicio(T, D)")],
+                 nativo.recomendar_ejercicio())
+
+        soluciones = consultar("estado_sistema(E)")
+        comparar(f"estado_sistema {contexto}", bool(soluciones), nativo.estado_sistema() is not None)
+
+    # 1. Barrido completo de cada sensor (enteros y medios)
+    niveles_base = ('bajo', 'bajo', 'bajo')
+    for co2 in [v / 2 for v in range(0, 2 * 5200)]:
+        fijar_estado(co2, 45, 23, niveles_base, 0, 'apagado')
+        comparar(f"calidad_aire co2={co2}", valor_prolog('calidad_aire'), nativo.calidad_aire())
+        comparar(f"condicion_critica_co2 co2={co2}",
+                 booleano_prolog('condicion_critica_co2'), nativo.condicion_critica_co2())
+
+    for ruido in [v / 2 for v in range(0, 2 * 130)]:
+        fijar_estado(450, ruido, 23, niveles_base, 0, 'apagado')
+        comparar(f"nivel_ruido ruido={ruido}", valor_prolog('nivel_ruido'), nativo.nivel_ruido())
+
+    # 2. Todas las combinaciones discretas (fatiga x ventilador x pausa x CO2 crítico)
+    for niveles in itertools.product(('bajo', 'moderado', 'alto'), repeat=3):
+        for ventilador in ('apagado', 'encendido'):
+            for minutos in (0, 49, 50, 120):
+                for co2 in (450, 1199, 1200, 1600):
+                    fijar_estado(co2, 45, 23, niveles, minutos, ventilador)
+                    comparar_todo(f"{niveles} {ventilador} {minutos}min co2={co2}")
+
+    # 3. Estados conjuntos aleatorios
+    azar = random.Random(semilla)
+    for _ in range(combinaciones):
+        estado = (
+            azar.choice([azar.randint(0, 5200), round(azar.uniform(0, 5200), 1)]),
+            azar.choice([azar.randint(0, 130), round(azar.uniform(0, 130), 1)]),
+            azar.randint(0, 45),
+            tuple(azar.choice(('bajo', 'moderado', 'alto')) for _ in TIPOS_FATIGA),
+            azar.randint(0, 200),
+            azar.choice(('apagado', 'encendido'))
+        )
+        fijar_estado(*estado)
+        comparar_todo(str(estado))
+
+    return diferencias
+
+
+# ========================================
+# PRUEBA DEL MÓDULO
+# ========================================
+
+if __name__ == "__main__":
+    import sys
+    import timeit
+
+    archivo = sys.argv[1] if len(sys.argv) > 1 else 'salud_ocupacional.pl'
+    evaluador = EvaluadorReglas(archivo)
+
+    print("="*60)
+    print("EVALUADOR NATIVO DE REGLAS")
+    print("="*60)
+    evaluador.actualizar_sensor('co2', 1250, '10:00:00')
+    evaluador.actualizar_fatiga('visual', 'alto')
+    print(f"calidad_aire: {evaluador.calidad_aire()}")
+    print(f"condicion_critica_co2: {evaluador.condicion_critica_co2()}")
+    print(f"fatiga_general_alta: {evaluador.fatiga_general_alta()}")
+    print(f"acciones_recomendadas: {evaluador.acciones_recomendadas()}")
+
+    for regla in ('calidad_aire', 'nivel_ruido', 'condicion_critica_co2',
+                  'fatiga_general_alta', 'requiere_pausa'):
+        n = 100000
+        segundos = timeit.timeit(getattr(evaluador, regla), number=n)
+        print(f"  {regla}: {segundos / n * 1e6:.2f} µs")
+
+    # Lecturas de alta frecuencia: recálculo completo vs incremental
+    import random
+    azar = random.Random(3)
+    incremental = EvaluadorIncremental(archivo)
+    completo = EvaluadorReglas(archivo)
+    lecturas = [
+        (azar.choice(('co2', 'ruido', 'temperatura')), azar.randint(380, 1300))
+        for _ in range(20000)
+    ]
+
+    inicio = timeit.default_timer()
+    for tipo, valor in lecturas:
+        completo.actualizar_sensor(tipo, valor)
+        for regla in incremental.reglas:
+            getattr(completo, regla)()
+    segundos_completo = timeit.default_timer() - inicio
+
+    eventos = 0
+    inicio = timeit.default_timer()
+    for tipo, valor in lecturas:
+        incremental.actualizar_sensor(tipo, valor)
+        eventos += len(incremental.evaluar())
+    segundos_incremental = timeit.default_timer() - inicio
+
+    print(f"\n{len(lecturas)} lecturas de sensores ({len(incremental.reglas)} reglas vigiladas)")
+    print(f"  Recálculo completo: {segundos_completo / len(lecturas) * 1e6:.2f} µs/lectura")
+    print(f"  Incremental:        {segundos_incremental / len(lecturas) * 1e6:.2f} µs/lectura "
+          f"({eventos} eventos, {incremental.estadisticas()})")
+
+    # Caché incremental == evaluación completa tras actualizaciones aleatorias
+    for _ in range(5000):
+        cambio = azar.randrange(4)
+        if cambio == 0:
+            incremental.actualizar_sensor(azar.choice(('co2', 'ruido')), azar.randint(0, 1600))
+        elif cambio == 1:
+            incremental.actualizar_fatiga(azar.choice(TIPOS_FATIGA), azar.choice(('bajo', 'moderado', 'alto')))
+        elif cambio == 2:
+            incremental.actualizar_actuador('ventilador', azar.choice(('apagado', 'encendido')))
+        else:
+            incremental.actualizar_sesion(1, azar.randint(0, 120))
+        incremental.evaluar()
+        for regla in incremental.reglas:
+            assert incremental.conclusiones[regla] == getattr(incremental, regla)(), regla
+    print("✓ Caché incremental consistente con la evaluación completa")
+
+    print("\nVerificando equivalencia contra SWI-Prolog...")
+    diferencias = verificar_equivalencia(archivo)
+    if diferencias:
+        print(f"❌ {len(diferencias)} diferencias. Primeras:")
+        for diferencia in diferencias[:10]:
+            print(f"   {diferencia}")
+        sys.exit(1)
+    print("✓ Evaluador nativo equivalente a la base de conocimiento")
@@ -0,0 +1,236 @@
+"""
+Reproducción Offline del Detector de Fatiga
+Reprocesa turnos grabados (video o carpeta de frames) sin ventana y lo más
+rápido posible. Las ventanas de 60 s siguen el tiempo del video.
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from detector_fatiga_real import DetectorFatigaReal
+
+EXTENSIONES_IMAGEN = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FuenteFrames:
+    def __init__(self, ruta, inicio=0, fin=None, fps=None):
+        """
+        Fuente de frames con la interfaz de cv2.VideoCapture (read/isOpened/release)
+
+        ruta: archivo de video o carpeta de imágenes (orden alfabético)
+        inicio / fin: rango de frames a entregar [inicio, fin)
+        total queda en None si el contenedor no informa la cantidad de
+        frames (0 o negativa en algunos formatos y streams): se lee hasta el final
+        fps: obligatorio para carpetas; en videos se lee del archivo si no se indica
+        """
+        self.ruta = ruta
+        self.inicio = inicio
+        self.indice = inicio - 1
+        self.cap = None
+        self.archivos = None
+
+        if os.path.isdir(ruta):
+            self.archivos = sorted(
+                os.path.join(ruta, nombre) for nombre in os.listdir(ruta)
+                if nombre.lower().endswith(EXTENSIONES_IMAGEN)
+            )
+            self.total = len(self.archivos)
+            self.fps = fps or 30.0
+        else:
+            self.cap = cv2.VideoCapture(ruta)
+            self.total = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if self.total <= 0:
+                self.total = None
+            self.fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+            if inicio > 0:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, inicio)
+
+        if fin is None or self.total is None:
+            self.fin = fin if fin is not None else self.total
+        else:
+            self.fin = min(fin, self.total)
+
+    def isOpened(self):
+        if self.archivos is not None:
+            return len(self.archivos) > 0
+        return self.cap.isOpened()
+
+    def read(self):
+        if self.fin is not None and self.indice + 1 >= self.fin:
+            return False, None
+
+        if self.archivos is not None:
+            frame = cv2.imread(self.archivos[self.indice + 1])
+            ret = frame is not None
+        else:
+            ret, frame = self.cap.read()
+
+        if ret:
+            self.indice += 1
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class RelojVideo:
+    """
+    Reloj inyectable: segundos de video transcurridos hasta el final del
+    último frame leído
+    """
+
+    def __init__(self, fuente):
+        self.fuente = fuente
+
+    def __call__(self):
+        return (self.fuente.indice + 1) / self.fuente.fps
+
+
+def reproducir(ruta, inicio=0, fin=None, fps=None, archivo_prolog=None, **opciones_detector):
+    """
+    Procesa un rango del video sin ventana.
+    Devuelve resultados por ventana de 60 s (en tiempo de video) y FPS de proceso
+    """
+    fuente = FuenteFrames(ruta, inicio, fin, fps)
+    detector = DetectorFatigaReal(
+        None,
+        archivo_prolog=archivo_prolog,
+        fuente_video=fuente,
+        reloj=RelojVideo(fuente),
+        mostrar_video=False,
+        **opciones_detector
+    )
+
+    ventanas = []
+    frames = 0
+    inicio_proceso = time.perf_counter()
+
+    try:
+        while True:
+            ret, frame = detector.leer_frame()
+            if not ret:
+                break
+
+            _, _, _, niveles, _ = detector.procesar_frame(frame)
+            frames += 1
+
+            if niveles:
+                niveles['fin_s'] = round(detector.reloj(), 2)
+                niveles['postura'] = detector.postura_actual
+                ventanas.append(niveles)
+                if detector.prolog is not None:
+                    niveles['fatiga_general_alta'] = detector.actualizar_prolog(
+                        niveles['visual'], niveles['postural']
+                    )
+    finally:
+        duracion = time.perf_counter() - inicio_proceso
+        detector.cerrar()
+
+    return {
+        'inicio_frame': inicio,
+        'frames': frames,
+        'segundos_video': round(frames / fuente.fps, 2),
+        'segundos_proceso': round(duracion, 2),
+        'fps': round(frames / duracion, 1) if duracion > 0 else 0.0,
+        'ventanas': ventanas
+    }
+
+
+def _procesar_segmento(argumentos):
+    ruta, inicio, fin, fps, opciones = argumentos
+    # Un hilo de OpenCV por proceso: el paralelismo lo da el pool
+    cv2.setNumThreads(1)
+    return reproducir(ruta, inicio, fin, fps, **opciones)
+
+
+def reproducir_en_paralelo(ruta, procesos=None, fps=None, **opciones_detector):
+    """
+    Divide el video en segmentos alineados a ventanas de 60 s y los procesa
+    en un pool de procesos. El estado de parpadeo se reinicia en cada corte.
+    """
+    fuente = FuenteFrames(ruta, fps=fps)
+    total, fps = fuente.total, fuente.fps
+    fuente.release()
+
+    procesos = procesos or os.cpu_count() or 1
+    if total is None:
+        # Sin cantidad de frames no hay cortes: un solo segmento hasta el final
+        segmentos = [(ruta, 0, None, fps, opciones_detector)]
+    else:
+        frames_ventana = int(round(60 * fps))
+        ventanas_por_segmento = max(1, math.ceil(total / frames_ventana / procesos))
+        tamano_segmento = ventanas_por_segmento * frames_ventana
+
+        segmentos = [
+            (ruta, inicio, min(inicio + tamano_segmento, total), fps, opciones_detector)
+            for inicio in range(0, total, tamano_segmento)
+        ]
+
+    inicio_proceso = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        parciales = list(pool.map(_procesar_segmento, segmentos))
+    duracion = time.perf_counter() - inicio_proceso
+
+    frames = sum(p['frames'] for p in parciales)
+    return {
+        'procesos': procesos,
+        'segmentos': len(parciales),
+        'frames': frames,
+        'segundos_video': round(frames / fps, 2),
+        'segundos_proceso': round(duracion, 2),
+        'fps': round(frames / duracion, 1) if duracion > 0 else 0.0,
+        'ventanas': [v for p in parciales for v in p['ventanas']]
+    }
+
+
+# ========================================
+# EJECUCIÓN PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reproducción offline del detector de fatiga")
+    parser.add_argument('ruta', help="Video grabado o carpeta de frames")
+    parser.add_argument('--fps', type=float, default=None,
+                        help="FPS de la grabación (obligatorio para carpetas de frames)")
+    parser.add_argument('--procesos', type=int, default=1,
+                        help="Procesos en paralelo (>1 divide el video en segmentos)")
+    parser.add_argument('--prolog', default=None,
+                        help="Base de conocimiento para evaluar fatiga_general_alta por ventana")
+    parser.add_argument('--intervalo-redeteccion', type=int, default=1)
+    parser.add_argument('--metodo-parpadeo', choices=['haar', 'apertura'], default='haar')
+    parser.add_argument('--salida', default=None, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    opciones = {
+        'intervalo_redeteccion': args.intervalo_redeteccion,
+        'metodo_parpadeo': args.metodo_parpadeo,
+        'archivo_prolog': args.prolog
+    }
+
+    if args.procesos > 1:
+        resultado = reproducir_en_paralelo(args.ruta, args.procesos, args.fps, **opciones)
+    else:
+        resultado = reproducir(args.ruta, fps=args.fps, **opciones)
+
+    print("\n" + "="*60)
+    print("RESULTADOS DE LA REPRODUCCIÓN")
+    print("="*60)
+    for ventana in resultado['ventanas']:
+        print(f"[{ventana['fin_s']:>8.1f} s] Visual: {ventana['visual']} "
+              f"({ventana['frecuencia_parpadeo']} parpadeos/min, PERCLOS {ventana['perclos']:.0%}) | "
+              f"Postural: {ventana['postural']} ({ventana['postura']})")
+    print(f"\n{resultado['frames']} frames ({resultado['segundos_video']} s de video) "
+          f"en {resultado['segundos_proceso']} s → {resultado['fps']} fps")
+    print("="*60)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+        print(f"✓ Resultados guardados en {args.salida}")
@@ -0,0 +1,272 @@
+"""
+Resúmenes Incrementales por Hora y por Día
+Agrega las filas nuevas de deteccion_fatiga y lecturas_sensores en las
+tablas resumen_* de migracion_resumenes.sql (por sesión). Una marca de agua por tabla
+evita volver a leer filas ya agregadas: los reportes de largo plazo leen
+los resúmenes en lugar de los datos crudos
+"""
+
+import time
+
+from pool_conexiones import DB_CONFIG, obtener_pool
+
+# Operación para combinar un valor nuevo con el ya resumido
+SUMA, MINIMO, MAXIMO = 'suma', 'minimo', 'maximo'
+
+_ACTUALIZAR = {
+    SUMA: "{c} = {c} + VALUES({c})",
+    MINIMO: "{c} = LEAST({c}, VALUES({c}))",
+    MAXIMO: "{c} = GREATEST({c}, VALUES({c}))"
+}
+
+_COMBINAR = {
+    SUMA: lambda a, b: a + b,
+    MINIMO: min,
+    MAXIMO: max
+}
+
+# Tabla de origen -> (agregación por sesión/hora/tipo, prefijo de los
+# resúmenes, columna de tipo, columnas resumidas con su operación)
+FUENTES = {
+    'deteccion_fatiga': (
+        """
+        SELECT sesion_id, DATE_FORMAT(timestamp, '%%Y-%%m-%%d %%H:00:00') AS hora, tipo_fatiga,
+               COUNT(*), SUM(nivel_fatiga = 'bajo'), SUM(nivel_fatiga = 'moderado'),
+               SUM(nivel_fatiga = 'alto'), COALESCE(SUM(frecuencia_parpadeo), 0),
+               COUNT(frecuencia_parpadeo)
+        FROM deteccion_fatiga
+        WHERE id > %s AND id <= %s
+        GROUP BY sesion_id, hora, tipo_fatiga
+        """,
+        'resumen_fatiga', 'tipo_fatiga',
+        (('detecciones', SUMA), ('nivel_bajo', SUMA), ('nivel_moderado', SUMA),
+         ('nivel_alto', SUMA), ('suma_parpadeo', SUMA), ('muestras_parpadeo', SUMA))
+    ),
+    'lecturas_sensores': (
+        """
+        SELECT sesion_id, DATE_FORMAT(timestamp, '%%Y-%%m-%%d %%H:00:00') AS hora, tipo_sensor,
+               COUNT(*), MIN(valor), MAX(valor), SUM(valor)
+        FROM lecturas_sensores
+        WHERE id > %s AND id <= %s
+        GROUP BY sesion_id, hora, tipo_sensor
+        """,
+        'resumen_sensores', 'tipo_sensor',
+        (('lecturas', SUMA), ('minimo', MINIMO), ('maximo', MAXIMO), ('suma', SUMA))
+    )
+}
+
+
+def _query_upsert(tabla, periodo, columna_tipo, columnas):
+    nombres = ['sesion_id', periodo, columna_tipo] + [c for c, _ in columnas]
+    actualizaciones = ", ".join(_ACTUALIZAR[op].format(c=c) for c, op in columnas)
+    return (f"INSERT INTO {tabla} ({', '.join(nombres)}) "
+            f"VALUES ({', '.join(['%s'] * len(nombres))}) "
+            f"ON DUPLICATE KEY UPDATE {actualizaciones}")
+
+
+class ResumidorIncremental:
+    def __init__(self, db_config=None, pool=None, tamano_lote=5000):
+        """
+        db_config: MySQL central (por defecto DB_CONFIG)
+        pool: pool MySQL ya creado (por defecto el compartido de db_config)
+        tamano_lote: ids de origen agregados por transacción
+        """
+        self.pool = pool or obtener_pool(db_config or DB_CONFIG)
+        self.tamano_lote = tamano_lote
+
+        # Métricas
+        self.filas_resumidas = {tabla: 0 for tabla in FUENTES}
+        self.lotes = 0
+
+    def resumir_tabla(self, tabla):
+        """
+        Agrega las filas nuevas de una tabla de origen. Devuelve las filas
+        agregadas en esta pasada
+
+        Solo se agregan ids hasta el máximo visto en la pasada anterior: una
+        inserción que seguía abierta entonces (id menor, commit posterior) ya
+        es visible ahora y la marca de agua no la salta
+        """
+        consulta, prefijo, columna_tipo, columnas = FUENTES[tabla]
+        query_hora = _query_upsert(f"{prefijo}_hora", 'hora', columna_tipo, columnas)
+        query_dia = _query_upsert(f"{prefijo}_dia", 'dia', columna_tipo, columnas)
+        operaciones = [op for _, op in columnas]
+        resumidas = 0
+
+        with self.pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute("INSERT IGNORE INTO resumen_marcas (tabla) VALUES (%s)", (tabla,))
+                conexion.commit()
+
+                while True:
+                    # El bloqueo de la marca serializa resumidores concurrentes
+                    cursor.execute(
+                        "SELECT ultimo_id, visto_id FROM resumen_marcas WHERE tabla = %s FOR UPDATE",
+                        (tabla,)
+                    )
+                    ultimo_id, visto_id = cursor.fetchone()
+                    hasta = min(visto_id, ultimo_id + self.tamano_lote)
+
+                    if hasta <= ultimo_id:
+                        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabla}")
+                        maximo = cursor.fetchone()[0]
+                        cursor.execute(
+                            "UPDATE resumen_marcas SET visto_id = %s WHERE tabla = %s",
+                            (max(maximo, visto_id), tabla)
+                        )
+                        conexion.commit()
+                        break
+
+                    cursor.execute(consulta, (ultimo_id, hasta))
+                    grupos = cursor.fetchall()
+
+                    # Los grupos por hora se combinan por día antes de escribir
+                    dias = {}
+                    for grupo in grupos:
+                        clave = (grupo[0], str(grupo[1])[:10], grupo[2])
+                        valores = grupo[3:]
+                        previo = dias.get(clave)
+                        if previo is None:
+                            dias[clave] = list(valores)
+                        else:
+                            dias[clave] = [_COMBINAR[op](a, b)
+                                           for op, a, b in zip(operaciones, previo, valores)]
+
+                    if grupos:
+                        cursor.executemany(query_hora, [tuple(g) for g in grupos])
+                        cursor.executemany(query_dia, [clave + tuple(v) for clave, v in dias.items()])
+                    cursor.execute(
+                        "UPDATE resumen_marcas SET ultimo_id = %s WHERE tabla = %s",
+                        (hasta, tabla)
+                    )
+                    # Resúmenes y marca en la misma transacción: cada fila se agrega una vez
+                    conexion.commit()
+
+                    filas = sum(int(g[3]) for g in grupos)
+                    resumidas += filas
+                    self.filas_resumidas[tabla] += filas
+                    self.lotes += 1
+            except Exception:
+                conexion.rollback()
+                raise
+            finally:
+                cursor.close()
+
+        return resumidas
+
+    def resumir(self):
+        """
+        Una pasada sobre todas las tablas de origen: {tabla: filas agregadas}.
+        Agrega hasta lo visto en la pasada anterior (en modo continuo, un
+        intervalo de retraso)
+        """
+        return {tabla: self.resumir_tabla(tabla) for tabla in FUENTES}
+
+    def resumir_todo(self):
+        """
+        Dos pasadas seguidas: la primera marca el máximo id actual y la
+        segunda agrega hasta él. Para una invocación suelta
+        """
+        primera = self.resumir()
+        segunda = self.resumir()
+        return {tabla: primera[tabla] + segunda[tabla] for tabla in FUENTES}
+
+    def ejecutar_continuo(self, intervalo=60.0):
+        """Pasadas periódicas hasta Ctrl+C"""
+        print(f"✓ Resúmenes incrementales cada {intervalo:.0f} s (Ctrl+C para detener)")
+        try:
+            while True:
+                try:
+                    resultado = self.resumir()
+                    if any(resultado.values()):
+                        print(f"✓ Resumidas: {resultado}")
+                except Exception as e:
+                    print(f"⚠️ Pasada de resúmenes fallida: {e}")
+                time.sleep(intervalo)
+        except KeyboardInterrupt:
+            print("\n⏸ Resúmenes detenidos")
+
+    def estadisticas(self):
+        return {
+            'filas_resumidas': dict(self.filas_resumidas),
+            'lotes': self.lotes
+        }
+
+
+def reporte_diario(pool=None, dias=30):
+    """
+    Fatiga y sensores por día de los últimos 'dias' días, leídos de los
+    resúmenes (todas las sesiones)
+    """
+    pool = pool or obtener_pool()
+
+    with pool.conexion() as conexion:
+        cursor = conexion.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT dia, tipo_fatiga, SUM(detecciones) AS detecciones,
+                   SUM(nivel_bajo) AS bajo, SUM(nivel_moderado) AS moderado,
+                   SUM(nivel_alto) AS alto,
+                   SUM(suma_parpadeo) / NULLIF(SUM(muestras_parpadeo), 0) AS promedio_parpadeo
+            FROM resumen_fatiga_dia
+            WHERE dia >= CURDATE() - INTERVAL %s DAY
+            GROUP BY dia, tipo_fatiga
+            ORDER BY dia, tipo_fatiga
+        """, (dias,))
+        fatiga = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT dia, tipo_sensor, SUM(lecturas) AS lecturas, MIN(minimo) AS minimo,
+                   MAX(maximo) AS maximo, SUM(suma) / NULLIF(SUM(lecturas), 0) AS promedio
+            FROM resumen_sensores_dia
+            WHERE dia >= CURDATE() - INTERVAL %s DAY
+            GROUP BY dia, tipo_sensor
+            ORDER BY dia, tipo_sensor
+        """, (dias,))
+        sensores = cursor.fetchall()
+        cursor.close()
+
+    return {'fatiga': fatiga, 'sensores': sensores}
+
+
+# ========================================
+# EJECUCIÓN PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Resúmenes incrementales por hora y por día. Sin --continuo agrega todo "
+                    "lo insertado hasta el momento (marca y agrega en la misma invocación)"
+    )
+    parser.add_argument('--continuo', type=float, nargs='?', const=60.0, default=None,
+                        metavar='SEGUNDOS',
+                        help="Repetir la pasada cada SEGUNDOS (cada pasada agrega hasta lo "
+                             "visto en la anterior: un intervalo de retraso)")
+    parser.add_argument('--lote', type=int, default=5000, help="Ids de origen por transacción")
+    parser.add_argument('--reporte', type=int, nargs='?', const=30, default=None,
+                        metavar='DIAS', help="Imprimir el reporte diario de los últimos DIAS")
+    args = parser.parse_args()
+
+    resumidor = ResumidorIncremental(DB_CONFIG, tamano_lote=args.lote)
+
+    if args.continuo is not None:
+        resumidor.ejecutar_continuo(args.continuo)
+    else:
+        inicio = time.perf_counter()
+        resultado = resumidor.resumir_todo()
+        print(f"✓ Resumidas {resultado} en {time.perf_counter() - inicio:.2f} s")
+
+    if args.reporte is not None:
+        reporte = reporte_diario(resumidor.pool, args.reporte)
+        print("\n" + "="*60)
+        print(f"REPORTE DIARIO (últimos {args.reporte} días)")
+        print("="*60)
+        for fila in reporte['fatiga']:
+            print(f"{fila['dia']} {fila['tipo_fatiga']:<10} {fila['detecciones']:>6} detecciones "
+                  f"(bajo {fila['bajo']}, moderado {fila['moderado']}, alto {fila['alto']}) "
+                  f"parpadeo medio {fila['promedio_parpadeo']}")
+        for fila in reporte['sensores']:
+            print(f"{fila['dia']} {fila['tipo_sensor']:<12} {fila['lecturas']:>6} lecturas "
+                  f"min {fila['minimo']} max {fila['maximo']} media {fila['promedio']}")
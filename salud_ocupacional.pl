@@ -230,6 +230,6 @@ actualizar_actuador(Actuador, Estado) :-
 
 % Actualizar tiempo de sesión
 actualizar_sesion(ID, Minutos) :-
-    retractall(sesion_trabajo(ID, _, _)),
     sesion_trabajo(ID, Hora, _),
+    retractall(sesion_trabajo(ID, _, _)),
     assertz(sesion_trabajo(ID, Hora, Minutos)).
\ No newline at end of file
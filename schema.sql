@@ -92,6 +92,12 @@ CREATE TABLE acciones_sistema (
     FOREIGN KEY (sesion_id) REFERENCES sesiones_trabajo(id) ON DELETE CASCADE
 );
 
+-- ========================================
+-- TABLAS DE RESÚMENES POR HORA Y POR DÍA
+-- Están en migracion_resumenes.sql (idempotente); aplicarla después de
+-- este archivo y también sobre bases ya existentes
+-- ========================================
+
 -- ========================================
 -- TABLA DE DISPOSITIVOS ESP32
 -- ========================================
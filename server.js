@@ -126,14 +126,31 @@ app.get('/api/test', async (req, res) => {
 // ENDPOINTS EXISTENTES
 // ========================================
 
+// Parámetros opcionales:
+//   tipo  -> solo ese sensor (ej. ?tipo=co2)
+//   desde -> solo lecturas posteriores a ese timestamp (consulta incremental)
+// Express agrega ETag a la respuesta y contesta 304 si coincide If-None-Match
 app.get('/api/sensores/ultimas', async (req, res) => {
   try {
+    const { tipo, desde } = req.query;
+    let filtros = 'WHERE sesion_id = ?';
+    const parametros = [sesionActual];
+
+    if (tipo) {
+      filtros += ' AND tipo_sensor = ?';
+      parametros.push(tipo);
+    }
+    if (desde) {
+      filtros += ' AND timestamp > ?';
+      parametros.push(new Date(desde));
+    }
+
     const [lecturas] = await dbPool.query(`
       SELECT tipo_sensor, valor, unidad, timestamp
       FROM lecturas_sensores
-      WHERE sesion_id = ?
+      ${filtros}
       ORDER BY tipo_sensor, timestamp DESC
-    `, [sesionActual]);
+    `, parametros);
     
     const ultimasLecturas = {};
     lecturas.forEach(lectura => {
@@ -237,6 +254,38 @@ app.get('/api/fatiga/actual', async (req, res) => {
   }
 });
 
+// Historial por día desde los resúmenes incrementales (resumenes.py),
+// sin recorrer deteccion_fatiga ni lecturas_sensores
+//   dias -> días hacia atrás (por defecto 30)
+app.get('/api/historial/diario', async (req, res) => {
+  try {
+    const dias = Math.min(parseInt(req.query.dias, 10) || 30, 366);
+
+    const [fatiga] = await dbPool.query(`
+      SELECT dia, tipo_fatiga, SUM(detecciones) AS detecciones,
+             SUM(nivel_bajo) AS bajo, SUM(nivel_moderado) AS moderado, SUM(nivel_alto) AS alto,
+             SUM(suma_parpadeo) / NULLIF(SUM(muestras_parpadeo), 0) AS promedio_parpadeo
+      FROM resumen_fatiga_dia
+      WHERE dia >= CURDATE() - INTERVAL ? DAY
+      GROUP BY dia, tipo_fatiga
+      ORDER BY dia, tipo_fatiga
+    `, [dias]);
+
+    const [sensores] = await dbPool.query(`
+      SELECT dia, tipo_sensor, SUM(lecturas) AS lecturas, MIN(minimo) AS minimo,
+             MAX(maximo) AS maximo, SUM(suma) / NULLIF(SUM(lecturas), 0) AS promedio
+      FROM resumen_sensores_dia
+      WHERE dia >= CURDATE() - INTERVAL ? DAY
+      GROUP BY dia, tipo_sensor
+      ORDER BY dia, tipo_sensor
+    `, [dias]);
+
+    res.json({ success: true, fatiga, sensores });
+  } catch (error) {
+    res.status(500).json({ success: false, error: error.message });
+  }
+});
+
 // ========================================
 // ENDPOINTS PARA ESP32
 // ========================================
@@ -0,0 +1,166 @@
+"""
+SISTEMA INTEGRADO DE SALUD OCUPACIONAL - MODO ASYNCIO
+Un solo loop asyncio coordina monitor de CO2, escritura a BD y consultas
+Prolog. La cámara conserva un thread propio, que entrega sus análisis al
+loop; las alertas las atiende el planificador por prioridad
+"""
+
+import asyncio
+import threading
+
+from almacenamiento_local import AlmacenLocal
+from pool_conexiones import DB_CONFIG
+from sistema_completo import SistemaSaludOcupacional
+
+
+class SistemaSaludOcupacionalAsync(SistemaSaludOcupacional):
+    def __init__(self, db_config, puerto_metricas=None, reglas_nativas=False):
+        """
+        Mismos componentes que SistemaSaludOcupacional
+        """
+        super().__init__(db_config, puerto_metricas=puerto_metricas, reglas_nativas=reglas_nativas)
+        self.loop = None
+        self._tareas = []
+
+    def _crear_almacen(self):
+        # Sin hilo sincronizador: el loop sube los lotes a MySQL
+        return AlmacenLocal(self.db_config, en_hilo=False)
+
+    # ========================================
+    # TAREAS DEL LOOP
+    # ========================================
+
+    async def _tarea_co2(self):
+        """
+        Monitor de CO2 con intervalo adaptativo (espera sin bloquear el loop)
+        """
+        print("✓ Monitor de CO2 iniciado\n")
+
+        while True:
+            try:
+                co2 = await self.loop.run_in_executor(None, self.cliente_co2.obtener_lectura)
+                intervalo = self.cliente_co2.actualizar_intervalo(co2)
+                self._manejar_lectura_co2(co2)
+            except Exception as e:
+                print(f"⚠️ Error en monitor CO2: {e}")
+                intervalo = 10
+
+            await asyncio.sleep(intervalo)
+
+    async def _tarea_escritura(self):
+        """
+        Sube periódicamente a MySQL las detecciones guardadas en local
+        """
+        escritor = self.detector_fatiga.escritor
+        if escritor is None:
+            return
+
+        while True:
+            await asyncio.sleep(escritor.intervalo_flush)
+            # Lotes completos seguidos hasta vaciar la cola
+            while await self.loop.run_in_executor(None, escritor.vaciar) >= escritor.tamano_lote:
+                pass
+
+    async def _atender_deteccion(self, niveles):
+        """
+        Análisis de cada minuto: Prolog sin bloquear, luego BD y alertas
+        """
+        self._imprimir_analisis(niveles)
+
+        if self.reglas is not None:
+            # Microsegundos: no hace falta salir del loop
+            self._evaluar_fatiga(niveles)
+            self._registrar_y_alertar(niveles)
+            return
+
+        futuro = self.detector_fatiga.actualizar_prolog(
+            niveles['visual'],
+            niveles['postural'],
+            esperar=False
+        )
+        if futuro is not None:
+            try:
+                resultado = await asyncio.wait_for(asyncio.wrap_future(futuro), timeout=2.0)
+                print(f"Prolog actualizado - Visual: {niveles['visual']}, "
+                      f"Postural: {niveles['postural']}")
+                if resultado['fatiga_general_alta']:
+                    print("⚠️ Prolog detectó: FATIGA GENERAL ALTA")
+            except Exception as e:
+                print(f"❌ Error actualizando Prolog: {e}")
+
+        self._registrar_y_alertar(niveles)
+
+    def _manejar_deteccion_fatiga(self, niveles):
+        # Llamado desde el thread de cámara: el análisis continúa en el loop
+        asyncio.run_coroutine_threadsafe(self._atender_deteccion(niveles), self.loop)
+
+    # ========================================
+    # CICLO DE VIDA
+    # ========================================
+
+    async def _ejecutar(self):
+        self.loop = asyncio.get_running_loop()
+
+        await self.loop.run_in_executor(None, self._preparar)
+
+        # La cámara bloquea en read()/imshow: thread propio, fin avisado al loop
+        fin_camara = self.loop.create_future()
+
+        def camara():
+            try:
+                self._ejecutar_detector()
+            finally:
+                self.loop.call_soon_threadsafe(fin_camara.set_result, None)
+
+        self.thread_detector = threading.Thread(target=camara, daemon=True)
+        self.thread_detector.start()
+
+        self.planificador.iniciar()
+        self._tareas = [
+            asyncio.create_task(self._tarea_co2(), name='co2'),
+            asyncio.create_task(self._tarea_escritura(), name='escritura')
+        ]
+
+        print("\n" + "="*60)
+        print("SISTEMA EN FUNCIONAMIENTO (asyncio)")
+        print("="*60)
+        print("✓ Detección de fatiga por cámara: ACTIVA")
+        print("✓ Monitor de CO2 (ESP32): ACTIVO")
+        print("✓ Asistente de voz: ACTIVO")
+        print("="*60)
+        print("Presiona 'q' en la ventana de la cámara para detener")
+        print("="*60 + "\n")
+
+        try:
+            await fin_camara
+        finally:
+            self.corriendo = False
+            for tarea in self._tareas:
+                tarea.cancel()
+            await asyncio.gather(*self._tareas, return_exceptions=True)
+
+    def iniciar(self):
+        """
+        Inicia el sistema en un loop asyncio (bloquea hasta terminar)
+        """
+        try:
+            asyncio.run(self._ejecutar())
+        except KeyboardInterrupt:
+            print("\n\n✓ Sistema detenido por el usuario")
+        except Exception as e:
+            print(f"\n✗ Error en el sistema: {e}")
+            import traceback
+            traceback.print_exc()
+
+        self.detener()
+
+
+# ========================================
+# EJECUCIÓN PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    import sys
+
+    sistema = SistemaSaludOcupacionalAsync(DB_CONFIG, reglas_nativas='--reglas-nativas' in sys.argv)
+    sistema.iniciar()
@@ -4,15 +4,27 @@ Integra detector de fatiga con cámara + asistente de voz + ESP32 REAL
 """
 
 import threading
-import queue
 import time
 import sys
-import requests
-from detector_fatiga_real import DetectorFatigaReal
+
+_inicio_imports = time.perf_counter()
+
+# cv2, pyswip, mysql.connector y requests no se importan aquí: los cargan
+# los pasos de arranque en paralelo (o la primera petición HTTP)
+from arranque import TiemposArranque
+from cliente_co2 import ClienteCO2, UMBRAL_CO2
 from asistente_voz import AsistenteVozRobusto
+from planificador_alertas import PlanificadorAlertas
+from almacenamiento_local import obtener_almacen
+from pool_conexiones import DB_CONFIG
+
+ARCHIVO_PROLOG = 'salud_ocupacional.pl'
+
+# Reglas que vigila el evaluador incremental (las que usan las alertas)
+REGLAS_VIGILADAS = ('condicion_critica_co2', 'fatiga_general_alta', 'requiere_pausa',
+                    'acciones_recomendadas', 'sistema_en_alerta')
 
-# Cola de eventos para comunicación entre componentes
-cola_alertas = queue.Queue()
+SEGUNDOS_IMPORTS = time.perf_counter() - _inicio_imports
 
 class ControladorESP32:
     """Clase para comunicarse con ESP32 vía API"""
@@ -20,11 +32,20 @@ class ControladorESP32:
     def __init__(self, api_url='http://localhost:3001', device_id='ESP32_ESCRITORIO_01'):
         self.api_url = api_url
         self.device_id = device_id
+        # Conexión keep-alive reutilizada entre peticiones (se crea en la primera)
+        self._sesion = None
+    
+    @property
+    def sesion(self):
+        if self._sesion is None:
+            import requests
+            self._sesion = requests.Session()
+        return self._sesion
     
     def obtener_ultima_lectura_co2(self):
         """Obtiene la última lectura de CO2 desde la API"""
         try:
-            response = requests.get(f"{self.api_url}/api/sensores/ultimas", timeout=5)
+            response = self.sesion.get(f"{self.api_url}/api/sensores/ultimas", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and 'lecturas' in data:
@@ -42,7 +63,7 @@ class ControladorESP32:
                 'accion': accion,
                 'parametro': parametro
             }
-            response = requests.post(
+            response = self.sesion.post(
                 f"{self.api_url}/api/esp32/comando/enviar", 
                 json=payload,
                 timeout=5
@@ -56,25 +77,45 @@ class ControladorESP32:
 
 
 class SistemaSaludOcupacional:
-    def __init__(self, db_config):
+    def __init__(self, db_config, sumidero_alertas=None, puerto_metricas=None, simulado=False,
+                 reglas_nativas=False):
         """
         Inicializa el sistema completo
+        
+        sumidero_alertas: función que recibe cada alerta (por defecto el planificador)
+        puerto_metricas: puerto del endpoint Prometheus local (None = desactivado)
+        simulado: detector simulado en lugar de la cámara (no necesita cv2)
+        reglas_nativas: cada lectura de CO2 y cada análisis de fatiga se evalúan
+            con EvaluadorIncremental (microsegundos, sin SWI-Prolog ni pyswip);
+            los cambios de conclusión llegan como eventos a las alertas
         """
         print("="*60)
         print("SISTEMA INTEGRADO DE SALUD OCUPACIONAL")
         print("Con ESP32 + Sensores Reales")
         print("="*60)
         
+        # Tiempos de arranque: imports y cada subsistema
+        self.arranque = TiemposArranque()
+        self.arranque.registrar('imports iniciales', SEGUNDOS_IMPORTS)
+        self.simulado = simulado
+        self.reglas_nativas = reglas_nativas
+        
         # Inicializar componentes
-        self.asistente_voz = AsistenteVozRobusto()
+        self.asistente_voz = self.arranque.medir('voz', AsistenteVozRobusto)
         self.detector_fatiga = None
+        self.sesion_id = None
         self.controlador_esp32 = ControladorESP32()
+        self.cliente_co2 = ClienteCO2(self.controlador_esp32.api_url)
         self.db_config = db_config
+        # Sesiones y detecciones: SQLite local, sincronizado con MySQL en segundo plano
+        self.almacen = self.arranque.medir('almacen local', self._crear_almacen)
+        # Alertas por prioridad (prioridad_alerta/2), con fusión y vencimiento
+        self.planificador = PlanificadorAlertas(self._pasos_alerta)
+        self.sumidero_alertas = sumidero_alertas or self.planificador.encolar
         
         # Control de threads
         self.corriendo = True
         self.thread_detector = None
-        self.thread_procesador_alertas = None
         self.thread_monitor_co2 = None
         
         # Últimas alertas enviadas (para evitar repetir)
@@ -86,6 +127,15 @@ class SistemaSaludOcupacional:
         # Última lectura CO2
         self.ultimo_co2 = 0
         
+        # Evaluador nativo (compartido por los threads de CO2 y de cámara)
+        self.reglas = None
+        self._lock_reglas = threading.Lock()
+        self._inicio_trabajo = time.monotonic()
+        
+        # Endpoint de métricas (opcional)
+        self.puerto_metricas = puerto_metricas
+        self.servidor_metricas = None
+        
         print("✓ Sistema inicializado\n")
     
     def iniciar(self):
@@ -93,40 +143,7 @@ class SistemaSaludOcupacional:
         Inicia todos los componentes del sistema
         """
         try:
-            # Mensaje de bienvenida
-            self.asistente_voz.bienvenida()
-            time.sleep(2)
-            
-            # Obtener o crear sesión activa
-            import mysql.connector
-            conexion = mysql.connector.connect(**self.db_config)
-            cursor = conexion.cursor(dictionary=True)
-            
-            cursor.execute("""
-                SELECT id FROM sesiones_trabajo 
-                WHERE estado = 'activa' 
-                ORDER BY id DESC LIMIT 1
-            """)
-            sesion = cursor.fetchone()
-            
-            if not sesion:
-                cursor.execute("""
-                    INSERT INTO sesiones_trabajo (usuario_id, fecha, hora_inicio, estado)
-                    VALUES (1, CURDATE(), CURTIME(), 'activa')
-                """)
-                conexion.commit()
-                sesion_id = cursor.lastrowid
-                print(f"✓ Nueva sesión creada: {sesion_id}")
-            else:
-                sesion_id = sesion['id']
-                print(f"✓ Sesión existente: {sesion_id}")
-            
-            cursor.close()
-            conexion.close()
-            
-            # Inicializar detector de fatiga
-            self.detector_fatiga = DetectorFatigaReal(self.db_config)
-            self.detector_fatiga.establecer_sesion(sesion_id)
+            self._preparar()
             
             # Iniciar threads
             self.thread_detector = threading.Thread(
@@ -134,28 +151,29 @@ class SistemaSaludOcupacional:
                 daemon=True
             )
             
-            self.thread_procesador_alertas = threading.Thread(
-                target=self._procesar_alertas,
-                daemon=True
-            )
-            
             self.thread_monitor_co2 = threading.Thread(
                 target=self._monitorear_co2,
                 daemon=True
             )
             
             self.thread_detector.start()
-            self.thread_procesador_alertas.start()
+            self.planificador.iniciar()
             self.thread_monitor_co2.start()
             
             print("\n" + "="*60)
             print("SISTEMA EN FUNCIONAMIENTO")
             print("="*60)
-            print("✓ Detección de fatiga por cámara: ACTIVA")
+            if self.simulado:
+                print("✓ Detección de fatiga simulada: ACTIVA")
+            else:
+                print("✓ Detección de fatiga por cámara: ACTIVA")
             print("✓ Monitor de CO2 (ESP32): ACTIVO")
             print("✓ Asistente de voz: ACTIVO")
             print("="*60)
-            print("Presiona 'q' en la ventana de la cámara para detener")
+            if self.simulado:
+                print("Presiona Ctrl+C para detener")
+            else:
+                print("Presiona 'q' en la ventana de la cámara para detener")
             print("="*60 + "\n")
             
             # Mantener el programa principal corriendo
@@ -163,12 +181,73 @@ class SistemaSaludOcupacional:
             
         except KeyboardInterrupt:
             print("\n\n✓ Sistema detenido por el usuario")
-            self.detener()
         except Exception as e:
             print(f"\n✗ Error en el sistema: {e}")
             import traceback
             traceback.print_exc()
-            self.detener()
+        
+        # También al salir con 'q': subir lo pendiente, cerrar sesión y voz
+        self.detener()
+    
+    def _preparar(self):
+        """
+        Bienvenida, sesión activa y detector de fatiga, en paralelo: la
+        bienvenida suena mientras se abren cámara, cascadas y Prolog
+        """
+        if self.puerto_metricas is not None:
+            metricas = self.arranque.importar('metricas')
+            try:
+                self.servidor_metricas = metricas.ServidorMetricas(self.metricas, self.puerto_metricas).iniciar()
+            except OSError as e:
+                # Endpoint opcional: el sistema sigue sin métricas
+                print(f"⚠️ Métricas no disponibles en el puerto {self.puerto_metricas}: {e}")
+        
+        # La conexión a MySQL no demora el arranque: todo se escribe primero en local
+        if self.db_config is not None:
+            self.arranque.en_segundo_plano('conexion MySQL', lambda: self.almacen.pool)
+        
+        tareas = {
+            'bienvenida': self.asistente_voz.bienvenida,
+            'sesion': self.almacen.obtener_o_crear_sesion,
+            'detector': self._crear_detector
+        }
+        if self.reglas_nativas:
+            tareas['reglas nativas'] = self._crear_reglas
+        resultados = self.arranque.en_paralelo(tareas)
+        self.reglas = resultados.get('reglas nativas')
+        
+        sesion_id, creada = resultados['sesion']
+        if creada:
+            print(f"✓ Nueva sesión creada: {sesion_id}")
+        else:
+            print(f"✓ Sesión existente: {sesion_id}")
+        
+        self.sesion_id = sesion_id
+        self.detector_fatiga = resultados['detector']
+        self.detector_fatiga.establecer_sesion(sesion_id)
+        self._inicio_trabajo = time.monotonic()
+        self.arranque.reportar()
+    
+    def _crear_almacen(self):
+        return obtener_almacen(self.db_config)
+    
+    def _crear_detector(self):
+        if self.simulado:
+            detector_fatiga = self.arranque.importar('detector_fatiga')
+            return detector_fatiga.DetectorFatigaSimulado(self.db_config, almacen=self.almacen)
+        
+        # Con reglas nativas el detector no carga Prolog
+        detector_fatiga_real = self.arranque.importar('detector_fatiga_real')
+        return detector_fatiga_real.DetectorFatigaReal(
+            self.db_config, escritor=self.almacen, arranque=self.arranque,
+            archivo_prolog=None if self.reglas_nativas else ARCHIVO_PROLOG
+        )
+    
+    def _crear_reglas(self):
+        reglas_nativas = self.arranque.importar('reglas_nativas')
+        reglas = reglas_nativas.EvaluadorIncremental(ARCHIVO_PROLOG, REGLAS_VIGILADAS)
+        reglas.suscribir(self._manejar_evento_regla)
+        return reglas
     
     def _monitorear_co2(self):
         """
@@ -178,59 +257,79 @@ class SistemaSaludOcupacional:
         
         while self.corriendo:
             try:
-                # Obtener lectura actual de CO2
-                co2 = self.controlador_esp32.obtener_ultima_lectura_co2()
-                
-                if co2 is not None and co2 != self.ultimo_co2:
-                    self.ultimo_co2 = co2
-                    print(f"📊 CO2: {co2} ppm")
-                    
-                    # Generar alertas si es necesario
-                    tiempo_actual = time.time()
-                    
-                    if co2 > 1200:
-                        if tiempo_actual - self.ultima_alerta_co2 > self.intervalo_minimo_alertas:
-                            cola_alertas.put({
-                                'tipo': 'co2_alto',
-                                'valor': co2
-                            })
-                            self.ultima_alerta_co2 = tiempo_actual
+                # Solo llegan lecturas nuevas (None si no hubo cambios)
+                co2 = self.cliente_co2.obtener_lectura()
+                intervalo = self.cliente_co2.actualizar_intervalo(co2)
+                self._manejar_lectura_co2(co2)
                 
-                # Esperar 15 segundos antes de siguiente lectura
-                time.sleep(15)
+                # Intervalo adaptativo: corto cerca del umbral, largo si está estable
+                time.sleep(intervalo)
                 
             except Exception as e:
                 print(f"⚠️ Error en monitor CO2: {e}")
                 time.sleep(10)
     
+    def _manejar_lectura_co2(self, co2):
+        """
+        Registra una lectura nueva de CO2 y genera la alerta si corresponde
+        """
+        if co2 is None or co2 == self.ultimo_co2:
+            return
+        
+        self.ultimo_co2 = co2
+        print(f"📊 CO2: {co2} ppm")
+        
+        # Generar alertas si es necesario
+        tiempo_actual = time.time()
+        
+        critico = co2 > UMBRAL_CO2
+        if self.reglas is not None:
+            # condicion_critica_co2 de la base de conocimiento (umbral co2_critico)
+            with self._lock_reglas:
+                self.reglas.actualizar_sensor('co2', co2, time.strftime('%H:%M:%S'))
+                self.reglas.evaluar()
+                critico = self.reglas.conclusion('condicion_critica_co2')
+        
+        if critico:
+            if tiempo_actual - self.ultima_alerta_co2 > self.intervalo_minimo_alertas:
+                self._encolar_alerta({
+                    'tipo': 'co2_alto',
+                    'valor': co2
+                })
+                self.ultima_alerta_co2 = tiempo_actual
+    
+    def _encolar_alerta(self, alerta):
+        """Entrega la alerta al sumidero configurado"""
+        self.sumidero_alertas(alerta)
+    
     def _ejecutar_detector(self):
         """
         Thread que ejecuta el detector de fatiga
         """
+        if self.simulado:
+            self._ejecutar_simulado()
+            return
+        
         try:
             import cv2
             
             while self.corriendo:
-                ret, frame = self.detector_fatiga.cap.read()
+                ret, frame = self.detector_fatiga.leer_frame()
                 
                 if not ret:
+                    # Una pausa breve de la cámara no detiene el monitoreo
+                    if self.detector_fatiga.captura_activa():
+                        print("⚠️ Cámara sin frames nuevos, esperando...")
+                        continue
                     print("✗ Error capturando frame")
                     break
                 
-                # Detectar rostro y ojos
-                rostro, ojos, frame_anotado = self.detector_fatiga.detectar_rostro_ojos(frame)
-                
-                # Detectar parpadeo
-                self.detector_fatiga.detectar_parpadeo(ojos)
-                
-                # Analizar postura
-                postura = self.detector_fatiga.analizar_postura(rostro)
-                
-                # Calcular niveles de fatiga (cada minuto)
-                niveles = self.detector_fatiga.calcular_nivel_fatiga()
+                rostro, ojos, postura, niveles, frame_anotado = \
+                    self.detector_fatiga.procesar_frame(frame)
                 
                 if niveles:
                     self._manejar_deteccion_fatiga(niveles)
+                    self.detector_fatiga.perfil.marca('minuto')
                 
                 # Agregar información al frame
                 self.detector_fatiga.agregar_info_frame(frame_anotado, rostro, ojos, postura)
@@ -238,12 +337,17 @@ class SistemaSaludOcupacional:
                 # Agregar info de CO2
                 cv2.putText(frame_anotado, f"CO2: {self.ultimo_co2} ppm", 
                            (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+                self.detector_fatiga.registrar_frame_analizado()
+                self.detector_fatiga.perfil.marca('agregar_info_frame')
                 
                 # Mostrar frame
                 cv2.imshow('Monitor de Fatiga - Salud Ocupacional', frame_anotado)
+                self.detector_fatiga.perfil.marca('imshow')
                 
                 # Salir con 'q'
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                tecla = cv2.waitKey(1) & 0xFF
+                self.detector_fatiga.perfil.marca('waitKey')
+                if tecla == ord('q'):
                     break
             
             self.corriendo = False
@@ -254,23 +358,91 @@ class SistemaSaludOcupacional:
             traceback.print_exc()
             self.corriendo = False
     
+    def _ejecutar_simulado(self, intervalo=60):
+        """
+        Detector simulado: un análisis cada 'intervalo' segundos, sin cámara
+        """
+        while self.corriendo:
+            resultado = self.detector_fatiga.simular_deteccion_fatiga()
+            self._manejar_deteccion_fatiga({
+                'visual': resultado['visual'],
+                'postural': resultado['postural'],
+                'frecuencia_parpadeo': resultado['parpadeos']
+            })
+            
+            limite = time.monotonic() + intervalo
+            while self.corriendo and time.monotonic() < limite:
+                time.sleep(0.5)
+    
     def _manejar_deteccion_fatiga(self, niveles):
         """
         Maneja las detecciones de fatiga y genera alertas de voz
         """
-        from datetime import datetime
+        self._imprimir_analisis(niveles)
         
-        tiempo_actual = time.time()
+        if self.reglas is not None:
+            self._evaluar_fatiga(niveles)
+        else:
+            # Actualizar Prolog
+            self.detector_fatiga.actualizar_prolog(
+                niveles['visual'],
+                niveles['postural']
+            )
+        
+        self._registrar_y_alertar(niveles)
+    
+    def _evaluar_fatiga(self, niveles):
+        """
+        Niveles del análisis y minutos de trabajo continuo en el evaluador
+        nativo (mismo efecto que actualizar_prolog, sin ida y vuelta al
+        motor). Solo se reevalúan las reglas que leen lo que cambió
+        """
+        with self._lock_reglas:
+            self.reglas.actualizar_fatiga('visual', niveles['visual'])
+            self.reglas.actualizar_fatiga('postural', niveles['postural'])
+            self.reglas.actualizar_sesion(1, self._minutos_trabajo())
+            self.reglas.evaluar()
+            fatiga_alta = self.reglas.conclusion('fatiga_general_alta')
+        
+        print(f"Reglas actualizadas - Visual: {niveles['visual']}, Postural: {niveles['postural']}")
+        if fatiga_alta:
+            print("⚠️ Reglas: FATIGA GENERAL ALTA")
+        return fatiga_alta
+    
+    def _minutos_trabajo(self):
+        # sesion_trabajo/3 de la base: minutos desde que empezó el monitoreo
+        return int((time.monotonic() - self._inicio_trabajo) // 60)
+    
+    def _manejar_evento_regla(self, evento):
+        """
+        Cambio de conclusión del evaluador incremental (con el lock tomado)
+        """
+        print(f"🔔 {evento['regla']}: {evento['anterior']} → {evento['valor']}")
+        
+        # La pausa solo la detectan las reglas (tiempo_trabajo_continuo)
+        if evento['regla'] == 'requiere_pausa' and evento['valor']:
+            self._encolar_alerta({
+                'tipo': 'pausa',
+                'minutos': self._minutos_trabajo()
+            })
+    
+    def _imprimir_analisis(self, niveles):
+        from datetime import datetime
         
         print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Análisis de fatiga:")
         print(f"Visual: {niveles['visual']} ({niveles['frecuencia_parpadeo']} parpadeos/min)")
         print(f"Postural: {niveles['postural']} (Postura: {self.detector_fatiga.postura_actual})")
         
-        # Actualizar Prolog
-        fatiga_alta = self.detector_fatiga.actualizar_prolog(
-            niveles['visual'],
-            niveles['postural']
-        )
+        estadisticas = self.detector_fatiga.estadisticas_captura()
+        if estadisticas:
+            print(f"Captura: {estadisticas}")
+        
+        estadisticas = self.detector_fatiga.estadisticas_escritura()
+        if estadisticas:
+            print(f"BD: {estadisticas}")
+    
+    def _registrar_y_alertar(self, niveles):
+        tiempo_actual = time.time()
         
         # Registrar en BD
         self.detector_fatiga.registrar_deteccion(
@@ -287,7 +459,7 @@ class SistemaSaludOcupacional:
         # Generar alertas de voz si es necesario
         if niveles['visual'] in ['alto', 'moderado']:
             if tiempo_actual - self.ultima_alerta_visual > self.intervalo_minimo_alertas:
-                cola_alertas.put({
+                self._encolar_alerta({
                     'tipo': 'fatiga_visual',
                     'nivel': niveles['visual'],
                     'frecuencia': niveles['frecuencia_parpadeo']
@@ -296,44 +468,141 @@ class SistemaSaludOcupacional:
         
         if niveles['postural'] in ['alto', 'moderado']:
             if tiempo_actual - self.ultima_alerta_postural > self.intervalo_minimo_alertas:
-                cola_alertas.put({
+                self._encolar_alerta({
                     'tipo': 'fatiga_postural',
                     'nivel': niveles['postural'],
                     'postura': self.detector_fatiga.postura_actual
                 })
                 self.ultima_alerta_postural = tiempo_actual
     
-    def _procesar_alertas(self):
+    def _pasos_alerta(self, alerta):
         """
-        Thread que procesa la cola de alertas y activa el asistente de voz
+        Secuencia de atención de una alerta: funciones del asistente de voz
+        o esperas en segundos. 'ejercicio' marca el inicio de la guía, que
+        puede ser interrumpida por alertas más prioritarias
         """
-        while self.corriendo:
-            try:
-                alerta = cola_alertas.get(timeout=1)
-                
-                if alerta['tipo'] == 'fatiga_visual':
-                    self.asistente_voz.alerta_fatiga_visual()
-                    time.sleep(2)
-                    print("\n¿Deseas realizar el ejercicio 20-20-20? (Automático en 5 seg)")
-                    time.sleep(5)
-                    self.asistente_voz.guiar_ejercicio_20_20_20()
-                
-                elif alerta['tipo'] == 'fatiga_postural':
-                    self.asistente_voz.alerta_fatiga_postural()
-                    time.sleep(2)
-                    print("\n¿Deseas realizar estiramiento de cuello? (Automático en 5 seg)")
-                    time.sleep(5)
-                    self.asistente_voz.guiar_estiramiento_cuello()
-                
-                elif alerta['tipo'] == 'co2_alto':
-                    self.asistente_voz.alerta_co2_alto(alerta['valor'])
-                
-                cola_alertas.task_done()
-                
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"✗ Error procesando alerta: {e}")
+        if alerta['tipo'] == 'fatiga_visual':
+            return [
+                self.asistente_voz.alerta_fatiga_visual,
+                2,
+                lambda: print("\n¿Deseas realizar el ejercicio 20-20-20? (Automático en 5 seg)"),
+                'ejercicio',
+                5
+            ] + self.asistente_voz.pasos_ejercicio_20_20_20()
+        
+        if alerta['tipo'] == 'fatiga_postural':
+            return [
+                self.asistente_voz.alerta_fatiga_postural,
+                2,
+                lambda: print("\n¿Deseas realizar estiramiento de cuello? (Automático en 5 seg)"),
+                'ejercicio',
+                5
+            ] + self.asistente_voz.pasos_estiramiento_cuello()
+        
+        if alerta['tipo'] == 'co2_alto':
+            return [lambda: self.asistente_voz.alerta_co2_alto(alerta['valor'])]
+        
+        if alerta['tipo'] == 'pausa':
+            return [lambda: self.asistente_voz.recordatorio_pausa(alerta['minutos'])]
+        
+        return []
+    
+    def metricas(self):
+        """
+        Muestras (nombre, tipo, ayuda, valor) para el endpoint Prometheus.
+        Solo lee contadores: se puede llamar desde otro thread
+        """
+        muestras = [
+            ('salud_alertas_pendientes', 'gauge', "Alertas esperando en el planificador",
+             self.planificador.pendientes()),
+            ('salud_alertas_atendidas_total', 'counter', "Alertas atendidas", self.planificador.atendidas),
+            ('salud_alertas_vencidas_total', 'counter', "Alertas descartadas por vencidas",
+             self.planificador.vencidas),
+            ('salud_co2_ppm', 'gauge', "Última lectura de CO2", self.cliente_co2.ultimo_valor),
+            ('salud_co2_antiguedad_segundos', 'gauge', "Segundos desde la última consulta CO2 válida",
+             self.cliente_co2.antiguedad_consulta()),
+            ('salud_co2_intervalo_segundos', 'gauge', "Intervalo actual de consulta CO2",
+             self.cliente_co2.intervalo),
+            ('salud_co2_errores_total', 'counter', "Consultas CO2 fallidas", self.cliente_co2.errores),
+            ('salud_voz_cola', 'gauge', "Mensajes de voz esperando o en curso",
+             self.asistente_voz.mensajes_en_cola)
+        ]
+        
+        if self.reglas is not None:
+            reglas = self.reglas.estadisticas()
+            muestras += [
+                ('salud_reglas_evaluaciones_total', 'counter', "Reglas reevaluadas por el evaluador nativo",
+                 reglas['evaluaciones']),
+                ('salud_reglas_evitadas_total', 'counter', "Reevaluaciones evitadas por la caché",
+                 reglas['evaluaciones_evitadas'])
+            ]
+        
+        detector = self.detector_fatiga
+        if detector is None:
+            return muestras
+        
+        # FPS medido por el propio detector: varios scrapers no se interfieren
+        muestras += [
+            ('salud_detector_frames_total', 'counter', "Frames analizados por el detector",
+             detector.frames_analizados),
+            ('salud_detector_fps', 'gauge', "Frames por segundo en el último segundo", detector.fps_actual)
+        ]
+        
+        captura = detector.estadisticas_captura()
+        if captura:
+            muestras += [
+                ('salud_frame_latencia_media_ms', 'gauge', "Latencia media captura-análisis",
+                 captura['latencia_media_ms']),
+                ('salud_frame_latencia_max_ms', 'gauge', "Latencia máxima captura-análisis",
+                 captura['latencia_max_ms']),
+                ('salud_frames_descartados_total', 'counter', "Frames descartados por atraso",
+                 captura['frames_descartados'])
+            ]
+        
+        bd = detector.estadisticas_escritura()
+        if bd and 'latencia_subida_media_ms' in bd:
+            # Almacén local: escritura en SQLite por fila y subida a MySQL por lote
+            muestras += [
+                ('salud_bd_cola', 'gauge', "Detecciones locales sin subir a MySQL", bd['profundidad_cola']),
+                ('salud_bd_latencia_media_ms', 'gauge', "Latencia media por escritura local (SQLite)",
+                 bd['latencia_media_ms']),
+                ('salud_bd_latencia_max_ms', 'gauge', "Latencia máxima por escritura local (SQLite)",
+                 bd['latencia_max_ms']),
+                ('salud_bd_subida_latencia_media_ms', 'gauge', "Latencia media por lote subido a MySQL",
+                 bd['latencia_subida_media_ms']),
+                ('salud_bd_subida_latencia_max_ms', 'gauge', "Latencia máxima por lote subido a MySQL",
+                 bd['latencia_subida_max_ms']),
+                ('salud_bd_filas_escritas_total', 'counter', "Filas subidas a MySQL", bd['filas_escritas']),
+                ('salud_bd_filas_fallidas_total', 'counter', "Filas rechazadas por MySQL",
+                 bd['filas_fallidas']),
+                ('salud_bd_filas_rechazadas', 'gauge', "Filas rechazadas esperando reintento",
+                 bd['filas_rechazadas'])
+            ]
+        elif bd:
+            muestras += [
+                ('salud_bd_cola', 'gauge', "Detecciones esperando escritura", bd['profundidad_cola']),
+                ('salud_bd_latencia_media_ms', 'gauge', "Latencia media por lote", bd['latencia_media_ms']),
+                ('salud_bd_latencia_max_ms', 'gauge', "Latencia máxima por lote", bd['latencia_max_ms']),
+                ('salud_bd_filas_escritas_total', 'counter', "Filas insertadas", bd['filas_escritas']),
+                ('salud_bd_filas_fallidas_total', 'counter', "Filas con error de inserción",
+                 bd['filas_fallidas']),
+                ('salud_bd_filas_descartadas_total', 'counter', "Filas descartadas por cola llena",
+                 bd['filas_descartadas'])
+            ]
+        
+        if detector.prolog is not None:
+            prolog = detector.prolog.estadisticas()
+            muestras += [
+                ('salud_prolog_cola', 'gauge', "Pedidos esperando al motor Prolog",
+                 prolog['profundidad_cola']),
+                ('salud_prolog_latencia_media_ms', 'gauge', "Latencia media por pedido Prolog",
+                 prolog['latencia_media_ms']),
+                ('salud_prolog_latencia_max_ms', 'gauge', "Latencia máxima por pedido Prolog",
+                 prolog['latencia_max_ms']),
+                ('salud_prolog_errores_total', 'counter', "Pedidos Prolog con error", prolog['errores'])
+            ]
+        
+        return muestras
     
     def detener(self):
         """
@@ -345,24 +614,28 @@ class SistemaSaludOcupacional:
         if self.detector_fatiga:
             self.detector_fatiga.cerrar()
         
-        import mysql.connector
+        if self.servidor_metricas is not None:
+            self.servidor_metricas.cerrar()
+        
+        self.planificador.cerrar()
+        print(f"Alertas: {self.planificador.estadisticas()}")
+        print(f"CO2: {self.cliente_co2.estadisticas()}")
+        self.cliente_co2.cerrar()
+        
         try:
-            conexion = mysql.connector.connect(**self.db_config)
-            cursor = conexion.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT minutos_totales FROM sesiones_trabajo 
-                WHERE estado = 'activa' 
-                ORDER BY id DESC LIMIT 1
-            """)
-            sesion = cursor.fetchone()
-            minutos = sesion['minutos_totales'] if sesion else 0
-            cursor.close()
-            conexion.close()
-            
+            minutos = self.almacen.minutos_sesion_activa()
             self.asistente_voz.despedida(minutos)
         except:
             pass
         
+        if self.sesion_id is not None:
+            self.almacen.finalizar_sesion(self.sesion_id)
+        
+        # Último intento de subir lo pendiente (lo demás queda en local)
+        self.almacen.cerrar()
+        
+        self.asistente_voz.cerrar()
+        
         print("✓ Sistema detenido completamente\n")
         sys.exit(0)
 
@@ -372,12 +645,16 @@ class SistemaSaludOcupacional:
 # ========================================
 
 if __name__ == "__main__":
-    db_config = {
-        'host': 'localhost',
-        'user': 'root',
-        'password': '',
-        'database': 'salud_ocupacional'
-    }
+    # --metricas [puerto]: endpoint Prometheus local
+    # --simulado: detector simulado (sin cámara ni cv2)
+    # --reglas-nativas: reglas evaluadas en Python, sin SWI-Prolog
+    puerto = None
+    if '--metricas' in sys.argv:
+        indice = sys.argv.index('--metricas')
+        siguiente = sys.argv[indice + 1] if len(sys.argv) > indice + 1 else ''
+        puerto = int(siguiente) if siguiente.isdigit() else 9101
     
-    sistema = SistemaSaludOcupacional(db_config)
-    sistema.iniciar()
\ No newline at end of file
+    sistema = SistemaSaludOcupacional(DB_CONFIG, puerto_metricas=puerto,
+                                      simulado='--simulado' in sys.argv,
+                                      reglas_nativas='--reglas-nativas' in sys.argv)
+    sistema.iniciar()
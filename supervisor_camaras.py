@@ -0,0 +1,348 @@
+"""
+Supervisor Multi-Cámara
+Lanza un proceso detector por cámara o stream (cada uno con su sesion_id),
+agrega por IPC los resultados de cada minuto y los reportes de salud, y
+reinicia automáticamente los procesos que fallan (salvo archivos de video,
+que volverían a procesarse desde el frame 0)
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+
+from pool_conexiones import DB_CONFIG
+
+# Segundos entre reportes de salud de cada proceso
+INTERVALO_SALUD = 5.0
+
+
+def _trabajador_camara(nombre, fuente, sesion_id, db_config, opciones, eventos, fin,
+                       max_frames=None):
+    """
+    Proceso detector de una cámara. Envía a 'eventos':
+        ('salud', nombre, {...})      cada INTERVALO_SALUD segundos
+        ('resultado', nombre, {...})  niveles de fatiga de cada minuto
+        ('fin', nombre, {...})        al agotarse la fuente o al detenerse
+        ('error', nombre, {...})      antes de terminar por una excepción
+    """
+    import cv2
+    from detector_fatiga_real import DetectorFatigaReal
+
+    # Un hilo de OpenCV por proceso: el paralelismo lo dan los procesos
+    cv2.setNumThreads(1)
+
+    detector = DetectorFatigaReal(db_config, fuente_video=fuente, mostrar_video=False, **opciones)
+    detector.establecer_sesion(sesion_id)
+
+    frames = 0
+    frames_reporte = 0
+    inicio = time.perf_counter()
+    ultimo_reporte = inicio
+
+    try:
+        while not fin.is_set() and (max_frames is None or frames < max_frames):
+            ret, frame = detector.leer_frame()
+            if not ret:
+                if detector.captura_activa():
+                    continue
+                break
+
+            _, _, _, niveles, _ = detector.procesar_frame(frame)
+            detector.registrar_frame_analizado()
+            frames += 1
+
+            if niveles:
+                niveles['fatiga_general_alta'] = detector.actualizar_prolog(
+                    niveles['visual'], niveles['postural']
+                )
+                detector.registrar_deteccion(
+                    'visual', niveles['visual'],
+                    f"Parpadeos: {niveles['frecuencia_parpadeo']}/min"
+                )
+                detector.registrar_deteccion(
+                    'postural', niveles['postural'],
+                    f"Postura: {detector.postura_actual}"
+                )
+                niveles['postura'] = detector.postura_actual
+                niveles['sesion_id'] = sesion_id
+                eventos.put(('resultado', nombre, niveles))
+
+            ahora = time.perf_counter()
+            if ahora - ultimo_reporte >= INTERVALO_SALUD:
+                eventos.put(('salud', nombre, {
+                    'fps': round((frames - frames_reporte) / (ahora - ultimo_reporte), 1),
+                    'frames': frames,
+                    'captura': detector.estadisticas_captura(),
+                    'bd': detector.estadisticas_escritura()
+                }))
+                frames_reporte = frames
+                ultimo_reporte = ahora
+    except Exception as e:
+        # El supervisor reinicia el proceso al ver el exitcode distinto de 0
+        eventos.put(('error', nombre, {'error': str(e), 'frames': frames}))
+        raise
+    else:
+        duracion = time.perf_counter() - inicio
+        eventos.put(('fin', nombre, {
+            'frames': frames,
+            'segundos': round(duracion, 2),
+            'fps': round(frames / duracion, 1) if duracion > 0 else 0.0
+        }))
+    finally:
+        detector.cerrar()
+
+
+class SupervisorCamaras:
+    def __init__(self, camaras, db_config=None, max_reinicios=5, espera_reinicio=2.0,
+                 timeout_salud=30.0, max_frames=None, **opciones_detector):
+        """
+        camaras: lista de {'nombre', 'fuente', 'sesion_id'}
+            (fuente: índice de cámara, ruta de video o URL de stream;
+            sesion_id: sesión del almacén local, ej. almacen.crear_sesion())
+        db_config: configuración MySQL de los procesos (None = sin BD)
+        max_reinicios: reinicios por cámara antes de darla por perdida
+        espera_reinicio: segundos de espera antes de reiniciar (se duplica en cada falla)
+        timeout_salud: segundos sin reporte para considerar colgado un proceso
+        max_frames: frames por proceso (para pruebas de rendimiento)
+        """
+        self.camaras = {c['nombre']: c for c in camaras}
+        self.db_config = db_config
+        self.max_reinicios = max_reinicios
+        self.espera_reinicio = espera_reinicio
+        self.timeout_salud = timeout_salud
+        self.max_frames = max_frames
+        self.opciones = opciones_detector
+
+        self._contexto = multiprocessing.get_context('spawn')
+        self.eventos = self._contexto.Queue()
+        self.fin = self._contexto.Event()
+
+        self.procesos = {}
+        self.terminadas = {}
+        self.resultados = {nombre: [] for nombre in self.camaras}
+        self.salud = {}
+        self.reinicios = {nombre: 0 for nombre in self.camaras}
+        self._ultimo_contacto = {}
+        self._reinicio_pendiente = {}
+
+    def _lanzar(self, nombre):
+        camara = self.camaras[nombre]
+        proceso = self._contexto.Process(
+            target=_trabajador_camara,
+            args=(nombre, camara['fuente'], camara.get('sesion_id'), self.db_config,
+                  self.opciones, self.eventos, self.fin, self.max_frames),
+            name=f"camara-{nombre}",
+            daemon=True
+        )
+        proceso.start()
+        self.procesos[nombre] = proceso
+        self._ultimo_contacto[nombre] = time.monotonic()
+        print(f"✓ Cámara {nombre} iniciada (pid {proceso.pid}, sesión {camara.get('sesion_id')})")
+
+    def iniciar(self):
+        for nombre in self.camaras:
+            self._lanzar(nombre)
+
+    def activas(self):
+        return [n for n, p in self.procesos.items() if n not in self.terminadas]
+
+    def supervisar(self, duracion=None):
+        """
+        Atiende eventos y vigila los procesos hasta que terminen todas las
+        cámaras o venza 'duracion' (segundos)
+        """
+        limite = None if duracion is None else time.monotonic() + duracion
+
+        while self.activas() and (limite is None or time.monotonic() < limite):
+            try:
+                tipo, nombre, datos = self.eventos.get(timeout=1.0)
+                self._atender_evento(tipo, nombre, datos)
+            except queue.Empty:
+                pass
+            self._vigilar()
+
+    def _atender_evento(self, tipo, nombre, datos):
+        self._ultimo_contacto[nombre] = time.monotonic()
+
+        if tipo == 'resultado':
+            self.resultados[nombre].append(datos)
+            print(f"[{nombre}] Visual: {datos['visual']} | Postural: {datos['postural']} "
+                  f"({datos['postura']})")
+        elif tipo == 'salud':
+            self.salud[nombre] = datos
+        elif tipo == 'error':
+            print(f"❌ Cámara {nombre}: {datos['error']}")
+            self.salud.setdefault(nombre, {})['frames'] = datos['frames']
+        elif tipo == 'fin':
+            self.salud.setdefault(nombre, {}).update(datos)
+            self.terminadas[nombre] = datos
+
+    def _vigilar(self):
+        ahora = time.monotonic()
+
+        for nombre, proceso in list(self.procesos.items()):
+            if nombre in self.terminadas:
+                continue
+
+            if nombre in self._reinicio_pendiente:
+                if ahora >= self._reinicio_pendiente[nombre]:
+                    del self._reinicio_pendiente[nombre]
+                    self._lanzar(nombre)
+                continue
+
+            colgado = ahora - self._ultimo_contacto[nombre] > self.timeout_salud
+            if proceso.is_alive() and not colgado:
+                continue
+            if proceso.exitcode == 0:
+                # Terminó bien: su evento 'fin' ya está en camino
+                continue
+
+            if colgado and proceso.is_alive():
+                print(f"⚠️ Cámara {nombre} sin reportes por {self.timeout_salud:.0f} s: se reinicia")
+                proceso.terminate()
+            proceso.join(timeout=1)
+
+            if fuente_finita(self.camaras[nombre]['fuente']):
+                # Reiniciar un archivo lo reprocesa desde el frame 0 (resultados duplicados)
+                frames = self.salud.get(nombre, {}).get('frames')
+                avance = '' if frames is None else f" tras ~{frames} frames"
+                print(f"❌ Cámara {nombre} (archivo) terminó con exitcode {proceso.exitcode}"
+                      f"{avance}: no se reinicia")
+                self.terminadas[nombre] = {'error': f"exitcode {proceso.exitcode}", 'frames': frames}
+                continue
+
+            self.reinicios[nombre] += 1
+            if self.reinicios[nombre] > self.max_reinicios:
+                print(f"❌ Cámara {nombre} falló {self.reinicios[nombre]} veces: se abandona")
+                self.terminadas[nombre] = {'error': f"exitcode {proceso.exitcode}"}
+                continue
+
+            espera = self.espera_reinicio * 2 ** (self.reinicios[nombre] - 1)
+            print(f"⚠️ Cámara {nombre} terminó (exitcode {proceso.exitcode}): "
+                  f"reinicio {self.reinicios[nombre]} en {espera:.0f} s")
+            self._reinicio_pendiente[nombre] = ahora + espera
+
+    def estadisticas(self):
+        return {
+            nombre: {
+                'salud': self.salud.get(nombre, {}),
+                'resultados': len(self.resultados[nombre]),
+                'reinicios': self.reinicios[nombre]
+            }
+            for nombre in self.camaras
+        }
+
+    def detener(self, timeout=10):
+        self.fin.set()
+        limite = time.monotonic() + timeout
+        # Recoger los eventos de cierre mientras los procesos terminan
+        while self.activas() and time.monotonic() < limite:
+            try:
+                self._atender_evento(*self.eventos.get(timeout=0.5))
+            except queue.Empty:
+                if not any(p.is_alive() for p in self.procesos.values()):
+                    break
+        for proceso in self.procesos.values():
+            proceso.join(timeout=1)
+            if proceso.is_alive():
+                proceso.terminate()
+
+
+def fuente_finita(fuente):
+    """True para archivos de video (las cámaras y los streams no se agotan)"""
+    return isinstance(fuente, str) and os.path.isfile(fuente)
+
+
+def medir_escalamiento(ruta_video, max_streams=4, max_frames=300, **opciones_detector):
+    """
+    Procesa el mismo video en 1..max_streams procesos simultáneos y devuelve
+    FPS por stream y total para cada cantidad
+    """
+    resultados = []
+    for streams in range(1, max_streams + 1):
+        camaras = [
+            {'nombre': f"stream{i + 1}", 'fuente': ruta_video, 'sesion_id': None}
+            for i in range(streams)
+        ]
+        supervisor = SupervisorCamaras(
+            camaras, None, max_reinicios=0, max_frames=max_frames,
+            archivo_prolog=None, captura_en_hilo=False, **opciones_detector
+        )
+        supervisor.iniciar()
+        supervisor.supervisar()
+        supervisor.detener()
+
+        fps = [supervisor.terminadas[n].get('fps', 0.0) for n in supervisor.camaras]
+        resultados.append({
+            'streams': streams,
+            'fps_por_stream': round(sum(fps) / len(fps), 1),
+            'fps_total': round(sum(fps), 1)
+        })
+    return resultados
+
+
+# ========================================
+# EJECUCIÓN PRINCIPAL
+# ========================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Supervisor de detectores multi-cámara")
+    parser.add_argument('fuentes', nargs='*', default=['0'],
+                        help="Índices de cámara, rutas de video o URLs de stream")
+    parser.add_argument('--sesiones', type=int, nargs='*', default=None,
+                        help="sesion_id local existente de cada fuente (por defecto se crea una por cámara)")
+    parser.add_argument('--usuario', type=int, default=1, help="usuario_id de las sesiones creadas")
+    parser.add_argument('--sin-bd', action='store_true', help="No registrar en MySQL")
+    parser.add_argument('--escalamiento', default=None, metavar='VIDEO',
+                        help="Medir FPS por stream de 1 a --max-streams procesos con este video")
+    parser.add_argument('--max-streams', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--max-frames', type=int, default=300)
+    args = parser.parse_args()
+
+    if args.escalamiento:
+        print("="*60)
+        print("ESCALAMIENTO MULTI-STREAM")
+        print("="*60)
+        for fila in medir_escalamiento(args.escalamiento, args.max_streams, args.max_frames):
+            print(f"{fila['streams']} stream(s): {fila['fps_por_stream']} fps por stream, "
+                  f"{fila['fps_total']} fps total")
+        print(f"(CPUs disponibles: {multiprocessing.cpu_count()})")
+        raise SystemExit(0)
+
+    db_config = None if args.sin_bd else DB_CONFIG
+    almacen = None
+    creadas = []
+    if db_config is None:
+        sesiones = [None] * len(args.fuentes)
+    elif args.sesiones:
+        sesiones = args.sesiones
+    else:
+        # Una sesión local por cámara: los procesos escriben en el mismo archivo
+        from almacenamiento_local import obtener_almacen
+
+        almacen = obtener_almacen(db_config)
+        creadas = sesiones = [almacen.crear_sesion(args.usuario) for _ in args.fuentes]
+    camaras = [
+        {
+            'nombre': f"cam{i + 1}",
+            'fuente': int(fuente) if fuente.isdigit() else fuente,
+            'sesion_id': sesiones[i]
+        }
+        for i, fuente in enumerate(args.fuentes)
+    ]
+
+    supervisor = SupervisorCamaras(camaras, db_config)
+    supervisor.iniciar()
+    try:
+        supervisor.supervisar()
+    except KeyboardInterrupt:
+        print("\n✓ Supervisor detenido por el usuario")
+    finally:
+        supervisor.detener()
+        print(f"\nEstadísticas: {supervisor.estadisticas()}")
+        if almacen is not None:
+            for sesion_id in creadas:
+                almacen.finalizar_sesion(sesion_id)
+            almacen.cerrar()
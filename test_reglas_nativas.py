@@ -0,0 +1,85 @@
+"""
+Pruebas del evaluador nativo de reglas (pytest)
+Las de equivalencia contra SWI-Prolog se omiten si pyswip o la biblioteca
+de SWI-Prolog no están instalados
+"""
+
+import os
+import random
+
+import pytest
+
+from reglas_nativas import TIPOS_FATIGA, EvaluadorIncremental, EvaluadorReglas, verificar_equivalencia
+
+ARCHIVO_PROLOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'salud_ocupacional.pl')
+
+
+@pytest.fixture
+def evaluador():
+    return EvaluadorReglas(ARCHIVO_PROLOG)
+
+
+def test_estado_inicial_de_la_base(evaluador):
+    assert evaluador.calidad_aire() == 'optimo'
+    assert not evaluador.condicion_critica_co2()
+    assert not evaluador.fatiga_general_alta()
+    assert not evaluador.requiere_pausa()
+    assert evaluador.estado_sistema()['minutos_trabajo'] == 0
+
+
+def test_umbral_co2_critico(evaluador):
+    evaluador.actualizar_sensor('co2', 1199)
+    assert not evaluador.condicion_critica_co2()
+    evaluador.actualizar_sensor('co2', 1200)
+    assert evaluador.condicion_critica_co2()
+    assert evaluador.requiere_ventilacion()
+    evaluador.actualizar_actuador('ventilador', 'encendido')
+    assert not evaluador.requiere_ventilacion()
+
+
+def test_fatiga_y_pausa(evaluador):
+    evaluador.actualizar_fatiga('postural', 'alto')
+    assert evaluador.fatiga_general_alta()
+    assert evaluador.actualizar_sesion(1, 50)
+    assert evaluador.requiere_pausa()
+    assert not evaluador.actualizar_sesion(99, 50)
+    assert evaluador.acciones_recomendadas() == ['ejercicio_visual', 'sugerir_pausa']
+
+
+def test_incremental_igual_a_evaluacion_completa():
+    azar = random.Random(3)
+    incremental = EvaluadorIncremental(ARCHIVO_PROLOG)
+    eventos = []
+    incremental.suscribir(eventos.append)
+
+    for _ in range(3000):
+        cambio = azar.randrange(4)
+        if cambio == 0:
+            incremental.actualizar_sensor(azar.choice(('co2', 'ruido')), azar.randint(0, 1600))
+        elif cambio == 1:
+            incremental.actualizar_fatiga(azar.choice(TIPOS_FATIGA), azar.choice(('bajo', 'moderado', 'alto')))
+        elif cambio == 2:
+            incremental.actualizar_actuador('ventilador', azar.choice(('apagado', 'encendido')))
+        else:
+            incremental.actualizar_sesion(1, azar.randint(0, 120))
+        incremental.evaluar()
+        for regla in incremental.reglas:
+            assert incremental.conclusiones[regla] == getattr(incremental, regla)(), regla
+
+    assert eventos
+    assert incremental.evaluaciones_evitadas > 0
+
+
+def _prolog_disponible():
+    try:
+        from pyswip import Prolog
+        Prolog()
+        return True
+    except Exception:
+        return False
+
+
+@pytest.mark.skipif(not _prolog_disponible(), reason="SWI-Prolog (pyswip) no disponible")
+def test_equivalencia_con_prolog():
+    diferencias = verificar_equivalencia(ARCHIVO_PROLOG, combinaciones=500)
+    assert diferencias == [], diferencias[:10]
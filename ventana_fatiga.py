@@ -0,0 +1,158 @@
+"""
+Ventana Deslizante de Parpadeos, PERCLOS y Postura
+Buffers circulares NumPy de tamaño fijo con los instantes de parpadeo, el
+estado de los ojos y el código de postura de cada frame. La tasa de
+parpadeo, el PERCLOS (porcentaje de frames con ojos cerrados) y la fracción
+de tiempo en cada postura de los últimos N segundos se actualizan en O(1)
+amortizado y se pueden consultar en cualquier momento
+"""
+
+import numpy as np
+
+# PERCLOS sobre la ventana (fracción de frames con ojos cerrados)
+UMBRAL_PERCLOS_MODERADO = 0.08
+UMBRAL_PERCLOS_ALTO = 0.15
+
+# Posturas codificadas como enteros (índice en POSTURAS)
+POSTURAS = ('sin_deteccion', 'correcta', 'cabeza_alta', 'cabeza_baja', 'cabeza_inclinada')
+SIN_DETECCION, CORRECTA, CABEZA_ALTA, CABEZA_BAJA, CABEZA_INCLINADA = range(len(POSTURAS))
+
+# Fracción de la ventana (frames con rostro) fuera de la postura correcta
+UMBRAL_POSTURA_ALTO = 0.5       # cabeza baja o inclinada
+UMBRAL_POSTURA_MODERADO = 0.3   # cabeza baja, inclinada o alta
+
+
+class AnilloEventos:
+    def __init__(self, capacidad, clases=2):
+        """
+        Cola circular de (instante, clase) con la cantidad de eventos de cada
+        clase (0 .. clases-1). Al llenarse se descarta el evento más antiguo
+        (memoria acotada)
+        """
+        self.capacidad = capacidad
+        self.instantes = np.zeros(capacidad, dtype=np.float64)
+        self.valores = np.zeros(capacidad, dtype=np.uint8)
+        self.inicio = 0
+        self.cantidad = 0
+        self.conteos = [0] * clases
+
+    def agregar(self, instante, valor=1):
+        if self.cantidad == self.capacidad:
+            self._quitar_primero()
+
+        fin = (self.inicio + self.cantidad) % self.capacidad
+        self.instantes[fin] = instante
+        self.valores[fin] = valor
+        self.cantidad += 1
+        self.conteos[valor] += 1
+
+    def _quitar_primero(self):
+        self.conteos[self.valores[self.inicio]] -= 1
+        self.inicio = (self.inicio + 1) % self.capacidad
+        self.cantidad -= 1
+
+    def descartar_anteriores(self, limite):
+        """Quita los eventos con instante < limite (cada uno sale una sola vez)"""
+        while self.cantidad and self.instantes[self.inicio] < limite:
+            self._quitar_primero()
+
+
+class VentanaFatiga:
+    def __init__(self, duracion=60.0, fps_maximo=60, parpadeos_maximos=240):
+        """
+        duracion: segundos de la ventana deslizante
+        fps_maximo: frames que caben por segundo de ventana (con más, las
+            ventanas de PERCLOS y postura se acortan en vez de crecer la memoria)
+        parpadeos_maximos: parpadeos que caben en la ventana
+        """
+        self.duracion = duracion
+        self.frames = AnilloEventos(int(duracion * fps_maximo))
+        self.parpadeos = AnilloEventos(parpadeos_maximos)
+        self.posturas = AnilloEventos(int(duracion * fps_maximo), len(POSTURAS))
+
+    def registrar_frame(self, instante, ojos_cerrados):
+        self.frames.agregar(instante, 1 if ojos_cerrados else 0)
+        self._recortar(instante)
+
+    def registrar_parpadeo(self, instante):
+        self.parpadeos.agregar(instante)
+
+    def registrar_postura(self, instante, codigo):
+        self.posturas.agregar(instante, codigo)
+        self._recortar(instante)
+
+    def _recortar(self, instante):
+        limite = instante - self.duracion
+        self.frames.descartar_anteriores(limite)
+        self.parpadeos.descartar_anteriores(limite)
+        self.posturas.descartar_anteriores(limite)
+
+    def frecuencia_parpadeo(self, instante):
+        """Parpadeos por minuto en la ventana que termina en 'instante'"""
+        self._recortar(instante)
+        return self.parpadeos.cantidad * 60.0 / self.duracion
+
+    def perclos(self, instante):
+        """Fracción de frames con ojos cerrados en la ventana (0 sin frames)"""
+        self._recortar(instante)
+        if not self.frames.cantidad:
+            return 0.0
+        return self.frames.conteos[1] / self.frames.cantidad
+
+    def fracciones_postura(self, instante):
+        """
+        Fracción de tiempo en cada postura (índice = código) sobre los
+        frames con rostro; todo 0 si no hubo rostro en la ventana
+        """
+        self._recortar(instante)
+        conteos = self.posturas.conteos
+        con_rostro = self.posturas.cantidad - conteos[SIN_DETECCION]
+        if not con_rostro:
+            return [0.0] * len(POSTURAS)
+        return [0.0] + [c / con_rostro for c in conteos[1:]]
+
+
+def nivel_postural(fracciones):
+    """Nivel de fatiga postural a partir de las fracciones de la ventana"""
+    mala = fracciones[CABEZA_BAJA] + fracciones[CABEZA_INCLINADA]
+    if mala >= UMBRAL_POSTURA_ALTO:
+        return "alto"
+    if mala + fracciones[CABEZA_ALTA] >= UMBRAL_POSTURA_MODERADO:
+        return "moderado"
+    return "bajo"
+
+
+# ========================================
+# PRUEBA DEL MÓDULO
+# ========================================
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    rng = random.Random(7)
+    ventana = VentanaFatiga(60.0)
+    fps = 30
+
+    # 5 minutos: el ritmo de parpadeo sube de ~15 a ~30 por minuto
+    inicio = time.perf_counter()
+    cerrados = 0
+    for i in range(5 * 60 * fps):
+        t = i / fps
+        tasa = 15 if t < 150 else 30
+        if cerrados == 0 and rng.random() < tasa / (60 * fps):
+            cerrados = 5
+            ventana.registrar_parpadeo(t)
+        ventana.registrar_frame(t, cerrados > 0)
+        ventana.registrar_postura(t, CABEZA_BAJA if 200 <= t < 260 else CORRECTA)
+        cerrados = max(0, cerrados - 1)
+
+        if i % (30 * fps) == 0 and t >= 60:
+            print(f"t={t:5.0f} s: {ventana.frecuencia_parpadeo(t):4.0f} parpadeos/min, "
+                  f"PERCLOS {ventana.perclos(t):.1%}, postural "
+                  f"{nivel_postural(ventana.fracciones_postura(t))}")
+    duracion = time.perf_counter() - inicio
+
+    print(f"\n{5 * 60 * fps} frames: {duracion / (5 * 60 * fps) * 1e6:.2f} µs por frame")
+    print(f"Memoria fija: {2 * (ventana.frames.instantes.nbytes + ventana.frames.valores.nbytes)} "
+          f"bytes de frames y posturas, {ventana.parpadeos.instantes.nbytes} bytes de parpadeos")